@@ -0,0 +1,109 @@
+"""Scaling of multithreaded 3D meshing with the number of threads.
+
+Run with
+
+    python benchmarks/threads.py [--mesh-size-factor 0.5]
+
+and compare the wall times for the different thread counts. The 3D meshing uses HXT
+(Mesh.Algorithm3D = 10), which is Gmsh's parallel Delaunay mesher.
+"""
+import argparse
+import os
+import time
+
+import gmsh
+import numpy as np
+
+import pygmsh
+
+
+def torus_crowd(geom, factor):
+    irad = 0.15
+    orad = 0.27
+    Z_pos = (irad + orad) * np.concatenate(
+        [+np.ones(8), -np.ones(8), +np.ones(8), -np.ones(8)]
+    )
+    Alpha = np.concatenate(
+        [
+            np.arange(8) * np.pi / 4.0,
+            np.arange(8) * np.pi / 4.0 + np.pi / 16.0,
+            np.arange(8) * np.pi / 4.0,
+            np.arange(8) * np.pi / 4.0 + np.pi / 16.0,
+        ]
+    )
+    A1 = (
+        (irad + orad)
+        / np.tan(np.pi / 8.0)
+        * np.concatenate(
+            [1.6 * np.ones(8), 1.6 * np.ones(8), 1.9 * np.ones(8), 1.9 * np.ones(8)]
+        )
+    )
+    for alpha, a1, z in zip(Alpha, A1, Z_pos):
+        R1 = pygmsh.rotation_matrix([0.0, 1.0, 0.0], 0.5 * np.pi)
+        R2 = pygmsh.rotation_matrix([0.0, 0.0, 1.0], alpha)
+        x0 = np.array([a1, 0.0, 0.0])
+        x1 = np.array([0.0, 0.0, z])
+        geom.add_torus(
+            irad=irad,
+            orad=orad,
+            mesh_size=0.1 * factor,
+            R=np.dot(R2, R1),
+            x0=np.dot(R2, x0) + x1,
+        )
+    geom.add_box(-1.0, 1.0, -1.0, 1.0, -1.0, 1.0, mesh_size=0.3 * factor)
+
+
+def booleans(geom, factor):
+    geom.characteristic_length_min = 0.05 * factor
+    geom.characteristic_length_max = 0.05 * factor
+    box = geom.add_box([0.0, 0.0, 0.0], [1.0, 1.0, 1.0])
+    ball = geom.add_ball([0.5, 0.5, 0.5], 0.65)
+    cyls = [
+        geom.add_cylinder([0.5, 0.5, -0.5], [0.0, 0.0, 2.0], 0.3),
+        geom.add_cylinder([-0.5, 0.5, 0.5], [2.0, 0.0, 0.0], 0.3),
+        geom.add_cylinder([0.5, -0.5, 0.5], [0.0, 2.0, 0.0], 0.3),
+    ]
+    body = geom.boolean_intersection([box, ball])
+    geom.boolean_difference(body, geom.boolean_union(cyls))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mesh-size-factor", type=float, default=0.5)
+    parser.add_argument(
+        "--threads",
+        type=int,
+        nargs="+",
+        default=sorted({1, 2, 4, 8, os.cpu_count() or 1}),
+    )
+    args = parser.parse_args()
+
+    cases = [
+        ("torus crowd", pygmsh.geo.Geometry, torus_crowd),
+        ("booleans", pygmsh.occ.Geometry, booleans),
+    ]
+    print(f"{'case':<12} {'threads':>8} {'time [s]':>10} {'speedup':>8} {'cells':>10}")
+    for name, geometry, build in cases:
+        t1 = None
+        for num_threads in args.threads:
+            with geometry() as geom:
+                gmsh.option.setNumber("General.Terminal", 0)
+                build(geom, args.mesh_size_factor)
+                t = time.perf_counter()
+                geom.generate_mesh(
+                    algorithm_3d=10,
+                    num_threads=num_threads,
+                    max_num_threads=(num_threads, num_threads, num_threads),
+                    extract=False,
+                )
+                t = time.perf_counter() - t
+                mesh = pygmsh.helpers.extract_to_meshio(cell_dims=[3])
+                num_cells = sum(len(c.data) for c in mesh.cells)
+            t1 = t if t1 is None else t1
+            print(
+                f"{name:<12} {num_threads:>8} {t:>10.3f} {t1 / t:>8.2f} {num_cells:>10}"
+            )
+
+
+if __name__ == "__main__":
+    main()
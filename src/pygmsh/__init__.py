@@ -1,14 +1,36 @@
-from . import geo, occ
+from . import (
+    batch,
+    cache,
+    geo,
+    memory,
+    metrics,
+    occ,
+    profiling,
+    progress,
+    quality,
+    stats,
+)
 from .__about__ import __version__
-from ._optimize import optimize
-from .helpers import orient_lines, rotation_matrix, write
+from ._optimize import OptimizationPipeline, optimize
+from .helpers import chain_lines, orient_lines, rotation_matrix, session, write
 
 __all__ = [
+    "batch",
+    "cache",
     "geo",
+    "memory",
+    "metrics",
     "occ",
+    "profiling",
+    "progress",
+    "quality",
+    "stats",
     "rotation_matrix",
     "orient_lines",
+    "chain_lines",
+    "session",
     "write",
     "optimize",
+    "OptimizationPipeline",
     "__version__",
 ]
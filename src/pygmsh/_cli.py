@@ -1,10 +1,13 @@
 import argparse
+import glob
+import multiprocessing
+import pathlib
+import sys
+from concurrent.futures import ProcessPoolExecutor
 from sys import version_info
 
-import meshio
-
 from .__about__ import __version__
-from ._optimize import optimize
+from ._optimize import OptimizationPipeline, optimize_file
 
 
 def optimize_cli(argv=None):
@@ -13,8 +16,33 @@ def optimize_cli(argv=None):
         formatter_class=argparse.RawTextHelpFormatter,
     )
 
-    parser.add_argument("infile", type=str, help="mesh to optimize")
-    parser.add_argument("outfile", type=str, help="optimized mesh")
+    parser.add_argument(
+        "files",
+        type=str,
+        nargs="+",
+        help=(
+            "mesh to optimize and optimized mesh, or,\n"
+            "with --output, meshes to optimize (glob patterns allowed)"
+        ),
+    )
+
+    parser.add_argument(
+        "-o",
+        "--output",
+        default=None,
+        help=(
+            "output file pattern for multiple meshes with the fields\n"
+            '{parent}, {stem}, {suffix}, e.g., "optimized/{stem}.msh"'
+        ),
+    )
+
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="number of worker processes (default: 1)",
+    )
 
     parser.add_argument(
         "-q",
@@ -28,10 +56,32 @@ def optimize_cli(argv=None):
     parser.add_argument(
         "-m",
         "--method",
-        default="",
+        action="append",
+        default=None,
         # Valid choices are on
         # https://gmsh.info/doc/texinfo/gmsh.html#Namespace-gmsh_002fmodel_002fmesh
-        help='method (e.g., "", Netgen, ...)',
+        help='method (e.g., "", Netgen, ...), repeat to chain methods',
+    )
+
+    parser.add_argument(
+        "--min-quality",
+        type=float,
+        default=None,
+        help="stop once the worst element quality reaches this value",
+    )
+
+    parser.add_argument(
+        "--time-budget",
+        type=float,
+        default=None,
+        help="don't start any more passes after this many seconds per mesh",
+    )
+
+    parser.add_argument(
+        "--rounds",
+        type=int,
+        default=1,
+        help="maximum number of times the methods are run (default: 1)",
     )
 
     parser.add_argument(
@@ -43,8 +93,92 @@ def optimize_cli(argv=None):
     )
     args = parser.parse_args(argv)
 
-    mesh = meshio.read(args.infile)
-    optimize(mesh, method=args.method, verbose=args.verbose).write(args.outfile)
+    if args.output is None:
+        if len(args.files) != 2:
+            parser.error("expected infile and outfile, or --output")
+        jobs = [tuple(args.files)]
+    else:
+        infiles = []
+        for pattern in args.files:
+            if glob.has_magic(pattern):
+                matches = sorted(glob.glob(pattern, recursive=True))
+                if len(matches) == 0:
+                    parser.error(f"no files match {pattern}")
+                infiles += matches
+            else:
+                infiles.append(pattern)
+        jobs = []
+        for infile in infiles:
+            path = pathlib.Path(infile)
+            outfile = args.output.format(
+                parent=path.parent, stem=path.stem, suffix=path.suffix
+            )
+            jobs.append((infile, outfile))
+        if len({outfile for _, outfile in jobs}) < len(jobs):
+            parser.error(f"output file names from {args.output} aren't unique")
+        for _, outfile in jobs:
+            pathlib.Path(outfile).parent.mkdir(parents=True, exist_ok=True)
+
+    pipeline = OptimizationPipeline(
+        [""] if args.method is None else args.method,
+        min_quality=args.min_quality,
+        time_budget=args.time_budget,
+        max_rounds=args.rounds,
+    )
+
+    num_failed = 0
+    for (infile, outfile), (result, error) in zip(
+        jobs, _run(jobs, pipeline, args.jobs)
+    ):
+        if error is not None:
+            num_failed += 1
+            print(f"{infile}: {error}", file=sys.stderr)
+        elif args.verbose:
+            print(f"{infile} -> {outfile}: {_format_result(result)}")
+
+    return 1 if num_failed > 0 else 0
+
+
+def _try_optimize_file(infile, outfile, method):
+    try:
+        return optimize_file(infile, outfile, method), None
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+
+def _run(jobs, method, num_workers):
+    """Yield (result, error) for every (infile, outfile) in order."""
+    if num_workers == 1 or len(jobs) == 1:
+        for infile, outfile in jobs:
+            yield _try_optimize_file(infile, outfile, method)
+        return
+
+    # "spawn" since Gmsh isn't fork-safe
+    with ProcessPoolExecutor(
+        max_workers=num_workers, mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        futures = [
+            executor.submit(_try_optimize_file, infile, outfile, method)
+            for infile, outfile in jobs
+        ]
+        for future in futures:
+            try:
+                yield future.result()
+            except Exception as e:
+                # e.g., a worker crashed
+                yield None, f"{type(e).__name__}: {e}"
+
+
+def _format_result(result):
+    out = f"{result['time']:.2f} s, {len(result['passes']) - 1} passes"
+    before = result["before"]
+    after = result["after"]
+    if before is not None and after is not None:
+        out += (
+            f", min quality {before[0]:5.3f} -> {after[0]:5.3f}"
+            f", avg quality {before[1]:5.3f} -> {after[1]:5.3f}"
+        )
+    return out
 
 
 def _get_version_text():
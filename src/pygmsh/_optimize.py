@@ -1,34 +1,138 @@
+from __future__ import annotations
+
+import pathlib
+import time
+
 import gmsh
 import meshio
 import numpy as np
 
+from . import metrics, quality
 from .helpers import extract_to_meshio
 
 
-def optimize(mesh, method="", verbose=False):
-    # mesh.remove_lower_dimensional_cells()
-    mesh.cell_data = {}
+class OptimizationPipeline:
+    """
+    Chain of Gmsh mesh optimizers that is run on the mesh in the current Gmsh model,
+    in place, until the worst element is good enough or the time is up. The quality is
+    measured after every pass.
 
-    # read into meshio like
-    # <https://gitlab.onelab.info/gmsh/gmsh/-/blob/master/demos/api/import_perf.py>
-    gmsh.initialize()
-    # add dummy entity
-    dim = 3
-    tag = gmsh.model.addDiscreteEntity(dim=dim)
-    #
-    nodes = np.arange(1, len(mesh.points) + 1)
-    assert mesh.points.shape[1] == 3
-    gmsh.model.mesh.addNodes(dim, tag, nodes, mesh.points.flat)
-    for cell_block in mesh.cells:
-        gmsh.model.mesh.addElementsByType(
-            tag,
-            meshio.gmsh.meshio_to_gmsh_type[cell_block.type],
-            [],
-            cell_block.data.flatten() + 1,
+    Parameters
+    ----------
+    methods : Optimization methods, optionally with a number of iterations, e.g.,
+        `["", ("Netgen", 2), "Relocate3D"]`, see :meth:`Geometry.optimize_mesh`.
+    min_quality : Stop as soon as the worst element quality reaches this value.
+    time_budget : Don't start any more passes after this many seconds. A running pass
+        isn't interrupted.
+    max_rounds : Maximum number of times the chain is run. The pipeline stops earlier
+        if a round doesn't improve the worst element quality.
+    quality_name : Gmsh quality measure, see :func:`pygmsh.quality.from_gmsh`.
+    bins : Number of histogram bins.
+    range : Range of the histograms, the same for all passes; values outside of it are
+        counted in "below" and "above".
+
+    Attributes
+    ----------
+    passes : One dict per pass of the last run, with the method, niter, round, wall
+        time in seconds, and the quality statistics after the pass (see
+        :func:`pygmsh.quality.summary`). The first entry holds the initial quality,
+        with method `None`.
+    """
+
+    def __init__(
+        self,
+        methods: list[str | tuple[str, int]],
+        min_quality: float | None = None,
+        time_budget: float | None = None,
+        max_rounds: int = 1,
+        quality_name: str = "gamma",
+        bins: int = 20,
+        range: tuple[float, float] | None = (0.0, 1.0),
+    ):
+        self.methods = [
+            (method, 1) if isinstance(method, str) else tuple(method)
+            for method in methods
+        ]
+        self.min_quality = min_quality
+        self.time_budget = time_budget
+        self.max_rounds = max_rounds
+        self.quality_name = quality_name
+        self.bins = bins
+        self.range = range
+        self.passes = []
+
+    def __repr__(self):
+        return f"<pygmsh OptimizationPipeline {self.methods}>"
+
+    def _measure(self, **kwargs):
+        q = quality.from_gmsh(self.quality_name)
+        self.passes.append(
+            {**kwargs, **quality.summary(q, bins=self.bins, range=self.range)}
         )
-    gmsh.model.mesh.optimize(method, force=True)
-    mesh = extract_to_meshio()
-    gmsh.finalize()
+
+    def _done(self, t0):
+        worst = self.passes[-1].get("min")
+        if worst is None:
+            # no elements
+            return True
+        if self.min_quality is not None and worst >= self.min_quality:
+            return True
+        return (
+            self.time_budget is not None
+            and time.perf_counter() - t0 >= self.time_budget
+        )
+
+    def run(self, force: bool = False) -> list[dict]:
+        """Run the pipeline on the current Gmsh model and return the passes.
+
+        :param force: also optimize discrete entities, e.g., of meshes read from files
+        """
+        t0 = time.perf_counter()
+        self.passes = []
+        self._measure(method=None, niter=0, round=0, time=0.0)
+        for k in range(1, self.max_rounds + 1):
+            if self._done(t0):
+                break
+            worst = self.passes[-1]["min"]
+            for method, niter in self.methods:
+                if self._done(t0):
+                    return self.passes
+                t = time.perf_counter()
+                gmsh.model.mesh.optimize(method, force=force, niter=niter)
+                t = time.perf_counter() - t
+                self._measure(method=method, niter=niter, round=k, time=t)
+            if self.passes[-1]["min"] <= worst:
+                break
+        return self.passes
+
+
+def optimize(mesh, method="", verbose=False):
+    """Optimize a meshio mesh with Gmsh.
+
+    :param method: Gmsh optimization method, or an :class:`OptimizationPipeline`
+    """
+    with metrics._record("optimize") as run:
+        # mesh.remove_lower_dimensional_cells()
+        mesh.cell_data = {}
+
+        gmsh.initialize()
+        _add_to_gmsh(mesh)
+        if isinstance(method, OptimizationPipeline):
+            method.run(force=True)
+        else:
+            t = time.perf_counter()
+            gmsh.model.mesh.optimize(method, force=True)
+            if run is not None:
+                run.phases[f"optimize_{method or 'default'}"] = time.perf_counter() - t
+        if run is not None:
+            if isinstance(method, OptimizationPipeline):
+                metrics._set_passes(run, method.passes)
+            elif metrics.active().quality:
+                run.set_quality()
+        mesh = extract_to_meshio()
+        gmsh.finalize()
+        if run is not None:
+            run.set_mesh(mesh)
 
     # This writes a temporary file and reads it into gmsh ("merge"). There are other
     # ways of feeding gmsh a mesh
@@ -49,18 +153,91 @@ def optimize(mesh, method="", verbose=False):
     return mesh
 
 
+def _add_to_gmsh(mesh):
+    # read into meshio like
+    # <https://gitlab.onelab.info/gmsh/gmsh/-/blob/master/demos/api/import_perf.py>
+    # add dummy entities, one per dimension since addElementsByType() derives the
+    # entity dimension from the element type
+    gmsh_types = [meshio.gmsh.meshio_to_gmsh_type[block.type] for block in mesh.cells]
+    dims = {gmsh.model.mesh.getElementProperties(t)[1] for t in gmsh_types}
+    tags = {dim: gmsh.model.addDiscreteEntity(dim=dim) for dim in sorted(dims)}
+    #
+    dim = 3
+    tag = tags[dim] if dim in tags else gmsh.model.addDiscreteEntity(dim=dim)
+    nodes = np.arange(1, len(mesh.points) + 1)
+    assert mesh.points.shape[1] == 3
+    gmsh.model.mesh.addNodes(dim, tag, nodes, mesh.points.flat)
+    for gmsh_type, cell_block in zip(gmsh_types, mesh.cells):
+        gmsh.model.mesh.addElementsByType(
+            tags[gmsh.model.mesh.getElementProperties(gmsh_type)[1]],
+            gmsh_type,
+            [],
+            cell_block.data.flatten() + 1,
+        )
+
+
+def _is_msh(filename):
+    return pathlib.Path(filename).suffix == ".msh"
+
+
+def optimize_file(infile, outfile, method=""):
+    """Optimize the mesh in `infile` and write it to `outfile`. Gmsh reads and writes
+    .msh files directly, other formats are converted by meshio.
+
+    :param method: Gmsh optimization method, or an :class:`OptimizationPipeline`
+    :returns: the wall time in seconds, the passes of the pipeline, and the minimum
+        and mean element quality before and after the optimization
+    """
+    if not isinstance(method, OptimizationPipeline):
+        method = OptimizationPipeline([method])
+    t = time.perf_counter()
+    with metrics._record("optimize") as run:
+        gmsh.initialize()
+        try:
+            gmsh.option.setNumber("General.Terminal", 0)
+            if _is_msh(infile):
+                gmsh.open(str(infile))
+            else:
+                mesh = meshio.read(infile)
+                mesh.cell_data = {}
+                _add_to_gmsh(mesh)
+            # We need force=True because we're reading from a discrete mesh
+            passes = method.run(force=True)
+            if run is not None:
+                metrics._set_passes(run, passes)
+                run.nodes = int(gmsh.option.getNumber("Mesh.NbNodes"))
+            if _is_msh(outfile):
+                gmsh.write(str(outfile))
+            else:
+                extract_to_meshio().write(outfile)
+        finally:
+            gmsh.finalize()
+    before, after = [
+        None if "min" not in p else (p["min"], p["mean"])
+        for p in [passes[0], passes[-1]]
+    ]
+    return {
+        "time": time.perf_counter() - t,
+        "passes": passes,
+        "before": before,
+        "after": after,
+    }
+
+
 def print_stats(mesh):
     import termplotlib
 
-    q = mesh.q_radius_ratio
-    q_hist, q_bin_edges = np.histogram(
-        q, bins=np.linspace(0.0, 1.0, num=41, endpoint=True)
-    )
+    q = quality.compute(mesh, "radius_ratio")
+    stats = quality.summary(q, bins=np.linspace(0.0, 1.0, num=41, endpoint=True))
+    if stats["count"] == 0:
+        return
 
     grid = termplotlib.subplot_grid((1, 2), column_widths=None, border_style=None)
-    grid[0, 0].hist(q_hist, q_bin_edges, bar_width=1, strip=True)
-    grid[0, 1].aprint(f"min quality: {np.min(q):5.3f}")
-    grid[0, 1].aprint(f"avg quality: {np.average(q):5.3f}")
-    grid[0, 1].aprint(f"max quality: {np.max(q):5.3f}")
+    grid[0, 0].hist(stats["histogram"], stats["bin_edges"], bar_width=1, strip=True)
+    grid[0, 1].aprint(f"min quality: {stats['min']:5.3f}")
+    grid[0, 1].aprint(f"avg quality: {stats['mean']:5.3f}")
+    grid[0, 1].aprint(f"max quality: {stats['max']:5.3f}")
+    if stats["below"] > 0:
+        grid[0, 1].aprint(f"inverted:    {stats['below']}")
 
     grid.show()
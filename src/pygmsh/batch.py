@@ -0,0 +1,114 @@
+"""Run many independent pygmsh jobs in parallel.
+
+Gmsh is a process-global singleton, so one process can only work on one model at a
+time. The functions here run each job in a worker process with its own Gmsh
+instance.
+"""
+from __future__ import annotations
+
+import multiprocessing
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable
+
+
+class Result:
+    """
+    Outcome of one job.
+
+    Attributes
+    ----------
+    index : Position of the job in the list of parameter sets.
+    params : The parameter set of the job.
+    mesh : The meshio.Mesh, or `None` if the mesh was written to a file or the job
+        failed.
+    filename : The output file, if any.
+    time : Wall time of the job in seconds (geometry construction and meshing).
+    error : Formatted traceback if the job failed, `None` otherwise.
+    """
+
+    def __init__(self, index, params, mesh=None, filename=None, time=None, error=None):
+        self.index = index
+        self.params = params
+        self.mesh = mesh
+        self.filename = filename
+        self.time = time
+        self.error = error
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    def __repr__(self):
+        status = "ok" if self.ok else "failed"
+        return f"<pygmsh batch Result {self.index}, {status}, {self.time} s>"
+
+
+def _run_job(index, builder, params, kernel, generate_mesh_kwargs, out):
+    from . import geo, occ
+
+    geometry = {"geo": geo.Geometry, "occ": occ.Geometry}[kernel]
+    filename = None if out is None else out.format(index=index, **params)
+
+    t = time.perf_counter()
+    try:
+        with geometry() as geom:
+            builder(geom, **params)
+            mesh = geom.generate_mesh(
+                out=filename, extract=filename is None, **generate_mesh_kwargs
+            )
+    except Exception:
+        return Result(
+            index,
+            params,
+            time=time.perf_counter() - t,
+            error=traceback.format_exc(),
+        )
+    return Result(index, params, mesh, filename, time.perf_counter() - t)
+
+
+def run(
+    builder: Callable,
+    params: list[dict],
+    kernel: str = "geo",
+    generate_mesh_kwargs: dict | None = None,
+    out: str | None = None,
+    max_workers: int | None = None,
+) -> list[Result]:
+    """Build and mesh one geometry per parameter set in a pool of worker processes.
+
+    For every parameter set `p`, a worker calls `builder(geom, **p)` on a fresh
+    `pygmsh.geo.Geometry` or `pygmsh.occ.Geometry` and then
+    `geom.generate_mesh(**generate_mesh_kwargs)`. Exceptions are caught and reported
+    in the results, so one failing variant doesn't abort the batch.
+
+    :param builder: picklable function, i.e., defined at the top level of a module
+    :param params: list of keyword argument dicts for `builder`
+    :param kernel: "geo" or "occ"
+    :param generate_mesh_kwargs: keyword arguments for `generate_mesh`
+    :param out: if given, the meshes are written to `out.format(index=k, **p)` by Gmsh
+        instead of being sent back, e.g., "mesh-{index}.msh"
+    :param max_workers: number of worker processes, default: number of CPUs
+    :returns: one Result per parameter set, in the same order
+    """
+    assert kernel in ["geo", "occ"]
+    if generate_mesh_kwargs is None:
+        generate_mesh_kwargs = {}
+
+    # "spawn" so that no Gmsh state of the parent process leaks into the workers
+    with ProcessPoolExecutor(
+        max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        futures = [
+            executor.submit(_run_job, k, builder, p, kernel, generate_mesh_kwargs, out)
+            for k, p in enumerate(params)
+        ]
+        results = []
+        for k, (p, future) in enumerate(zip(params, futures)):
+            try:
+                results.append(future.result())
+            except Exception:
+                # e.g., a worker crashed
+                results.append(Result(k, p, error=traceback.format_exc()))
+    return results
@@ -0,0 +1,244 @@
+"""On-disk cache of generated meshes.
+
+The cache key is a hash of the Gmsh model right before meshing: its geometry (as
+written by Gmsh), fields, physical groups, point mesh sizes, the relevant mesh options,
+the pygmsh mesh constraints, and the Gmsh and pygmsh versions.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import pathlib
+import tempfile
+
+import gmsh
+import meshio
+import numpy as np
+
+from .__about__ import __version__
+from .helpers import _scoped_options
+
+# options that affect the mesh, in addition to the ones passed to generate_mesh()
+_MESH_OPTIONS = [
+    "Geometry.OCCFixDegenerated",
+    "Geometry.Tolerance",
+    "Mesh.Algorithm",
+    "Mesh.Algorithm3D",
+    "Mesh.AnisoMax",
+    "Mesh.CharacteristicLengthExtendFromBoundary",
+    "Mesh.CharacteristicLengthFactor",
+    "Mesh.CharacteristicLengthFromCurvature",
+    "Mesh.CharacteristicLengthFromPoints",
+    "Mesh.CharacteristicLengthMax",
+    "Mesh.CharacteristicLengthMin",
+    "Mesh.ElementOrder",
+    "Mesh.HighOrderOptimize",
+    "Mesh.MinimumCirclePoints",
+    "Mesh.MinimumCurvePoints",
+    "Mesh.MinimumElementsPerTwoPi",
+    "Mesh.Optimize",
+    "Mesh.OptimizeNetgen",
+    "Mesh.RandomFactor",
+    "Mesh.RandomSeed",
+    "Mesh.Recombine3DAll",
+    "Mesh.Recombine3DConformity",
+    "Mesh.Recombine3DLevel",
+    "Mesh.RecombineAll",
+    "Mesh.RecombineMinimumQuality",
+    "Mesh.RecombineNodeRepositioning",
+    "Mesh.RecombineOptimizeTopology",
+    "Mesh.RecombinationAlgorithm",
+    "Mesh.SecondOrderIncomplete",
+    "Mesh.SecondOrderLinear",
+    "Mesh.Smoothing",
+    "Mesh.SubdivisionAlgorithm",
+]
+
+
+def _canonical(obj) -> str:
+    """Deterministic string representation of (nested) build parameters. pygmsh
+    entities are represented by their (dim, tag) pairs.
+    """
+    if obj is None or isinstance(obj, (bool, int, float, str, np.number)):
+        return repr(obj)
+    if isinstance(obj, np.ndarray):
+        digest = hashlib.sha256(np.ascontiguousarray(obj).tobytes()).hexdigest()
+        return f"array({obj.dtype.str}, {obj.shape}, {digest})"
+    if isinstance(obj, (list, tuple)):
+        return "[" + ", ".join(_canonical(item) for item in obj) + "]"
+    if isinstance(obj, dict):
+        items = sorted((_canonical(k), _canonical(v)) for k, v in obj.items())
+        return "{" + ", ".join(f"{k}: {v}" for k, v in items) + "}"
+    if isinstance(obj, type):
+        return f"{obj.__module__}.{obj.__qualname__}"
+    if hasattr(obj, "dim_tags"):
+        return f"{type(obj).__name__}{_canonical(obj.dim_tags)}"
+    raise ValueError(f"Cannot compute a cache key for {obj!r}.")
+
+
+def model_hash(*extra) -> str:
+    """Return a hash of the current Gmsh model, its mesh options, and the additional
+    parameters `extra`, e.g., the arguments of `generate_mesh()`. The model must be
+    synchronized.
+    """
+    h = hashlib.sha256()
+    h.update(f"gmsh {gmsh.__version__}, pygmsh {__version__}\n".encode())
+
+    # Gmsh writes the built-in geometry to geo_unrolled directly, OpenCASCADE shapes to
+    # an additional XAO file. The fields are part of the geo_unrolled file.
+    with tempfile.TemporaryDirectory() as tmpdir:
+        with _scoped_options({"General.Terminal": 0}):
+            gmsh.write(os.path.join(tmpdir, "model.geo_unrolled"))
+        for name in sorted(os.listdir(tmpdir)):
+            with open(os.path.join(tmpdir, name), "rb") as f:
+                content = f.read()
+            h.update(name.encode())
+            h.update(content.replace(tmpdir.encode(), b""))
+
+    for dim, tag in gmsh.model.getPhysicalGroups():
+        name = gmsh.model.getPhysicalName(dim, tag)
+        entities = gmsh.model.getEntitiesForPhysicalGroup(dim, tag)
+        h.update(f"physical {dim} {tag} {name} {list(entities)}\n".encode())
+
+    points = gmsh.model.getEntities(0)
+    if len(points) > 0:
+        h.update(_canonical(np.asarray(gmsh.model.mesh.getSizes(points))).encode())
+
+    for key in _MESH_OPTIONS:
+        h.update(f"{key} {gmsh.option.getNumber(key)!r}\n".encode())
+
+    h.update(_canonical(list(extra)).encode())
+    return h.hexdigest()
+
+
+class MeshCache:
+    """
+    Size-bounded store of meshes on disk, one compressed NumPy file per mesh. When the
+    store exceeds `max_size` bytes, the least recently used meshes are removed.
+
+    Parameters
+    ----------
+    directory : Directory of the cache, created if necessary. It can be shared between
+        processes.
+    max_size : Maximum total size of the cached files in bytes.
+
+    Attributes
+    ----------
+    hits : Number of successful lookups by this object.
+    misses : Number of failed lookups by this object.
+    """
+
+    def __init__(self, directory: str | os.PathLike, max_size: int = 2**30):
+        self.directory = pathlib.Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+
+    def __repr__(self):
+        return f"<pygmsh MeshCache in {self.directory}>"
+
+    def _path(self, key: str):
+        return self.directory / f"{key}.npz"
+
+    def _files(self):
+        return list(self.directory.glob("*.npz"))
+
+    def load(self, key: str) -> meshio.Mesh | None:
+        """Return the mesh stored under `key`, or `None`."""
+        path = self._path(key)
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                mesh = _from_arrays(data)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        # mark as recently used
+        os.utime(path)
+        self.hits += 1
+        return mesh
+
+    def store(self, key: str, mesh: meshio.Mesh):
+        """Store `mesh` under `key` and evict old meshes if the cache is too large."""
+        # write to a temporary file first so concurrent readers never see partial files
+        with tempfile.NamedTemporaryFile(
+            dir=self.directory, suffix=".tmp", delete=False
+        ) as f:
+            np.savez_compressed(f, **_to_arrays(mesh))
+        os.replace(f.name, self._path(key))
+        self._evict()
+
+    def _evict(self):
+        entries = []
+        for path in self._files():
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                # removed by another process
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        # never evict the most recent entry
+        for _, size, path in entries[:-1]:
+            if total <= self.max_size:
+                break
+            _unlink(path)
+            total -= size
+
+    def stats(self) -> dict:
+        """Return hits and misses of this object, and the number and total size in
+        bytes of the stored meshes.
+        """
+        sizes = [path.stat().st_size for path in self._files()]
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(sizes),
+            "size": sum(sizes),
+        }
+
+    def clear(self):
+        """Remove all stored meshes."""
+        for path in self._files():
+            _unlink(path)
+
+
+def _to_arrays(mesh):
+    arrays = {
+        "points": mesh.points,
+        "cell_set_names": np.array(list(mesh.cell_sets), dtype=str),
+    }
+    for k, block in enumerate(mesh.cells):
+        arrays[f"cells:{k}:{block.type}"] = block.data
+    for name, blocks in mesh.cell_sets.items():
+        for k, ids in enumerate(blocks):
+            if ids is not None:
+                arrays[f"cell_sets:{name}:{k}"] = ids
+    return arrays
+
+
+def _from_arrays(data):
+    cells = []
+    cell_sets = {}
+    for key in data.files:
+        if key.startswith("cells:"):
+            _, _, cell_type = key.split(":", 2)
+            cells.append((cell_type, data[key]))
+        elif key.startswith("cell_sets:"):
+            name, k = key[len("cell_sets:") :].rsplit(":", 1)
+            cell_sets.setdefault(name, {})[int(k)] = data[key]
+    # blocks are stored in order
+    cell_sets = {
+        name: [cell_sets.get(name, {}).get(k) for k in range(len(cells))]
+        for name in data["cell_set_names"].tolist()
+    }
+    return meshio.Mesh(data["points"], cells, cell_sets=cell_sets)
+
+
+def _unlink(path):
+    # Path.unlink(missing_ok=True) requires Python 3.8
+    try:
+        path.unlink()
+    except FileNotFoundError:
+        pass
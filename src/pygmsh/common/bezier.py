@@ -13,6 +13,8 @@ class Bezier(LineBase):
     control_points : Contains the identification numbers of the control points.
     """
 
+    __slots__ = ()
+
     def __init__(self, env, control_points: list[Point]):
         for c in control_points:
             assert isinstance(c, Point)
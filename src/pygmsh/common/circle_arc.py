@@ -13,6 +13,8 @@ class CircleArc(LineBase):
     end : Coordinates of end point needed to construct circle-arc.
     """
 
+    __slots__ = ()
+
     def __init__(self, env, start: Point, center: Point, end: Point):
         assert isinstance(start, Point)
         assert isinstance(center, Point)
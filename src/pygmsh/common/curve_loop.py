@@ -19,6 +19,7 @@ class CurveLoop:
     """
 
     dim = 1
+    __slots__ = ("_id", "dim_tag", "dim_tags", "curves")
 
     def __init__(self, env, curves: list):
         for k in range(len(curves) - 1):
@@ -1,4 +1,6 @@
 class Dummy:
+    __slots__ = ("dim", "id", "_id", "dim_tag", "dim_tags")
+
     def __init__(self, dim, id0):
         assert isinstance(id0, int)
         self.dim = dim
@@ -14,6 +14,8 @@ class EllipseArc(LineBase):
     end : Coordinates of end point needed to construct elliptic arc.
     """
 
+    __slots__ = ("point_on_major_axis",)
+
     def __init__(
         self, env, start: Point, center: Point, point_on_major_axis: Point, end: Point
     ):
@@ -1,10 +1,27 @@
 from __future__ import annotations
 
+import os
 import warnings
+from typing import Callable
 
 import gmsh
-
-from ..helpers import extract_to_meshio
+import numpy as np
+
+from .._optimize import OptimizationPipeline
+from ..cache import MeshCache, model_hash
+from ..helpers import (
+    _in_session,
+    _scoped_options,
+    extract_to_meshio,
+    iter_mesh_blocks,
+    write,
+)
+from ..memory import MemoryProfile
+from ..metrics import _recorded_generate_mesh
+from ..metrics import active as metrics_active
+from ..profiling import ApiProfiler, Profile, _combine_phases
+from ..progress import Event, Tracker, log_event
+from ..stats import MeshStats, mesh_stats
 from .bezier import Bezier
 from .bspline import BSpline
 from .circle_arc import CircleArc
@@ -14,7 +31,11 @@ from .ellipse_arc import EllipseArc
 from .line import Line
 from .plane_surface import PlaneSurface
 from .point import Point
+from .point_array import PointArray
+from .point_index import PointIndex
 from .polygon import Polygon
+from .recipe import Recorder, decode, recorded
+from .remesh import changed_entities, mesh_settings, remesh
 from .size_field import BoundaryLayer, SetBackgroundMesh
 from .spline import Spline
 from .surface import Surface
@@ -25,11 +46,42 @@ from .volume import Volume
 class CommonGeometry:
     """Geometry base class containing all methods that can be shared between built-in
     and occ.
+
+    If `merge_tolerance` is given, `add_point` returns the existing point for
+    coordinates within that distance of a previously added point, and `add_line`
+    returns the existing (possibly reversed) line between two points. Adjacent
+    polygons then share their corners and edges, giving conforming meshes.
+
+    With `record=True`, all operations are recorded in :attr:`recipe` which can be
+    replayed in another geometry object with :meth:`replay`, e.g., in another process.
+
+    With `profile_api=True`, the calls of the Gmsh kernel API (`gmsh.model.geo` or
+    `gmsh.model.occ`) made while building the geometry are counted and timed in
+    :attr:`api_profile`, a :class:`pygmsh.profiling.ApiProfiler`. With `dry_run=True`,
+    `generate_mesh()` only builds the model and applies the mesh constraints, but
+    doesn't mesh; together, they show the cost of the geometry construction alone.
     """
 
-    def __init__(self, env, init_argv=None):
-        self.env = env
+    def __init__(
+        self,
+        env,
+        init_argv=None,
+        merge_tolerance: float | None = None,
+        record: bool = False,
+        profile_api: bool = False,
+        dry_run: bool = False,
+    ):
+        self._KERNEL = "occ" if env is gmsh.model.occ else "geo"
+        # call statistics of the kernel API, see profiling.ApiProfiler
+        self.api_profile = ApiProfiler(env) if profile_api else None
+        self.env = env if self.api_profile is None else self.api_profile
+        self._DRY_RUN = dry_run
         self.init_argv = init_argv
+        self._POINT_INDEX = (
+            None if merge_tolerance is None else PointIndex(merge_tolerance)
+        )
+        # (start, end) point tags -> straight line, only used for merging
+        self._LINES = {}
         self._COMPOUND_ENTITIES = []
         self._RECOMBINE_ENTITIES = []
         self._EMBED_QUEUE = []
@@ -40,9 +92,35 @@ class CommonGeometry:
         self._SIZE_QUEUE = []
         self._PHYSICAL_QUEUE = []
         self._OUTWARD_NORMALS = []
+        # (dim, tag) -> pygmsh handle of all elementary entities
+        self._ENTITIES = {}
+        # option name -> value before this object first set it
+        self._OPTIONS = {}
+        self._SIZE_CALLBACK = None
+        # fields and physical groups are only added to the model once
+        self._NUM_APPLIED_AFTER_SYNC = 0
+        self._NUM_APPLIED_PHYSICALS = 0
+        # mesh settings at the last generate_mesh(incremental=True)
+        self._MESH_SETTINGS = None
+        # the entities meshed by the last generate_mesh()
+        self.remeshed_entities = None
+        # timings of the last generate_mesh(profile=True)
+        self.profile = None
+        # phase timings of the last generate_mesh() for pygmsh.metrics
+        self._TIMINGS = None
+        # whether the last generate_mesh(cache=...) found the mesh in the cache
+        self.cache_hit = None
+        # memory high-water marks of the last generate_mesh(memory=True)
+        self.memory = None
+        self._RECORDER = Recorder(self._KERNEL) if record else None
 
     def __enter__(self):
-        gmsh.initialize([] if self.init_argv is None else self.init_argv)
+        if _in_session():
+            # Gmsh is already running, see pygmsh.session(); just start afresh
+            with _scoped_options({"General.Terminal": 0}):
+                gmsh.clear()
+        else:
+            gmsh.initialize([] if self.init_argv is None else self.init_argv)
         gmsh.model.add("pygmsh model")
         return self
 
@@ -53,53 +131,162 @@ class CommonGeometry:
             gmsh.model.mesh.removeSizeCallback()
         except AttributeError:
             pass
-        gmsh.finalize()
+        for key, value in self._OPTIONS.items():
+            gmsh.option.setNumber(key, value)
+        self._OPTIONS = {}
+        if _in_session():
+            with _scoped_options({"General.Terminal": 0}):
+                gmsh.clear()
+        else:
+            gmsh.finalize()
+
+    def _set_option(self, key: str, value: float):
+        """Set a Gmsh number option. The previous value is restored on exit."""
+        if key not in self._OPTIONS:
+            self._OPTIONS[key] = gmsh.option.getNumber(key)
+        gmsh.option.setNumber(key, value)
 
     def synchronize(self):
         self.env.synchronize()
 
+    def _register(self, entity):
+        for dim_tag in entity.dim_tags:
+            self._ENTITIES[dim_tag] = entity
+        return entity
+
+    def _unregister(self, entities):
+        """Remove the entities from the registry and discard their mesh sizes. Returns
+        the entities of the size queue that were discarded.
+        """
+        dim_tags = {dim_tag for e in entities for dim_tag in e.dim_tags}
+        for dim_tag in dim_tags:
+            self._ENTITIES.pop(dim_tag, None)
+
+        size_queue = []
+        discarded = []
+        for s in self._SIZE_QUEUE:
+            if any(dim_tag in dim_tags for dim_tag in s[0].dim_tags):
+                discarded.append(s[0])
+            else:
+                size_queue.append(s)
+        self._SIZE_QUEUE = size_queue
+        return discarded
+
+    @property
+    def recipe(self) -> dict:
+        """The operations recorded so far, as plain data that can be pickled and, unless
+        callables were passed, stored as JSON. Requires `record=True`.
+        """
+        if self._RECORDER is None:
+            raise ValueError("Operations aren't recorded. Use record=True.")
+        return self._RECORDER.recipe()
+
+    def replay(self, recipe: dict):
+        """Perform the operations of a recipe recorded with `record=True`. Returns the
+        results of all operations.
+        """
+        if recipe["kernel"] != self._KERNEL:
+            raise ValueError(
+                f"Can't replay a {recipe['kernel']} recipe with the {self._KERNEL} "
+                "kernel."
+            )
+        results = []
+        for op in recipe["ops"]:
+            args = decode(op["args"], results)
+            kwargs = {key: decode(val, results) for key, val in op["kwargs"].items()}
+            if isinstance(getattr(type(self), op["op"]), property):
+                # property setters, e.g., characteristic_length_max
+                setattr(self, op["op"], *args)
+                results.append(None)
+            else:
+                results.append(getattr(self, op["op"])(*args, **kwargs))
+        return results
+
+    def get_entity(self, dim: int, tag: int):
+        """Return the pygmsh object of the elementary entity `(dim, tag)`. Points
+        created in bulk with :meth:`add_points` aren't tracked.
+        """
+        return self._ENTITIES[(dim, tag)]
+
     def __repr__(self):
         return "<pygmsh Geometry object>"
 
+    @recorded
     def add_bspline(self, *args, **kwargs):
-        return BSpline(self.env, *args, **kwargs)
+        return self._register(BSpline(self.env, *args, **kwargs))
 
+    @recorded
     def add_bezier(self, *args, **kwargs):
-        return Bezier(self.env, *args, **kwargs)
+        return self._register(Bezier(self.env, *args, **kwargs))
 
+    @recorded
     def add_circle_arc(self, *args, **kwargs):
-        return CircleArc(self.env, *args, **kwargs)
+        return self._register(CircleArc(self.env, *args, **kwargs))
 
+    @recorded
     def add_ellipse_arc(self, *args, **kwargs):
-        return EllipseArc(self.env, *args, **kwargs)
+        return self._register(EllipseArc(self.env, *args, **kwargs))
 
-    def add_line(self, *args, **kwargs):
-        return Line(self.env, *args, **kwargs)
+    @recorded
+    def add_line(self, p0, p1):
+        if self._POINT_INDEX is None:
+            return self._register(Line(self.env, p0, p1))
 
+        if (p0._id, p1._id) in self._LINES:
+            return self._LINES[(p0._id, p1._id)]
+        if (p1._id, p0._id) in self._LINES:
+            return -self._LINES[(p1._id, p0._id)]
+
+        line = self._register(Line(self.env, p0, p1))
+        self._LINES[(p0._id, p1._id)] = line
+        return line
+
+    @recorded
     def add_curve_loop(self, *args, **kwargs):
         return CurveLoop(self.env, *args, **kwargs)
 
+    @recorded
     def add_plane_surface(self, *args, **kwargs):
-        return PlaneSurface(self.env, *args, **kwargs)
-
-    def add_point(self, *args, **kwargs):
-        return Point(self.env, *args, **kwargs)
-
+        return self._register(PlaneSurface(self.env, *args, **kwargs))
+
+    @recorded
+    def add_point(self, x, mesh_size: float | None = None):
+        if self._POINT_INDEX is None:
+            return self._register(Point(self.env, x, mesh_size=mesh_size))
+
+        if len(x) == 2:
+            x = (x[0], x[1], 0.0)
+        point = self._POINT_INDEX.find(x)
+        if point is None:
+            point = self._register(Point(self.env, x, mesh_size=mesh_size))
+            self._POINT_INDEX.add(point)
+        return point
+
+    @recorded
+    def add_points(self, *args, **kwargs):
+        return PointArray(self.env, *args, **kwargs)
+
+    @recorded
     def add_spline(self, *args, **kwargs):
-        return Spline(self.env, *args, **kwargs)
+        return self._register(Spline(self.env, *args, **kwargs))
 
+    @recorded
     def add_surface(self, *args, **kwargs):
-        return Surface(self.env, *args, **kwargs)
+        return self._register(Surface(self.env, *args, **kwargs))
 
+    @recorded
     def add_surface_loop(self, *args, **kwargs):
         return SurfaceLoop(self.env, *args, **kwargs)
 
+    @recorded
     def add_volume(self, *args, **kwargs):
-        return Volume(self.env, *args, **kwargs)
+        return self._register(Volume(self.env, *args, **kwargs))
 
+    @recorded
     def add_polygon(self, *args, **kwargs):
         return Polygon(self, *args, **kwargs)
 
+    @recorded
     def add_physical(self, entities, label: str | None = None):
         if label in [label for _, label in self._PHYSICAL_QUEUE]:
             raise ValueError(f'Label "{label}" already exists.')
@@ -124,25 +311,30 @@ class CommonGeometry:
 
         self._PHYSICAL_QUEUE.append((entities, label))
 
+    @recorded
     def set_transfinite_curve(
         self, curve, num_nodes: int, mesh_type: str, coeff: float
     ):
         assert mesh_type in ["Progression", "Bump", "Beta"]
         self._TRANSFINITE_CURVE_QUEUE.append((curve._id, num_nodes, mesh_type, coeff))
 
+    @recorded
     def set_transfinite_surface(self, surface, arrangement: str, corner_pts):
         corner_tags = [pt._id for pt in corner_pts]
         self._TRANSFINITE_SURFACE_QUEUE.append((surface._id, arrangement, corner_tags))
 
+    @recorded
     def set_transfinite_volume(self, volume, corner_pts):
         corner_tags = [pt._id for pt in corner_pts]
         self._TRANSFINITE_VOLUME_QUEUE.append((volume._id, corner_tags))
 
+    @recorded
     def set_recombined_surfaces(self, surfaces):
         for i, surface in enumerate(surfaces):
             assert surface.dim == 2, f"item {i} is not a surface"
         self._RECOMBINE_ENTITIES += [s.dim_tags[0] for s in surfaces]
 
+    @recorded
     def extrude(
         self,
         input_entity,
@@ -175,9 +367,9 @@ class CommonGeometry:
             heights=heights,
             recombine=recombine,
         )
-        top = Dummy(*out_dim_tags[0])
-        extruded = Dummy(*out_dim_tags[1])
-        lateral = [Dummy(*e) for e in out_dim_tags[2:]]
+        top = self._register(Dummy(*out_dim_tags[0]))
+        extruded = self._register(Dummy(*out_dim_tags[1]))
+        lateral = [self._register(Dummy(*e)) for e in out_dim_tags[2:]]
         return top, extruded, lateral
 
     def _revolve(
@@ -214,11 +406,12 @@ class CommonGeometry:
             recombine=recombine,
         )
 
-        top = Dummy(*out_dim_tags[0])
-        extruded = Dummy(*out_dim_tags[1])
-        lateral = [Dummy(*e) for e in out_dim_tags[2:]]
+        top = self._register(Dummy(*out_dim_tags[0]))
+        extruded = self._register(Dummy(*out_dim_tags[1]))
+        lateral = [self._register(Dummy(*e)) for e in out_dim_tags[2:]]
         return top, extruded, lateral
 
+    @recorded
     def translate(self, obj, vector: tuple[float, float, float]):
         """Translates input_entity itself by vector.
 
@@ -226,6 +419,7 @@ class CommonGeometry:
         """
         self.env.translate(obj.dim_tags, *vector)
 
+    @recorded
     def rotate(
         self,
         obj,
@@ -240,42 +434,52 @@ class CommonGeometry:
         """
         self.env.rotate(obj.dim_tags, *point, *axis, angle)
 
+    @recorded
     def copy(self, obj):
         dim_tag = self.env.copy(obj.dim_tags)
         assert len(dim_tag) == 1
-        return Dummy(*dim_tag[0])
+        return self._register(Dummy(*dim_tag[0]))
 
+    @recorded
     def symmetrize(self, obj, coefficients: tuple[float, float, float, float]):
         """Transforms all elementary entities symmetrically to a plane. The vector
         should contain four expressions giving the coefficients of the plane's equation.
         """
         self.env.symmetrize(obj.dim_tags, *coefficients)
 
+    @recorded
     def dilate(
         self, obj, x0: tuple[float, float, float], abc: tuple[float, float, float]
     ):
         self.env.dilate(obj.dim_tags, *x0, *abc)
 
+    @recorded
     def mirror(self, obj, abcd: tuple[float, float, float, float]):
         self.env.mirror(obj.dim_tags, *abcd)
 
+    @recorded
     def remove(self, obj, recursive: bool = False):
         self.env.remove(obj.dim_tags, recursive=recursive)
+        self._unregister([obj])
 
+    @recorded
     def in_surface(self, input_entity, surface):
         """Embed the point(s) or curve(s) in the given surface. The surface mesh will
         conform to the mesh of the point(s) or curves(s).
         """
         self._EMBED_QUEUE.append((input_entity, surface))
 
+    @recorded
     def in_volume(self, input_entity, volume):
         """Embed the point(s)/curve(s)/surface(s) in the given volume. The volume mesh
         will conform to the mesh of the input entities.
         """
         self._EMBED_QUEUE.append((input_entity, volume))
 
+    @recorded
     def set_mesh_size_callback(self, fun, ignore_other_mesh_sizes=True):
         gmsh.model.mesh.setSizeCallback(fun)
+        self._SIZE_CALLBACK = fun
         #
         # If a mesh size is set from a function, ignore the mesh sizes from the
         # entities.
@@ -301,19 +505,32 @@ class CommonGeometry:
         # default).
         # ```
         if ignore_other_mesh_sizes:
-            gmsh.option.setNumber("Mesh.CharacteristicLengthExtendFromBoundary", 0)
-            gmsh.option.setNumber("Mesh.CharacteristicLengthFromPoints", 0)
-            gmsh.option.setNumber("Mesh.CharacteristicLengthFromCurvature", 0)
+            self._set_option("Mesh.CharacteristicLengthExtendFromBoundary", 0)
+            self._set_option("Mesh.CharacteristicLengthFromPoints", 0)
+            self._set_option("Mesh.CharacteristicLengthFromCurvature", 0)
+
+    @recorded
+    def set_mesh_size(self, entities, size: float):
+        """Set the mesh size at all points on the boundary of the entities, overriding
+        previous sizes. Takes effect at the next :meth:`generate_mesh`.
+        """
+        if not isinstance(entities, list):
+            entities = [entities]
+        for e in entities:
+            self._SIZE_QUEUE.append((e, size))
 
+    @recorded
     def add_boundary_layer(self, *args, **kwargs):
         layer = BoundaryLayer(*args, **kwargs)
         self._AFTER_SYNC_QUEUE.append(layer)
         return layer
 
+    @recorded
     def set_background_mesh(self, *args, **kwargs):
         setter = SetBackgroundMesh(*args, **kwargs)
         self._AFTER_SYNC_QUEUE.append(setter)
 
+    @_recorded_generate_mesh
     def generate_mesh(  # noqa: C901
         self,
         dim: int = 3,
@@ -321,64 +538,334 @@ class CommonGeometry:
         # http://gmsh.info/doc/texinfo/gmsh.html#index-Mesh_002eAlgorithm
         algorithm: int | None = None,
         verbose: bool = False,
+        # http://gmsh.info/doc/texinfo/gmsh.html#index-Mesh_002eAlgorithm3D, e.g., 10
+        # for the parallel HXT
+        algorithm_3d: int | None = None,
+        num_threads: int | None = None,
+        max_num_threads: tuple[int, int, int] | None = None,
+        point_dtype=np.float64,
+        cell_dtype=np.int64,
+        extract: bool = True,
+        cell_dims: list[int] | None = None,
+        physical_labels: list[str] | None = None,
+        out: str | None = None,
+        write_options: dict | None = None,
+        cache: MeshCache | str | os.PathLike | None = None,
+        incremental: bool = False,
+        optimize: list[str | tuple[str, int]] | OptimizationPipeline | None = None,
+        profile: bool = False,
+        progress: Callable[[Event], None] | bool = False,
+        memory: bool = False,
+        memory_limit: int | None = None,
     ):
         """Return a meshio.Mesh, storing the mesh points, cells, and data, generated by
         Gmsh from the `self`.
-        """
-        self.synchronize()
-
-        for item in self._AFTER_SYNC_QUEUE:
-            item.exec()
-
-        for item, host in self._EMBED_QUEUE:
-            gmsh.model.mesh.embed(item.dim, [item._id], host.dim, host._id)
-
-        # set compound entities after sync
-        for c in self._COMPOUND_ENTITIES:
-            gmsh.model.mesh.setCompound(*c)
 
-        for s in self._RECOMBINE_ENTITIES:
-            gmsh.model.mesh.setRecombine(*s)
-
-        for t in self._TRANSFINITE_CURVE_QUEUE:
-            gmsh.model.mesh.setTransfiniteCurve(*t)
-
-        for t in self._TRANSFINITE_SURFACE_QUEUE:
-            gmsh.model.mesh.setTransfiniteSurface(*t)
+        `num_threads` sets the number of threads Gmsh uses (0: system default), and
+        `max_num_threads` the maximum for 1D, 2D, and 3D meshing, respectively. Like the
+        algorithms, they only apply to this call.
+
+        Use `point_dtype=numpy.float32` and/or `cell_dtype=numpy.int32` to reduce the
+        memory footprint of large meshes. `cell_dims` and `physical_labels` restrict the
+        returned cells to the given dimensions and/or physical groups; points not
+        referenced by those cells are dropped. With `extract=False`, the mesh is only
+        generated in Gmsh and `None` is returned; use `iter_mesh_blocks()` to retrieve
+        it chunk by chunk, or `mesh_stats()` for its counts.
+
+        If `out` is given, the mesh is written to that file directly by Gmsh.
+        `write_options` are passed to :func:`pygmsh.write`, e.g., `{"msh_version": 2.2,
+        "binary": True}`; like the other options, they only apply to this call.
+
+        If `cache` (a :class:`pygmsh.cache.MeshCache` or a directory) is given, the mesh
+        is looked up there by a hash of the model and the meshing parameters, and only
+        generated and stored if it isn't found. On a hit, Gmsh doesn't hold the mesh.
+        `self.cache_hit` tells whether the mesh was found (`None` without `cache`).
+        Models with a mesh size callback can't be cached.
+
+        With `incremental=True`, the mesh settings are compared to the ones of the last
+        incremental call. If only the sizes, transfinite, recombine, or embedding settings
+        of some entities changed (e.g., by :meth:`set_mesh_size`), only these entities
+        and the ones they bound are regenerated; the meshes of all other volumes are kept.
+        Gmsh re-meshes unchanged surfaces anyway, which gives identical meshes. Any other
+        change, e.g., of the geometry, fields, or options, regenerates the full mesh. The
+        regenerated entities are listed in `remeshed_entities`.
+
+        `optimize` is a list of optimization methods, optionally with a number of
+        iterations, e.g., `["Netgen", ("Laplace2D", 5)]`, that are applied to the mesh
+        in Gmsh before extraction, see :meth:`optimize_mesh`. The HighOrder methods run
+        after the elements have been raised to `order`, all others before. With a
+        :class:`pygmsh.OptimizationPipeline`, the optimizers run until the mesh quality
+        is good enough; the pipeline runs before raising the order, and its `passes`
+        hold the timings and qualities.
+
+        With `profile=True`, the wall and CPU time and the node and element counts of
+        every phase (synchronization, the mesh constraints, the generation of each
+        dimension, extraction, ...) are recorded in `self.profile`, a
+        :class:`pygmsh.profiling.Profile`. The dimensions are then meshed one at a
+        time.
+
+        `progress` is called with a :class:`pygmsh.progress.Event` at the start and end
+        of every phase, and for every entity Gmsh meshes and every warning and error it
+        reports. With `progress=True`, the events go to the "pygmsh" logger of Python's
+        `logging`. The dimensions are then meshed one at a time, too. Gmsh's messages
+        are read from its terminal output, which is redirected while a phase runs; they
+        are timestamped as they arrive, and sent when the phase ends.
+
+        With `memory=True`, the peak resident set size of the process and the peak of
+        the Python heap of every phase are recorded in `self.memory`, a
+        :class:`pygmsh.memory.MemoryProfile`. With `memory_limit` (in bytes), a
+        `MemoryError` is raised after the first phase in which the resident set size
+        exceeded the limit; if that happens while meshing, the mesh is removed from
+        Gmsh. Gmsh can't be interrupted while it meshes, so the dimensions are meshed
+        one at a time to check the limit in between.
+
+        If the geometry was created with `dry_run=True`, the model is only built and
+        the mesh constraints are applied; nothing is meshed and `None` is returned.
+        """
+        pipeline = None
+        if isinstance(optimize, OptimizationPipeline):
+            pipeline, optimize = optimize, []
+        optimize = [
+            (step, 1) if isinstance(step, str) else tuple(step)
+            for step in ([] if optimize is None else optimize)
+        ]
+
+        if cache is not None:
+            if not extract or out is not None:
+                raise ValueError("cache requires extract=True and out=None.")
+            if self._SIZE_CALLBACK is not None:
+                raise ValueError("Meshes with a mesh size callback can't be cached.")
+            if not isinstance(cache, MeshCache):
+                cache = MeshCache(cache)
+
+        # the phases are also timed for pygmsh.metrics, but only profile=True changes
+        # how the mesh is generated
+        self._TIMINGS = None
+        if profile or metrics_active() is not None:
+            self._TIMINGS = Profile()
+        self.profile = self._TIMINGS if profile else None
+        self.cache_hit = None
+        self.memory = None
+        if memory or memory_limit is not None:
+            self.memory = MemoryProfile(limit=memory_limit)
+        tracker = None
+        if progress:
+            tracker = Tracker(log_event if progress is True else progress, echo=verbose)
+        phase = _combine_phases(
+            None if self._TIMINGS is None else self._TIMINGS.phase,
+            None if tracker is None else tracker.phase,
+            None if self.memory is None else self.memory.phase,
+        )
 
-        for e in self._TRANSFINITE_VOLUME_QUEUE:
-            gmsh.model.mesh.setTransfiniteVolume(*e)
+        with phase("synchronize"):
+            self.synchronize()
+
+        with phase("after_sync"):
+            for item in self._AFTER_SYNC_QUEUE[self._NUM_APPLIED_AFTER_SYNC :]:
+                item.exec()
+            self._NUM_APPLIED_AFTER_SYNC = len(self._AFTER_SYNC_QUEUE)
+
+        with phase("embed"):
+            for item, host in self._EMBED_QUEUE:
+                gmsh.model.mesh.embed(item.dim, [item._id], host.dim, host._id)
+
+        with phase("compound_recombine"):
+            # set compound entities after sync
+            for c in self._COMPOUND_ENTITIES:
+                gmsh.model.mesh.setCompound(*c)
+
+            for s in self._RECOMBINE_ENTITIES:
+                gmsh.model.mesh.setRecombine(*s)
+
+        with phase("transfinite"):
+            for t in self._TRANSFINITE_CURVE_QUEUE:
+                gmsh.model.mesh.setTransfiniteCurve(*t)
+
+            for t in self._TRANSFINITE_SURFACE_QUEUE:
+                gmsh.model.mesh.setTransfiniteSurface(*t)
+
+            for e in self._TRANSFINITE_VOLUME_QUEUE:
+                gmsh.model.mesh.setTransfiniteVolume(*e)
+
+        with phase("sizes"):
+            for item, size in self._SIZE_QUEUE:
+                gmsh.model.mesh.setSize(
+                    gmsh.model.getBoundary(item.dim_tags, False, False, True), size
+                )
+
+        with phase("physical_groups"):
+            for entities, label in self._PHYSICAL_QUEUE[self._NUM_APPLIED_PHYSICALS :]:
+                d = entities[0].dim
+                assert all(e.dim == d for e in entities)
+                tag = gmsh.model.addPhysicalGroup(d, [e._id for e in entities])
+                if label is not None:
+                    gmsh.model.setPhysicalName(d, tag, label)
+            self._NUM_APPLIED_PHYSICALS = len(self._PHYSICAL_QUEUE)
+
+            for entity in self._OUTWARD_NORMALS:
+                gmsh.model.mesh.setOutwardOrientation(entity.id)
+
+        if self._DRY_RUN:
+            return None
+
+        if cache is not None:
+            with phase("cache_lookup"):
+                # everything else is part of the Gmsh model at this point
+                key = model_hash(
+                    type(self),
+                    self._EMBED_QUEUE,
+                    self._COMPOUND_ENTITIES,
+                    self._RECOMBINE_ENTITIES,
+                    self._TRANSFINITE_CURVE_QUEUE,
+                    self._TRANSFINITE_SURFACE_QUEUE,
+                    self._TRANSFINITE_VOLUME_QUEUE,
+                    self._OUTWARD_NORMALS,
+                    [dim, order, algorithm, algorithm_3d, num_threads, max_num_threads],
+                    optimize,
+                    None
+                    if pipeline is None
+                    else [
+                        pipeline.methods,
+                        pipeline.min_quality,
+                        pipeline.time_budget,
+                        pipeline.max_rounds,
+                        pipeline.quality_name,
+                    ],
+                    [np.dtype(point_dtype).str, np.dtype(cell_dtype).str],
+                    [cell_dims, physical_labels],
+                )
+                mesh = cache.load(key)
+            self.cache_hit = mesh is not None
+            if mesh is not None:
+                return mesh
+
+        self._set_option("General.Terminal", 1 if verbose else 0)
+
+        # algorithms and multithreading, only for this call
+        # http://gmsh.info/doc/texinfo/gmsh.html#index-Mesh_002eAlgorithm
+        options = {
+            "Mesh.Algorithm": algorithm if algorithm else None,
+            "Mesh.Algorithm3D": algorithm_3d,
+            "General.NumThreads": num_threads,
+        }
+        if max_num_threads is not None:
+            assert len(max_num_threads) == 3
+            for d, n in enumerate(max_num_threads):
+                options[f"Mesh.MaxNumThreads{d + 1}D"] = n
+
+        settings = None
+        entities = None
+        if incremental:
+            settings = mesh_settings(self, dim, order, algorithm, algorithm_3d)
+            if (
+                self._MESH_SETTINGS is not None
+                and order is None
+                and self._SIZE_CALLBACK is None
+            ):
+                entities = changed_entities(self._MESH_SETTINGS, settings)
 
-        for item, size in self._SIZE_QUEUE:
-            gmsh.model.mesh.setSize(
-                gmsh.model.getBoundary(item.dim_tags, False, False, True), size
+        try:
+            with _scoped_options(options):
+                if entities is None:
+                    if self.profile is None and tracker is None and self.memory is None:
+                        with phase("generate"):
+                            gmsh.model.mesh.generate(dim)
+                    else:
+                        for d in range(1, dim + 1):
+                            with phase(f"generate_{d}d"):
+                                gmsh.model.mesh.generate(d)
+                    entities = [e for e in gmsh.model.getEntities() if e[0] <= dim]
+                elif len(entities) > 0:
+                    with phase("remesh"):
+                        entities = remesh(entities, dim)
+                self.remeshed_entities = sorted(entities)
+                self._MESH_SETTINGS = settings
+
+                high_order = [m.startswith("HighOrder") for m, _ in optimize]
+                if len(entities) > 0 and (pipeline is not None or not all(high_order)):
+                    with phase("optimize"):
+                        for method, niter in optimize:
+                            if not method.startswith("HighOrder"):
+                                self.optimize_mesh(method, niter)
+                        if pipeline is not None:
+                            pipeline.run()
+
+                # setOrder() after generate(), see
+                # <https://github.com/nschloe/pygmsh/issues/515#issuecomment-1020106499>
+                if order is not None:
+                    with phase("set_order"):
+                        gmsh.model.mesh.setOrder(order)
+
+                if len(entities) > 0 and any(high_order):
+                    with phase("optimize_high_order"):
+                        for method, niter in optimize:
+                            if method.startswith("HighOrder"):
+                                self.optimize_mesh(method, niter)
+        except MemoryError:
+            # free Gmsh's memory; the next call meshes from scratch
+            self._MESH_SETTINGS = None
+            gmsh.model.mesh.clear()
+            raise
+
+        if out is not None:
+            with phase("write"):
+                write(out, **(write_options or {}))
+
+        if not extract:
+            return None
+
+        with phase("extract"):
+            mesh = extract_to_meshio(
+                point_dtype=point_dtype,
+                cell_dtype=cell_dtype,
+                cell_dims=cell_dims,
+                physical_labels=physical_labels,
             )
+        if cache is not None:
+            with phase("cache_store"):
+                cache.store(key, mesh)
+        return mesh
 
-        for entities, label in self._PHYSICAL_QUEUE:
-            d = entities[0].dim
-            assert all(e.dim == d for e in entities)
-            tag = gmsh.model.addPhysicalGroup(d, [e._id for e in entities])
-            if label is not None:
-                gmsh.model.setPhysicalName(d, tag, label)
-
-        for entity in self._OUTWARD_NORMALS:
-            gmsh.model.mesh.setOutwardOrientation(entity.id)
-
-        gmsh.option.setNumber("General.Terminal", 1 if verbose else 0)
-
-        # set algorithm
-        # http://gmsh.info/doc/texinfo/gmsh.html#index-Mesh_002eAlgorithm
-        if algorithm:
-            gmsh.option.setNumber("Mesh.Algorithm", algorithm)
-
-        gmsh.model.mesh.generate(dim)
+    def optimize_mesh(
+        self,
+        method: str = "",
+        niter: int = 1,
+        entities: list | None = None,
+        force: bool = False,
+    ):
+        """Optimize the generated mesh in place with `gmsh.model.mesh.optimize()`,
+        e.g., with method "Netgen", "Laplace2D", or "HighOrder", see
+        <https://gmsh.info/doc/texinfo/gmsh.html#Namespace-gmsh_002fmodel_002fmesh>.
+        Unlike :func:`pygmsh.optimize`, this doesn't copy the mesh and keeps its
+        classification on the geometry, which some optimizers need.
+
+        :param method: optimizer, "" for the default tetrahedral optimizer
+        :param niter: number of iterations
+        :param entities: only optimize the mesh of these entities
+        :param force: also optimize discrete entities
+        """
+        dim_tags = [] if entities is None else [d for e in entities for d in e.dim_tags]
+        gmsh.model.mesh.optimize(method, force=force, niter=niter, dimTags=dim_tags)
 
-        # setOrder() after generate(), see
-        # <https://github.com/nschloe/pygmsh/issues/515#issuecomment-1020106499>
-        if order is not None:
-            gmsh.model.mesh.setOrder(order)
+    def iter_mesh_blocks(
+        self,
+        by: str = "entity",
+        chunk_size: int = 2**20,
+        point_dtype=np.float64,
+        cell_dtype=np.int64,
+    ):
+        """Iterate over the generated mesh in chunks of at most `chunk_size` points or
+        cells, see :func:`pygmsh.helpers.iter_mesh_blocks`.
+        """
+        return iter_mesh_blocks(
+            by=by, chunk_size=chunk_size, point_dtype=point_dtype, cell_dtype=cell_dtype
+        )
 
-        return extract_to_meshio()
+    def mesh_stats(self, per_entity: bool = False) -> MeshStats:
+        """Node and element counts and bounding boxes of the generated mesh, per entity
+        and physical group, without extracting it, see :func:`pygmsh.stats.mesh_stats`.
+        """
+        return mesh_stats(per_entity=per_entity)
 
     def save_geometry(self, filename: str):
         # filename is typically a geo_unrolled or brep file
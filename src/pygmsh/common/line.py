@@ -18,6 +18,7 @@ class Line(LineBase):
     """
 
     dim = 1
+    __slots__ = ()
 
     def __init__(self, env, p0: Point, p1: Point):
         assert isinstance(p0, Point)
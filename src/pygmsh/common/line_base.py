@@ -5,6 +5,7 @@ import copy
 
 class LineBase:
     dim = 1
+    __slots__ = ("_id", "dim_tag", "dim_tags", "points")
 
     def __init__(self, id0: int, points: list[int]):
         self._id = id0
@@ -13,7 +14,8 @@ class LineBase:
         self.points = points
 
     def __neg__(self):
-        neg_self = copy.deepcopy(self)
+        # Shallow copy with flipped orientation; the points are shared, not copied.
+        neg_self = copy.copy(self)
         neg_self._id = -self._id
         neg_self.points = self.points[::-1]
         return neg_self
@@ -27,6 +27,7 @@ class PlaneSurface:
     """
 
     dim = 2
+    __slots__ = ("curve_loop", "holes", "num_edges", "_id", "dim_tag", "dim_tags")
 
     def __init__(self, env, curve_loop, holes=None):
         assert isinstance(curve_loop, CurveLoop)
@@ -19,6 +19,7 @@ class Point:
     """
 
     dim = 0
+    __slots__ = ("x", "_id", "dim_tag", "dim_tags")
 
     def __init__(
         self,
@@ -38,6 +39,23 @@ class Point:
         self.dim_tag = (0, self._id)
         self.dim_tags = [self.dim_tag]
 
+    @classmethod
+    def from_tag(cls, x, tag: int):
+        """Return a handle for the existing Gmsh point `tag` at `x`."""
+        point = cls.__new__(cls)
+        point.x = tuple(x)
+        point._id = tag
+        point.dim_tag = (0, tag)
+        point.dim_tags = [point.dim_tag]
+        return point
+
+    def __eq__(self, other):
+        # several handles may refer to the same Gmsh point
+        return isinstance(other, Point) and self._id == other._id
+
+    def __hash__(self):
+        return hash(self.dim_tag)
+
     def __repr__(self):
         X = ", ".join(str(x) for x in self.x)
         return f"<pygmsh Point object, ID {self._id}, x = [{X}]>"
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+from .point import Point
+
+
+class PointArray:
+    """
+    Creates many elementary points at once. The point tags are stored in one array
+    instead of one Python object per point.
+
+    Parameters
+    ----------
+    x : Array of shape (n, 2) or (n, 3) with the point coordinates.
+    mesh_size : The prescribed mesh element size at the points, either one value for
+        all points or one value per point (NaN for no prescribed size).
+
+
+    Attributes
+    ----------
+    x : numpy.ndarray
+        Point coordinates, shape (n, 3).
+    tags : numpy.ndarray
+        Gmsh point tags, shape (n,).
+    """
+
+    dim = 0
+
+    def __init__(
+        self,
+        env,
+        x: ArrayLike,
+        mesh_size: float | ArrayLike | None = None,
+    ):
+        x = np.asarray(x, dtype=float)
+        assert x.ndim == 2
+        if x.shape[1] == 2:
+            x = np.column_stack([x, np.zeros(len(x))])
+        assert x.shape[1] == 3
+
+        # Gmsh's "no mesh size" is 0
+        if mesh_size is None:
+            mesh_size = np.zeros(len(x))
+        else:
+            mesh_size = np.broadcast_to(np.asarray(mesh_size, dtype=float), len(x))
+            mesh_size = np.where(np.isnan(mesh_size), 0.0, mesh_size)
+
+        add_point = env.addPoint
+        self.tags = np.array(
+            [
+                add_point(*xx, meshSize=size)
+                for xx, size in zip(x.tolist(), mesh_size.tolist())
+            ],
+            dtype=int,
+        )
+        self.x = x
+
+    @property
+    def dim_tags(self):
+        return [(0, tag) for tag in self.tags.tolist()]
+
+    def __len__(self):
+        return len(self.tags)
+
+    def __getitem__(self, k: int):
+        """Return a Point handle for the k-th point."""
+        return Point.from_tag(self.x[k], int(self.tags[k]))
+
+    def __iter__(self):
+        for k in range(len(self)):
+            yield self[k]
+
+    def __repr__(self):
+        return f"<pygmsh PointArray object, {len(self)} points>"
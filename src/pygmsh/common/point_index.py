@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import itertools
+import math
+
+
+class PointIndex:
+    """
+    Spatial hash for finding points within a distance `tol` of a query in O(1).
+
+    Parameters
+    ----------
+    tol : Points closer than this are considered coincident.
+    """
+
+    # offsets of the neighboring grid cells
+    _OFFSETS = list(itertools.product((-1, 0, 1), repeat=3))
+
+    def __init__(self, tol: float):
+        assert tol > 0.0
+        self.tol = tol
+        self._cells = {}
+
+    def _key(self, x):
+        return tuple(math.floor(xx / self.tol) for xx in x)
+
+    def find(self, x):
+        """Return the point coincident with `x`, or `None`."""
+        key = self._key(x)
+        tol2 = self.tol**2
+        for offset in self._OFFSETS:
+            cell = self._cells.get(
+                (key[0] + offset[0], key[1] + offset[1], key[2] + offset[2])
+            )
+            if cell is None:
+                continue
+            for point in cell:
+                if sum((a - b) ** 2 for a, b in zip(point.x, x)) <= tol2:
+                    return point
+        return None
+
+    def add(self, point):
+        key = self._key(point.x)
+        if key not in self._cells:
+            self._cells[key] = []
+        self._cells[key].append(point)
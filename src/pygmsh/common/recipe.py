@@ -0,0 +1,154 @@
+"""Recording of geometry operations into a plain-data recipe that can be stored, sent to
+other processes, and replayed.
+
+A recipe is a dict
+
+    {"kernel": "geo", "ops": [{"op": "add_box", "args": [...], "kwargs": {...}}, ...]}
+
+containing only lists, dicts, strings, and numbers, unless callables (e.g., a mesh size
+callback) were passed to a recorded method. Arguments that are pygmsh objects are
+stored as references to the results of earlier operations, `{"ref": k, "path": [...]}`,
+where the path is a sequence of indices and attribute names.
+"""
+from __future__ import annotations
+
+import functools
+from collections import deque
+
+import numpy as np
+
+from .line_base import LineBase
+from .point import Point
+from .point_array import PointArray
+
+
+def recorded(method):
+    """Record calls of the Geometry method in the recipe, if recording is enabled.
+    Calls made from within other recorded methods aren't recorded.
+    """
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        recorder = self._RECORDER
+        if recorder is None or recorder.depth > 0:
+            return method(self, *args, **kwargs)
+        op = {
+            "op": method.__name__,
+            "args": [recorder.encode(a) for a in args],
+            "kwargs": {key: recorder.encode(a) for key, a in kwargs.items()},
+        }
+        recorder.depth += 1
+        try:
+            out = method(self, *args, **kwargs)
+        finally:
+            recorder.depth -= 1
+        recorder.add(op, out)
+        return out
+
+    return wrapper
+
+
+def _is_pygmsh_object(obj):
+    return type(obj).__module__.startswith("pygmsh.")
+
+
+def _attributes(obj):
+    if hasattr(obj, "__dict__"):
+        yield from vars(obj).items()
+    for cls in type(obj).__mro__:
+        for name in getattr(cls, "__slots__", ()):
+            if hasattr(obj, name):
+                yield name, getattr(obj, name)
+
+
+class Recorder:
+    def __init__(self, kernel: str):
+        self.kernel = kernel
+        self.ops = []
+        self.depth = 0
+        # id(obj) -> reference; the objects are kept alive so that ids aren't reused
+        self._refs = {}
+        self._objects = []
+        # line ID -> reference, for reversed lines
+        self._lines = {}
+        # point ID -> reference, for points of a PointArray
+        self._points = {}
+
+    def add(self, op, out):
+        k = len(self.ops)
+        self.ops.append(op)
+        # Breadth-first through all objects reachable from the result, so that later
+        # operations can refer to any of them, e.g., `polygon.curves[2]`, and every
+        # object gets its shortest path. Objects already seen end the search, which
+        # also breaks cycles.
+        queue = deque([(out, [])])
+        while queue:
+            obj, path = queue.popleft()
+            if isinstance(obj, (list, tuple)):
+                children = enumerate(obj)
+            elif _is_pygmsh_object(obj):
+                if id(obj) in self._refs:
+                    continue
+                self._refs[id(obj)] = {"ref": k, "path": path}
+                self._objects.append(obj)
+                if isinstance(obj, LineBase):
+                    self._lines.setdefault(obj._id, self._refs[id(obj)])
+                elif isinstance(obj, PointArray):
+                    for i, tag in enumerate(obj.tags.tolist()):
+                        self._points[tag] = {"ref": k, "path": path + [i]}
+                children = _attributes(obj)
+            else:
+                continue
+            queue.extend((child, path + [key]) for key, child in children)
+
+    def encode(self, obj):
+        if obj is None or isinstance(obj, (bool, int, float, str)):
+            return obj
+        if isinstance(obj, np.generic):
+            return obj.item()
+        if isinstance(obj, np.ndarray):
+            return {"ndarray": obj.tolist(), "dtype": obj.dtype.str}
+        if isinstance(obj, (list, tuple)):
+            return [self.encode(item) for item in obj]
+        if isinstance(obj, dict):
+            return {"dict": {key: self.encode(val) for key, val in obj.items()}}
+        if id(obj) in self._refs:
+            return _copy(self._refs[id(obj)])
+        if isinstance(obj, LineBase) and -obj._id in self._lines:
+            # a reversed line, created by `-line`
+            return {"neg": _copy(self._lines[-obj._id])}
+        if isinstance(obj, Point) and obj._id in self._points:
+            return _copy(self._points[obj._id])
+        if _is_pygmsh_object(obj):
+            raise ValueError(f"{obj} wasn't created by a recorded operation.")
+        # e.g., callables; fine for pickle, but not for JSON
+        return {"object": obj}
+
+    def recipe(self):
+        return {"kernel": self.kernel, "ops": list(self.ops)}
+
+
+def _copy(ref):
+    return {"ref": ref["ref"], "path": list(ref["path"])}
+
+
+def decode(obj, results):
+    """Resolve the references in a recorded argument against the results of the
+    replayed operations.
+    """
+    if isinstance(obj, list):
+        return [decode(item, results) for item in obj]
+    if not isinstance(obj, dict):
+        return obj
+    if "ref" in obj:
+        out = results[obj["ref"]]
+        for key in obj["path"]:
+            out = getattr(out, key) if isinstance(key, str) else out[key]
+        return out
+    if "neg" in obj:
+        return -decode(obj["neg"], results)
+    if "ndarray" in obj:
+        return np.array(obj["ndarray"], dtype=obj["dtype"])
+    if "dict" in obj:
+        return {key: decode(val, results) for key, val in obj["dict"].items()}
+    return obj["object"]
@@ -0,0 +1,157 @@
+"""Regeneration of the parts of a mesh affected by local changes of mesh settings."""
+from __future__ import annotations
+
+import gmsh
+import numpy as np
+
+from ..cache import _MESH_OPTIONS
+from ..helpers import _scoped_options
+
+
+def mesh_settings(geom, dim: int, order, algorithm, algorithm_3d) -> tuple[dict, dict]:
+    """Return the global and the per-entity mesh settings of the current model. Must
+    be called after the pygmsh queues have been applied. A change of the global
+    settings, e.g., the element order or `Mesh.RecombineAll`, affects the type of all
+    elements and hence requires a complete regeneration.
+    """
+    global_settings = {
+        "dim": dim,
+        "order": order,
+        "algorithm": algorithm,
+        "algorithm_3d": algorithm_3d,
+        "entities": gmsh.model.getEntities(),
+        "fields": list(gmsh.model.mesh.field.list()),
+        "compound": repr(geom._COMPOUND_ENTITIES),
+        "options": {key: gmsh.option.getNumber(key) for key in _MESH_OPTIONS},
+    }
+
+    entity_settings = {}
+    points = gmsh.model.getEntities(0)
+    if len(points) > 0:
+        sizes = gmsh.model.mesh.getSizes(points)
+        for dim_tag, size in zip(points, sizes):
+            entity_settings[dim_tag] = ("size", size)
+    for curve_id, *args in geom._TRANSFINITE_CURVE_QUEUE:
+        entity_settings[(1, abs(curve_id))] = ("transfinite", args)
+    for surface_id, *args in geom._TRANSFINITE_SURFACE_QUEUE:
+        entity_settings[(2, surface_id)] = ("transfinite", args)
+    for volume_id, *args in geom._TRANSFINITE_VOLUME_QUEUE:
+        entity_settings[(3, volume_id)] = ("transfinite", args)
+    for dim_tag in geom._RECOMBINE_ENTITIES:
+        key = tuple(dim_tag)
+        entity_settings[key] = entity_settings.get(key, ()) + ("recombine",)
+    for item, host in geom._EMBED_QUEUE:
+        key = (host.dim, host._id)
+        entity_settings[key] = entity_settings.get(key, ()) + (item.dim_tags,)
+    return global_settings, entity_settings
+
+
+def changed_entities(old, new) -> set | None:
+    """Return the entities whose mesh must be regenerated when the mesh settings change
+    from `old` to `new`, or `None` if everything must be regenerated.
+    """
+    old_global, old_entities = old
+    new_global, new_entities = new
+    if old_global != new_global:
+        return None
+    changed = {
+        key
+        for key in old_entities.keys() | new_entities.keys()
+        if repr(old_entities.get(key)) != repr(new_entities.get(key))
+    }
+    # The mesh of an entity depends on the mesh of its boundary, so all entities that
+    # have a changed entity on their boundary must be regenerated as well.
+    out = set(changed)
+    todo = list(changed)
+    while todo:
+        d, tag = todo.pop()
+        upward, _ = gmsh.model.getAdjacencies(d, tag)
+        for t in upward:
+            key = (d + 1, int(t))
+            if key not in out:
+                out.add(key)
+                todo.append(key)
+    return out
+
+
+def remesh(entities: set, dim: int) -> set:
+    """Regenerate the mesh of `entities` and keep the rest. Returns the regenerated
+    entities.
+
+    Gmsh can't mesh individual entities. `generate(1)` with `Mesh.MeshOnlyEmpty` keeps
+    the existing curve meshes, but `generate(2)` re-meshes all surfaces and removes all
+    volume meshes. The meshes of the unchanged surfaces and volumes are hence saved
+    beforehand and put back before `generate(3)`, which only meshes empty volumes.
+    """
+    kept = [
+        (e, _get_nodes(e), gmsh.model.mesh.getElements(*e))
+        for e in gmsh.model.getEntities()
+        if 2 <= e[0] <= dim and e not in entities
+    ]
+
+    # higher dimensions first, see gmsh.model.mesh.clear()
+    gmsh.model.mesh.clear(sorted(entities, key=lambda e: -e[0]))
+    with _scoped_options({"Mesh.MeshOnlyEmpty": 1}):
+        gmsh.model.mesh.generate(1)
+        if dim >= 2:
+            gmsh.model.mesh.generate(2)
+            # drop the new meshes of the kept surfaces
+            gmsh.model.mesh.clear([e for e, _, _ in kept if e[0] == 2])
+            _restore(kept)
+        if dim == 3:
+            gmsh.model.mesh.generate(3)
+    return set(entities)
+
+
+def _get_nodes(dim_tag):
+    """Return the tags of the nodes inside of an entity, and the tags and coordinates
+    of all its nodes, including the ones on its boundary.
+    """
+    inner, _, _ = gmsh.model.mesh.getNodes(
+        *dim_tag, includeBoundary=False, returnParametricCoord=False
+    )
+    tags, coords, _ = gmsh.model.mesh.getNodes(
+        *dim_tag, includeBoundary=True, returnParametricCoord=False
+    )
+    return inner, tags, coords.reshape(-1, 3)
+
+
+def _restore(meshes):
+    """Add saved entity meshes back to the model, lower dimensions first. Gmsh
+    renumbers the nodes after meshing, so the saved tags are meaningless: the nodes
+    inside of the entities are added with new tags, and the ones on their boundaries,
+    which weren't regenerated, are found by their coordinates.
+    """
+    for dim_tag, (inner, tags, coords), (types, _, elem_node_tags) in sorted(
+        meshes, key=lambda m: m[0][0]
+    ):
+        # the current nodes on the boundary, by coordinates
+        boundary_tags, boundary_coords, _ = gmsh.model.mesh.getNodes(
+            *dim_tag, includeBoundary=True, returnParametricCoord=False
+        )
+        find = dict(zip(map(bytes, boundary_coords.reshape(-1, 3)), boundary_tags))
+
+        is_inner = np.isin(tags, inner)
+        max_tag = gmsh.model.mesh.getMaxNodeTag()
+        new_tags = np.empty(len(tags), dtype=np.uint64)
+        new_tags[is_inner] = np.arange(
+            max_tag + 1, max_tag + 1 + np.count_nonzero(is_inner), dtype=np.uint64
+        )
+        try:
+            new_tags[~is_inner] = [find[bytes(x)] for x in coords[~is_inner]]
+        except KeyError:
+            raise RuntimeError(f"The boundary mesh of {dim_tag} changed.")
+        gmsh.model.mesh.addNodes(
+            *dim_tag, new_tags[is_inner], coords[is_inner].reshape(-1)
+        )
+
+        srt = np.argsort(tags)
+        tags = tags[srt]
+        new_tags = new_tags[srt]
+        max_tag = gmsh.model.mesh.getMaxElementTag()
+        for elem_type, nodes in zip(types, elem_node_tags):
+            nodes = new_tags[np.searchsorted(tags, nodes)]
+            num_elems = len(nodes) // gmsh.model.mesh.getElementProperties(elem_type)[3]
+            new = np.arange(max_tag + 1, max_tag + 1 + num_elems, dtype=np.uint64)
+            max_tag += num_elems
+            gmsh.model.mesh.addElementsByType(dim_tag[1], elem_type, new, nodes)
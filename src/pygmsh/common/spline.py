@@ -13,6 +13,8 @@ class Spline(LineBase):
     points : List containing Point objects
     """
 
+    __slots__ = ()
+
     def __init__(self, env, points: list[Point]):
         for c in points:
             assert isinstance(c, Point)
@@ -21,6 +21,7 @@ class Surface:
     """
 
     dim = 2
+    __slots__ = ("curve_loop", "num_edges", "_id", "dim_tag", "dim_tags")
 
     def __init__(self, env, curve_loop):
         assert isinstance(curve_loop, CurveLoop)
@@ -16,6 +16,7 @@ class SurfaceLoop:
     """
 
     dim = 2
+    __slots__ = ("surfaces", "_id", "dim_tag", "dim_tags")
 
     def __init__(self, env, surfaces):
         self.surfaces = surfaces
@@ -25,6 +25,7 @@ class Volume:
     """
 
     dim = 3
+    __slots__ = ("surface_loop", "holes", "_id", "dim_tag", "dim_tags")
 
     def __init__(self, env, surface_loop, holes=None):
         if holes is None:
@@ -6,6 +6,7 @@ import gmsh
 import numpy as np
 
 from .. import common
+from ..common.recipe import recorded
 from .dummy import Dummy
 
 
@@ -34,9 +35,24 @@ class Circle:
 
 
 class Geometry(common.CommonGeometry):
-    def __init__(self, init_argv=None):
-        super().__init__(gmsh.model.geo, init_argv=init_argv)
+    def __init__(
+        self,
+        init_argv=None,
+        merge_tolerance: float | None = None,
+        record: bool = False,
+        profile_api: bool = False,
+        dry_run: bool = False,
+    ):
+        super().__init__(
+            gmsh.model.geo,
+            init_argv=init_argv,
+            merge_tolerance=merge_tolerance,
+            record=record,
+            profile_api=profile_api,
+            dry_run=dry_run,
+        )
 
+    @recorded
     def revolve(self, *args, **kwargs):
         if len(args) >= 4:
             angle = args[3]
@@ -47,6 +63,7 @@ class Geometry(common.CommonGeometry):
         assert angle < math.pi
         return super()._revolve(*args, **kwargs)
 
+    @recorded
     def twist(
         self,
         input_entity,
@@ -86,11 +103,12 @@ class Geometry(common.CommonGeometry):
             heights=heights,
             recombine=recombine,
         )
-        top = Dummy(*out_dim_tags[0])
-        extruded = Dummy(*out_dim_tags[1])
-        lateral = [Dummy(*e) for e in out_dim_tags[2:]]
+        top = self._register(Dummy(*out_dim_tags[0]))
+        extruded = self._register(Dummy(*out_dim_tags[1]))
+        lateral = [self._register(Dummy(*e)) for e in out_dim_tags[2:]]
         return top, extruded, lateral
 
+    @recorded
     def add_circle(
         self,
         x0: list[float],
@@ -167,6 +185,7 @@ class Geometry(common.CommonGeometry):
             mesh_size=mesh_size,
         )
 
+    @recorded
     def add_rectangle(
         self,
         xmin: float,
@@ -185,6 +204,7 @@ class Geometry(common.CommonGeometry):
             make_surface=make_surface,
         )
 
+    @recorded
     def add_ellipsoid(
         self,
         x0: list[float],
@@ -274,9 +294,11 @@ class Geometry(common.CommonGeometry):
 
         return Ellipsoid(x0, radii, surface_loop, volume, mesh_size=mesh_size)
 
+    @recorded
     def add_ball(self, x0: list[float], radius: float, **kwargs):
         return self.add_ellipsoid(x0, [radius, radius, radius], **kwargs)
 
+    @recorded
     def add_box(
         self,
         x0: float,
@@ -356,6 +378,7 @@ class Geometry(common.CommonGeometry):
 
         return Box(x0, x1, y0, y1, z0, z1, surface_loop, vol, mesh_size=mesh_size)
 
+    @recorded
     def add_torus(
         self,
         irad: float,
@@ -480,6 +503,7 @@ class Geometry(common.CommonGeometry):
         assert int(gmsh.__version__.split(".")[0])
         self._COMPOUND_ENTITIES.append((3, [v._id for v in all_volumes]))
 
+    @recorded
     def add_pipe(
         self,
         outer_radius,
@@ -600,12 +624,14 @@ class Geometry(common.CommonGeometry):
         )
         return vol
 
+    @recorded
     def in_surface(self, input_entity, surface):
         """Embed the point(s) or curve(s) in the given surface. The surface mesh will
         conform to the mesh of the point(s) or curves(s).
         """
         self._EMBED_QUEUE.append((input_entity, surface))
 
+    @recorded
     def in_volume(self, input_entity, volume):
         """Embed the point(s)/curve(s)/surface(s) in the given volume. The volume mesh
         will conform to the mesh of the input entities.
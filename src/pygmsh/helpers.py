@@ -1,12 +1,82 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+
 import gmsh
 import meshio
 import numpy as np
 
 
-def write(filename: str):
-    import gmsh
+def write(
+    filename: str,
+    msh_version: float | None = None,
+    binary: bool | None = None,
+    save_all: bool | None = None,
+    split_partitions: bool | None = None,
+):
+    """Write the current gmsh model with Gmsh's native writers; the format is
+    determined by the file extension. The options only apply to this call, `None`
+    keeps Gmsh's current setting.
+
+    :param filename: output file, e.g., `out.msh`
+    :param msh_version: MSH file format version, e.g., 2.2 or 4.1
+    :param binary: write binary instead of ASCII files
+    :param save_all: also save the elements that aren't part of a physical group
+    :param split_partitions: write one file per mesh partition
+    """
+    options = {
+        "Mesh.MshFileVersion": msh_version,
+        "Mesh.Binary": binary,
+        "Mesh.SaveAll": save_all,
+        "Mesh.PartitionSplitMeshFiles": split_partitions,
+    }
+    with _scoped_options(options):
+        gmsh.write(str(filename))
+
+
+_SESSION_DEPTH = 0
 
-    gmsh.write(filename)
+
+@contextmanager
+def session(init_argv=None):
+    """Keep Gmsh initialized for the duration of the context. Geometry objects
+    created inside then don't initialize and finalize Gmsh themselves, but only clear
+    the model on enter and exit, which saves a lot of time when meshing many small
+    models in a loop. Options set through pygmsh are restored when a Geometry context
+    exits. Sessions can be nested; only the outermost one initializes Gmsh.
+
+    :param init_argv: command-line arguments passed to `gmsh.initialize()`
+    """
+    global _SESSION_DEPTH
+    if _SESSION_DEPTH == 0:
+        gmsh.initialize([] if init_argv is None else init_argv)
+    _SESSION_DEPTH += 1
+    try:
+        yield
+    finally:
+        _SESSION_DEPTH -= 1
+        if _SESSION_DEPTH == 0:
+            gmsh.finalize()
+
+
+def _in_session():
+    return _SESSION_DEPTH > 0
+
+
+@contextmanager
+def _scoped_options(options):
+    """Set Gmsh number options for the duration of the context and restore the
+    previous values afterwards. Options with value `None` are left untouched.
+    """
+    options = {key: value for key, value in options.items() if value is not None}
+    previous = {key: gmsh.option.getNumber(key) for key in options}
+    for key, value in options.items():
+        gmsh.option.setNumber(key, float(value))
+    try:
+        yield
+    finally:
+        for key, value in previous.items():
+            gmsh.option.setNumber(key, value)
 
 
 def rotation_matrix(u, theta):
@@ -33,92 +103,380 @@ def orient_lines(lines):
 
     :param lines: a sequence of lines defining a closed polygon
     """
-    # Categorise graph edges by their vertex pair ids
-    point_pair_ids = np.array(
-        [[line.points[0]._id, line.points[1]._id] for line in lines]
-    )
+    loops, open_chains = chain_lines(lines)
+    if len(loops) != 1 or len(open_chains) > 0:
+        raise ValueError(
+            f"Lines don't form a single closed polygon, but {len(loops)} closed loops "
+            f"and {len(open_chains)} open chains."
+        )
+    return loops[0]
+
+
+def chain_lines(lines):
+    """Given a sequence of unordered and unoriented lines, chain them into closed
+    loops and open chains of ordered and oriented lines in linear time.
+
+    The loops are sorted by decreasing area (projected onto the x-y-plane), so for a
+    plane region with holes, the first loop is the outer boundary and the others are
+    the holes, ready for `add_curve_loop` and `add_plane_surface`.
+
+    :param lines: a sequence of lines
+    :returns: closed loops and open chains, both lists of lists of lines
+    """
+    lines = list(lines)
+    ends = [(line.points[0]._id, line.points[-1]._id) for line in lines]
+
+    # point id -> indices of the lines incident to it
+    adjacency = {}
+    for k, (a, b) in enumerate(ends):
+        adjacency.setdefault(a, []).append(k)
+        adjacency.setdefault(b, []).append(k)
+
+    is_used = [False] * len(lines)
 
-    # Indices of reordering
-    order = np.arange(len(point_pair_ids), dtype=int)
-    # Compute orientations where oriented[j] == False requires edge j to be reversed
-    oriented = np.array([True] * len(point_pair_ids), dtype=bool)
-
-    for j in range(1, len(point_pair_ids)):
-        out = point_pair_ids[j - 1, 1]  # edge out from vertex
-        inn = point_pair_ids[j:, 0]  # candidates for edge into vertices
-        wh = np.where(inn == out)[0] + j
-        if len(wh) == 0:
-            # look for candidates in those which are not correctly oriented
-            inn = point_pair_ids[j:, 1]
-            wh = np.where(inn == out)[0] + j
-            # reorient remaining edges
-            point_pair_ids[j:] = np.flip(point_pair_ids[j:], axis=1)
-            oriented[j:] ^= True
-
-        # reorder
-        point_pair_ids[[j, wh[0]]] = point_pair_ids[[wh[0], j]]
-        order[[j, wh[0]]] = order[[wh[0], j]]
-
-    # Reconstruct an ordered and oriented line loop
-    lines = [lines[o] for o in order]
-    lines = [lines[j] if oriented[j] else -lines[j] for j in range(len(oriented))]
-
-    return lines
-
-
-def extract_to_meshio():
-    # extract point coords
-    idx, points, _ = gmsh.model.mesh.getNodes()
-    points = np.asarray(points).reshape(-1, 3)
-    idx -= 1
-    srt = np.argsort(idx)
-    assert np.all(idx[srt] == np.arange(len(idx)))
-    points = points[srt]
+    def _next_line(point_id):
+        incident = adjacency[point_id]
+        # pop used lines lazily; every line is popped at most twice
+        while incident:
+            k = incident.pop()
+            if not is_used[k]:
+                return k
+        return None
+
+    def _walk(point_id):
+        # follow unused lines starting from `point_id`, orient them along the way
+        chain = []
+        k = _next_line(point_id)
+        while k is not None:
+            is_used[k] = True
+            if ends[k][0] == point_id:
+                chain.append(lines[k])
+                point_id = ends[k][1]
+            else:
+                chain.append(-lines[k])
+                point_id = ends[k][0]
+            k = _next_line(point_id)
+        return chain, point_id
+
+    loops = []
+    open_chains = []
+    for k, line in enumerate(lines):
+        if is_used[k]:
+            continue
+        is_used[k] = True
+        start, end = ends[k]
+        forward, end = _walk(end)
+        if end == start:
+            loops.append([line] + forward)
+            continue
+        # open chain: extend it backwards, too
+        backward, _ = _walk(start)
+        open_chains.append([-c for c in backward[::-1]] + [line] + forward)
+
+    def _area(loop):
+        x = np.array([c.points[0].x for c in loop])
+        return 0.5 * abs(
+            np.dot(x[:, 0], np.roll(x[:, 1], -1))
+            - np.dot(np.roll(x[:, 0], -1), x[:, 1])
+        )
+
+    loops.sort(key=_area, reverse=True)
+
+    return loops, open_chains
+
+
+def extract_to_meshio(
+    point_dtype=np.float64,
+    cell_dtype=np.int64,
+    cell_dims: list[int] | None = None,
+    physical_labels: list[str] | None = None,
+):
+    """Extract the mesh of the current gmsh model into a meshio.Mesh.
+
+    :param point_dtype: data type of the point coordinates, e.g., `numpy.float32`
+    :param cell_dtype: data type of the cell connectivity, e.g., `numpy.int32`
+    :param cell_dims: only extract the cells of these dimensions
+    :param physical_labels: only extract the cells of the physical groups with these
+        labels
+    """
+    physical_groups = gmsh.model.getPhysicalGroups()
+    if physical_labels is not None:
+        names = {
+            gmsh.model.getPhysicalName(*dim_tag): dim_tag for dim_tag in physical_groups
+        }
+        for label in physical_labels:
+            if label not in names:
+                raise ValueError(f'Unknown physical label "{label}".')
+        physical_groups = [names[label] for label in physical_labels]
+    if cell_dims is not None:
+        physical_groups = [(d, t) for d, t in physical_groups if d in cell_dims]
 
     # extract cells
-    elem_types, elem_tags, node_tags = gmsh.model.mesh.getElements()
+    if cell_dims is None and physical_labels is None:
+        elem_types, elem_tags, node_tags = gmsh.model.mesh.getElements()
+    else:
+        if physical_labels is None:
+            entities = [
+                dim_tag for dim in cell_dims for dim_tag in gmsh.model.getEntities(dim)
+            ]
+        else:
+            entities = list(
+                dict.fromkeys(
+                    (dim, e)
+                    for dim, tag in physical_groups
+                    for e in gmsh.model.getEntitiesForPhysicalGroup(dim, tag)
+                )
+            )
+        elem_types, elem_tags, node_tags = _get_elements(entities)
+
+    # extract point coords; the parametric coordinates aren't needed
+    all_node_tags, coords, _ = gmsh.model.mesh.getNodes(returnParametricCoord=False)
+    coords = np.asarray(coords).reshape(-1, 3)
+    if cell_dims is not None or physical_labels is not None:
+        # prune the points not referenced by any of the extracted cells
+        find = _get_tag_positions(all_node_tags)
+        is_used = np.zeros(len(all_node_tags), dtype=bool)
+        for tags in node_tags:
+            is_used[find(tags)] = True
+        all_node_tags = all_node_tags[is_used]
+        coords = coords[is_used]
+
+    node_index = _get_tag_ranks(all_node_tags, cell_dtype)
+    # sort the points by their tags
+    points = np.empty((len(all_node_tags), 3), dtype=point_dtype)
+    points[node_index(all_node_tags)] = coords
+    del coords
+
     cells = []
+    cell_tags = []
     for elem_type, elem_tags, node_tags in zip(elem_types, elem_tags, node_tags):
         # `elementName', `dim', `order', `numNodes', `localNodeCoord',
         # `numPrimaryNodes'
         num_nodes_per_cell = gmsh.model.mesh.getElementProperties(elem_type)[3]
 
-        node_tags_reshaped = np.asarray(node_tags).reshape(-1, num_nodes_per_cell) - 1
-        node_tags_sorted = node_tags_reshaped[np.argsort(elem_tags)]
-        cells.append(
-            meshio.CellBlock(
-                meshio.gmsh.gmsh_to_meshio_type[elem_type], node_tags_sorted
-            )
+        data = node_index(node_tags).reshape(-1, num_nodes_per_cell)
+        # gmsh usually returns the elements sorted already
+        if np.any(elem_tags[1:] < elem_tags[:-1]):
+            srt = np.argsort(elem_tags)
+            data = data[srt]
+            elem_tags = elem_tags[srt]
+        cells.append(meshio.CellBlock(meshio.gmsh.gmsh_to_meshio_type[elem_type], data))
+        cell_tags.append(elem_tags)
+
+    cell_sets = _get_cell_sets(cell_tags, physical_groups)
+
+    # make meshio mesh
+    return meshio.Mesh(points, cells, cell_sets=cell_sets)
+
+
+def _get_elements(entities):
+    """Like `gmsh.model.mesh.getElements()`, but only for the given entities.
+
+    :param entities: list of (dim, tag) pairs
+    """
+    elements = {}
+    for dim, tag in entities:
+        for elem_type, elem_tags, node_tags in zip(
+            *gmsh.model.mesh.getElements(dim, tag)
+        ):
+            if elem_type not in elements:
+                elements[elem_type] = ([], [])
+            elements[elem_type][0].append(elem_tags)
+            elements[elem_type][1].append(node_tags)
+
+    # same order as gmsh.model.mesh.getElements()
+    elem_types = sorted(
+        elements, key=lambda t: (gmsh.model.mesh.getElementProperties(t)[1], t)
+    )
+    return (
+        elem_types,
+        [np.concatenate(elements[t][0]) for t in elem_types],
+        [np.concatenate(elements[t][1]) for t in elem_types],
+    )
+
+
+def iter_mesh_blocks(
+    by: str = "entity",
+    chunk_size: int = 2**20,
+    point_dtype=np.float64,
+    cell_dtype=np.int64,
+):
+    """Iterate over the mesh of the current gmsh model in chunks, without holding
+    the entire mesh in memory.
+
+    First yields the points as `("points", (dim, tag), points)`, then the cells as
+    `("cells", (dim, tag), meshio.CellBlock)`, each chunk with at most `chunk_size`
+    rows. The cells refer to the points by their position in the stream of points.
+
+    `chunk_size` only bounds the yielded arrays, not what is read from gmsh: its Python
+    API returns the nodes of an entity and the elements of an entity and element type
+    in one piece. While iterating, the memory holds
+
+    - the node tags of the entire mesh and an index from tag to position, 16 to 24
+      bytes per node, and
+    - the nodes of one entity (tags and coordinates, 32 bytes per node) or the
+      elements of one entity and element type (tags and connectivity, 8 bytes per
+      element and per node of an element).
+
+    The peak is hence set by the largest entity plus the index of all nodes, not by
+    the entire mesh.
+
+    :param by: "entity" yields the cells entity by entity, "type" element type by
+        element type.
+    :param chunk_size: maximum number of points/cells per yielded chunk
+    :param point_dtype: data type of the point coordinates
+    :param cell_dtype: data type of the cell connectivity
+    """
+    assert by in ["entity", "type"]
+    assert chunk_size > 0
+
+    entities = gmsh.model.getEntities()
+
+    all_node_tags = []
+    for dim, tag in entities:
+        node_tags, coords, _ = gmsh.model.mesh.getNodes(
+            dim, tag, returnParametricCoord=False
         )
+        all_node_tags.append(node_tags)
+        coords = np.asarray(coords, dtype=point_dtype).reshape(-1, 3)
+        for k in range(0, len(coords), chunk_size):
+            yield "points", (dim, tag), coords[k : k + chunk_size]
+        del coords
+
+    if len(all_node_tags) == 0:
+        return
+    node_index = _get_tag_positions(np.concatenate(all_node_tags))
+    del all_node_tags
+
+    entity_types = [
+        (dim, tag, gmsh.model.mesh.getElementTypes(dim, tag)) for dim, tag in entities
+    ]
+    if by == "entity":
+        items = [
+            (dim, tag, elem_type)
+            for dim, tag, elem_types in entity_types
+            for elem_type in elem_types
+        ]
+    else:
+        items = [
+            (dim, tag, elem_type)
+            for elem_type in sorted({t for _, _, types in entity_types for t in types})
+            for dim, tag, types in entity_types
+            if elem_type in types
+        ]
+
+    for dim, tag, elem_type in items:
+        num_nodes_per_cell = gmsh.model.mesh.getElementProperties(elem_type)[3]
+        cell_type = meshio.gmsh.gmsh_to_meshio_type[elem_type]
+        _, node_tags = gmsh.model.mesh.getElementsByType(elem_type, tag)
+        node_tags = node_tags.reshape(-1, num_nodes_per_cell)
+        for k in range(0, len(node_tags), chunk_size):
+            data = node_index(node_tags[k : k + chunk_size]).astype(
+                cell_dtype, copy=False
+            )
+            yield "cells", (dim, tag), meshio.CellBlock(cell_type, data)
+        del node_tags
+
+
+def _get_tag_ranks(tags, dtype):
+    """Return a function that maps (unique, positive) gmsh tags to their ranks
+    0, ..., n-1 among `tags`. Tags are not necessarily contiguous, e.g., after
+    refinement or optimization.
+
+    :param tags: the tags to index
+    :param dtype: integer data type of the ranks
+    """
+    n = len(tags)
+    max_tag = int(tags.max()) if n > 0 else 0
+
+    if max_tag == n:
+        # tags are exactly 1, ..., n
+        return lambda t: np.subtract(t, 1, dtype=dtype, casting="unsafe")
+
+    if max_tag <= 2 * n:
+        # nearly contiguous: dense lookup table, no sorting
+        is_used = np.zeros(max_tag + 1, dtype=bool)
+        is_used[tags] = True
+        table = np.cumsum(is_used, dtype=dtype)
+        table -= 1
+        return lambda t: table[t]
+
+    # sparse: compacting remap
+    sorted_tags = np.sort(tags)
+    return lambda t: np.searchsorted(sorted_tags, t).astype(dtype, copy=False)
+
+
+def _get_tag_positions(tags):
+    """Return a function that maps (unique, positive) gmsh tags to their positions in
+    `tags`.
+    """
+    n = len(tags)
+    max_tag = int(tags.max()) if n > 0 else 0
+
+    if max_tag <= 2 * n:
+        # dense lookup table
+        table = np.full(max_tag + 1, -1, dtype=np.int64)
+        table[tags] = np.arange(n)
+        return lambda t: table[t]
+
+    srt = np.argsort(tags)
+    return lambda t: srt[np.searchsorted(tags, t, sorter=srt)]
+
+
+def _get_cell_sets(cell_tags, physical_groups):
+    """Collect the physical groups as meshio cell sets, i.e., per physical group one
+    array of block-local cell indices for every cell block (or `None` if the group
+    doesn't have cells in the block).
+
+    :param cell_tags: the (sorted) gmsh element tags of every cell block
+    :param physical_groups: the (dim, tag) pairs of the physical groups; all of their
+        elements must be in the cell blocks
+    """
+    if len(physical_groups) == 0 or len(cell_tags) == 0:
+        return {}
+
+    # One lookup from element tag to (block, block-local index) for all cells
+    num_blocks = len(cell_tags)
+    all_tags = np.concatenate(cell_tags)
+    block_ids = np.repeat(np.arange(num_blocks), [len(tags) for tags in cell_tags])
+    local_ids = np.concatenate([np.arange(len(tags)) for tags in cell_tags])
+    find = _get_tag_positions(all_tags)
+
+    # An entity can be part of more than one physical group; only fetch its elements
+    # once.
+    entity_elem_tags = {}
+
+    def _get_elem_tags(dim, tag):
+        if (dim, tag) not in entity_elem_tags:
+            # the entity may hold elements of any number of types
+            _, elem_tags, _ = gmsh.model.mesh.getElements(dim, tag)
+            entity_elem_tags[(dim, tag)] = (
+                np.concatenate(elem_tags)
+                if len(elem_tags) > 0
+                else np.array([], dtype=all_tags.dtype)
+            )
+        return entity_elem_tags[(dim, tag)]
 
     cell_sets = {}
-    for dim, tag in gmsh.model.getPhysicalGroups():
+    for dim, tag in physical_groups:
         name = gmsh.model.getPhysicalName(dim, tag)
-        cell_sets[name] = [[] for _ in range(len(cells))]
-        for e in gmsh.model.getEntitiesForPhysicalGroup(dim, tag):
-            # TODO node_tags?
-            # elem_types, elem_tags, node_tags
-            elem_types, elem_tags, _ = gmsh.model.mesh.getElements(dim, e)
-            assert len(elem_types) == len(elem_tags)
-            assert len(elem_types) == 1
-            elem_type = elem_types[0]
-            elem_tags = elem_tags[0]
-
-            meshio_cell_type = meshio.gmsh.gmsh_to_meshio_type[elem_type]
-            # make sure that the cell type appears only once in the cell list
-            # -- for now
-            idx = []
-            for k, cell_block in enumerate(cells):
-                if cell_block.type == meshio_cell_type:
-                    idx.append(k)
-            assert len(idx) == 1
-            idx = idx[0]
-            cell_sets[name][idx].append(elem_tags - 1)
-
-        cell_sets[name] = [
-            (None if len(idcs) == 0 else np.concatenate(idcs))
-            for idcs in cell_sets[name]
+        elem_tags = [
+            _get_elem_tags(dim, e)
+            for e in gmsh.model.getEntitiesForPhysicalGroup(dim, tag)
         ]
+        elem_tags = (
+            np.concatenate(elem_tags)
+            if len(elem_tags) > 0
+            else np.array([], dtype=all_tags.dtype)
+        )
 
-    # make meshio mesh
-    return meshio.Mesh(points, cells, cell_sets=cell_sets)
+        k = find(elem_tags)
+        blocks = block_ids[k]
+        # group by block (stable, so the indices stay in element order)
+        order = np.argsort(blocks, kind="stable")
+        counts = np.bincount(blocks, minlength=num_blocks)
+        idcs = np.split(local_ids[k][order], np.cumsum(counts)[:-1])
+
+        cell_sets[name] = [(None if len(i) == 0 else i) for i in idcs]
+
+    return cell_sets
@@ -0,0 +1,176 @@
+"""Peak memory of the phases of mesh generation.
+
+The resident set size (RSS) of the process, which includes Gmsh's memory, is sampled by
+a background thread while a phase runs; the Python heap is measured with `tracemalloc`.
+Gmsh's calls can't be interrupted, so a memory limit is enforced at the end of the
+phase in which it was exceeded, before the next phase, e.g., the extraction of a large
+mesh, adds to it.
+"""
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import tracemalloc
+from contextlib import contextmanager
+
+
+def rss() -> int | None:
+    """The current resident set size of the process in bytes, `None` if unknown. On
+    other systems than Linux, the peak resident set size since the process started is
+    returned instead, which can only overestimate.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        # Windows
+        return None
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+
+class _Sampler(threading.Thread):
+    def __init__(self, interval: float):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.peak = rss()
+        self.done = threading.Event()
+
+    def run(self):
+        while not self.done.wait(self.interval):
+            self.sample()
+
+    def sample(self):
+        value = rss()
+        if value is not None and (self.peak is None or value > self.peak):
+            self.peak = value
+
+
+class MemoryPhase:
+    """
+    Memory usage of one phase of the mesh generation.
+
+    Attributes
+    ----------
+    name : Name of the phase, e.g., "generate_3d" or "extract", see
+        :class:`pygmsh.profiling.Profile`.
+    rss_peak : Highest sampled resident set size of the process during the phase, in
+        bytes.
+    rss : Resident set size at the end of the phase, in bytes.
+    python_peak : Peak of the Python heap allocated during the phase, in bytes, `None`
+        without `tracemalloc`, or if it was already started elsewhere and the peak
+        can't be reset (Python < 3.9).
+    """
+
+    def __init__(self, name, rss_peak, rss, python_peak):
+        self.name = name
+        self.rss_peak = rss_peak
+        self.rss = rss
+        self.python_peak = python_peak
+
+    def __repr__(self):
+        return f"<pygmsh MemoryPhase {self.name}, {_mb(self.rss_peak)} MB>"
+
+    def as_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "rss_peak": self.rss_peak,
+            "rss": self.rss,
+            "python_peak": self.python_peak,
+        }
+
+
+class MemoryProfile:
+    """
+    Memory high-water marks of the phases of one `generate_mesh()` call, in order of
+    execution.
+
+    Parameters
+    ----------
+    limit : Raise a `MemoryError` after a phase in which the resident set size
+        exceeded this many bytes.
+    python : Measure the Python heap with `tracemalloc`, which slows down Python's
+        allocations, but not Gmsh's.
+    interval : Seconds between two samples of the resident set size.
+
+    Attributes
+    ----------
+    phases : list of :class:`MemoryPhase`.
+    """
+
+    def __init__(
+        self, limit: int | None = None, python: bool = True, interval: float = 0.01
+    ):
+        self.limit = limit
+        self.python = python
+        self.interval = interval
+        self.phases = []
+
+    def __repr__(self):
+        return f"<pygmsh MemoryProfile, {len(self.phases)} phases, {_mb(self.peak)} MB>"
+
+    def __str__(self):
+        rows = [f"{'phase':<20} {'peak [MB]':>10} {'end [MB]':>10} {'python [MB]':>12}"]
+        for p in self.phases:
+            rows.append(
+                f"{p.name:<20} {_mb(p.rss_peak):>10} {_mb(p.rss):>10} "
+                f"{_mb(p.python_peak):>12}"
+            )
+        return "\n".join(rows)
+
+    @property
+    def peak(self) -> int | None:
+        """Highest resident set size of all phases in bytes."""
+        peaks = [p.rss_peak for p in self.phases if p.rss_peak is not None]
+        return max(peaks) if len(peaks) > 0 else None
+
+    @contextmanager
+    def phase(self, name: str):
+        """Record the memory usage of the enclosed code as a phase."""
+        trace = self.python and not tracemalloc.is_tracing()
+        python_start = None
+        if trace:
+            # a fresh start has no previous peak
+            tracemalloc.start()
+            python_start = tracemalloc.get_traced_memory()[0]
+        elif self.python and hasattr(tracemalloc, "reset_peak"):
+            # traced by someone else; Python >= 3.9 can reset the peak
+            tracemalloc.reset_peak()
+            python_start = tracemalloc.get_traced_memory()[0]
+        sampler = _Sampler(self.interval)
+        sampler.start()
+        try:
+            yield
+        finally:
+            sampler.done.set()
+            sampler.join()
+            sampler.sample()
+            python_peak = None
+            if python_start is not None:
+                python_peak = tracemalloc.get_traced_memory()[1] - python_start
+            if trace:
+                tracemalloc.stop()
+            self.phases.append(MemoryPhase(name, sampler.peak, rss(), python_peak))
+
+        if (
+            self.limit is not None
+            and sampler.peak is not None
+            and sampler.peak > self.limit
+        ):
+            raise MemoryError(
+                f"Memory limit of {_mb(self.limit)} MB exceeded in phase {name} "
+                f"({_mb(sampler.peak)} MB)."
+            )
+
+    def as_dict(self) -> dict:
+        return {"peak": self.peak, "phases": [p.as_dict() for p in self.phases]}
+
+
+def _mb(n):
+    return "-" if n is None else f"{n / 2**20:.1f}"
@@ -0,0 +1,266 @@
+"""Counters of many meshing runs for monitoring.
+
+Once enabled with :func:`enable`, every `generate_mesh()`, :func:`pygmsh.optimize`, and
+file optimization of `pygmsh-optimize` in this process is recorded in a
+:class:`Metrics` object, which can append the runs to a JSON lines file and write the
+totals in the Prometheus text format, e.g., for node_exporter's textfile collector.
+Worker processes, e.g., of :mod:`pygmsh.batch`, need to enable and write their own
+metrics.
+"""
+from __future__ import annotations
+
+import functools
+import json
+import os
+import pathlib
+import tempfile
+import time
+from contextlib import contextmanager
+
+import gmsh
+import numpy as np
+
+from .__about__ import __version__
+from .quality import from_gmsh
+
+_ACTIVE = None
+
+
+class Run:
+    """
+    One recorded run.
+
+    Attributes
+    ----------
+    kind : "generate_mesh" or "optimize".
+    time : Unix time of the start.
+    wall : Wall time in seconds.
+    phases : Wall time in seconds by phase.
+    nodes : Number of nodes of the result.
+    elements : Number of elements of the result by meshio cell type.
+    worst_quality : Minimum element quality ("gamma") of the result, if measured.
+    cache_hit : Whether the mesh was loaded from a cache, `None` without cache.
+    failed : Whether the run raised an exception.
+    """
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.time = time.time()
+        self.wall = 0.0
+        self.phases = {}
+        self.nodes = None
+        self.elements = {}
+        self.worst_quality = None
+        self.cache_hit = None
+        self.failed = False
+
+    def __repr__(self):
+        return f"<pygmsh Run {self.kind}, {self.wall:.3f} s>"
+
+    def as_dict(self) -> dict:
+        return {
+            "kind": self.kind,
+            "time": self.time,
+            "wall": self.wall,
+            "phases": dict(self.phases),
+            "nodes": self.nodes,
+            "elements": dict(self.elements),
+            "worst_quality": self.worst_quality,
+            "cache_hit": self.cache_hit,
+            "failed": self.failed,
+        }
+
+    def set_mesh(self, mesh):
+        """Take the node and element counts from a meshio mesh."""
+        self.nodes = len(mesh.points)
+        self.elements = {}
+        for block in mesh.cells:
+            self.elements[block.type] = self.elements.get(block.type, 0) + len(block)
+
+    def set_quality(self):
+        """Measure the worst element quality of the mesh in the current Gmsh model."""
+        q = from_gmsh("gamma")
+        if len(q) > 0:
+            self.worst_quality = float(np.min(q))
+
+
+class Metrics:
+    """
+    Accumulator of runs.
+
+    Parameters
+    ----------
+    quality : Measure the worst element quality of every run. This requires a pass
+        over all elements in Gmsh.
+
+    Attributes
+    ----------
+    runs : The runs recorded since the last :meth:`write_jsonl`.
+    """
+
+    def __init__(self, quality: bool = True):
+        self.quality = quality
+        self.runs = []
+        self._totals = {}
+        self._worst_quality = {}
+
+    def __repr__(self):
+        return f"<pygmsh Metrics, {len(self.runs)} pending runs>"
+
+    def _add(self, name: str, labels: dict, value: float):
+        key = (name, tuple(sorted(labels.items())))
+        self._totals[key] = self._totals.get(key, 0) + value
+
+    def add(self, run: Run):
+        """Record a run."""
+        self.runs.append(run)
+        kind = {"kind": run.kind}
+        status = "failed" if run.failed else "ok"
+        self._add("runs_total", {**kind, "status": status}, 1)
+        self._add("wall_seconds_total", kind, run.wall)
+        for phase, wall in run.phases.items():
+            self._add("phase_seconds_total", {**kind, "phase": phase}, wall)
+        if run.nodes is not None:
+            self._add("nodes_total", kind, run.nodes)
+        for cell_type, n in run.elements.items():
+            self._add("elements_total", {**kind, "type": cell_type}, n)
+        if run.cache_hit is not None:
+            self._add(
+                "cache_hits_total" if run.cache_hit else "cache_misses_total", kind, 1
+            )
+        if run.worst_quality is not None:
+            previous = self._worst_quality.get(run.kind, np.inf)
+            self._worst_quality[run.kind] = min(previous, run.worst_quality)
+
+    def totals(self) -> dict:
+        """Accumulated counters as {(name, ((label, value), ...)): total}."""
+        return dict(self._totals)
+
+    def write_jsonl(self, path: str | os.PathLike):
+        """Append the pending runs to `path`, one JSON object per line, and drop them
+        from memory.
+        """
+        lines = "".join(json.dumps(run.as_dict()) + "\n" for run in self.runs)
+        with open(path, "a") as f:
+            f.write(lines)
+        self.runs = []
+
+    def prometheus_text(self) -> str:
+        """The accumulated counters in the Prometheus text exposition format."""
+        rows = [
+            "# TYPE pygmsh_info gauge",
+            f'pygmsh_info{{pygmsh="{__version__}",gmsh="{gmsh.__version__}"}} 1',
+        ]
+        names = sorted({name for name, _ in self._totals})
+        for name in names:
+            rows.append(f"# TYPE pygmsh_{name} counter")
+            for (n, labels), value in sorted(self._totals.items()):
+                if n == name:
+                    rows.append(f"pygmsh_{name}{_labels(labels)} {value!r}")
+        if len(self._worst_quality) > 0:
+            rows.append("# TYPE pygmsh_worst_quality gauge")
+            for kind, value in sorted(self._worst_quality.items()):
+                rows.append(
+                    f"pygmsh_worst_quality{_labels([('kind', kind)])} {value!r}"
+                )
+        return "\n".join(rows) + "\n"
+
+    def write_prometheus(self, path: str | os.PathLike):
+        """Write the accumulated counters to `path` in the Prometheus text format. The
+        file is replaced atomically, so collectors never read partial files.
+        """
+        path = pathlib.Path(path)
+        with tempfile.NamedTemporaryFile(
+            "w", dir=path.parent, suffix=".tmp", delete=False
+        ) as f:
+            f.write(self.prometheus_text())
+        os.replace(f.name, path)
+
+
+def _labels(labels):
+    if len(labels) == 0:
+        return ""
+    items = ",".join(f'{key}="{_escape(value)}"' for key, value in labels)
+    return "{" + items + "}"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def enable(metrics: Metrics | None = None) -> Metrics:
+    """Record all runs in this process in `metrics`, or in a new :class:`Metrics`
+    object, which is returned.
+    """
+    global _ACTIVE
+    _ACTIVE = Metrics() if metrics is None else metrics
+    return _ACTIVE
+
+
+def disable():
+    """Stop recording runs."""
+    global _ACTIVE
+    _ACTIVE = None
+
+
+def active() -> Metrics | None:
+    """The :class:`Metrics` object runs are currently recorded in, if any."""
+    return _ACTIVE
+
+
+@contextmanager
+def _record(kind: str):
+    """Record the enclosed code as a run if metrics are enabled. Yields the
+    :class:`Run` to be filled in, or `None`.
+    """
+    metrics = _ACTIVE
+    if metrics is None:
+        yield None
+        return
+    run = Run(kind)
+    t = time.perf_counter()
+    try:
+        yield run
+    except BaseException:
+        run.failed = True
+        raise
+    finally:
+        run.wall = time.perf_counter() - t
+        metrics.add(run)
+
+
+def _recorded_generate_mesh(method):
+    """Record calls of `generate_mesh()`."""
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        metrics = _ACTIVE
+        if metrics is None:
+            return method(self, *args, **kwargs)
+        with _record("generate_mesh") as run:
+            mesh = method(self, *args, **kwargs)
+            # generate_mesh() times its phases whenever metrics are enabled
+            timings = self._TIMINGS
+            if timings is not None:
+                for name, (wall, _) in timings.totals().items():
+                    run.phases[name] = wall
+            run.cache_hit = self.cache_hit
+            if mesh is not None:
+                run.set_mesh(mesh)
+            elif timings is not None and len(timings.phases) > 0:
+                run.nodes = timings.phases[-1].nodes
+                run.elements = dict(timings.phases[-1].elements)
+            if metrics.quality and not run.cache_hit:
+                run.set_quality()
+        return mesh
+
+    return wrapper
+
+
+def _set_passes(run, passes):
+    """Take the phases of a run from the passes of an optimization pipeline."""
+    for p in passes[1:]:
+        name = f"optimize_{p['method'] or 'default'}"
+        run.phases[name] = run.phases.get(name, 0.0) + p["time"]
+    if "min" in passes[-1]:
+        run.worst_quality = passes[-1]["min"]
@@ -24,14 +24,25 @@ class Ball:
         `2*pi` w.r.t. to the x-y plane are not part of the object.
     char_length: float
         If specified, sets the `Characteristic Length` property.
+    env: module
+        Gmsh kernel namespace the entity is created with, `gmsh.model.occ` by
+        default.
     """
 
     dim = 3
 
-    def __init__(self, center, radius, angle1=-pi / 2, angle2=pi / 2, angle3=2 * pi):
+    def __init__(
+        self,
+        center,
+        radius,
+        angle1=-pi / 2,
+        angle2=pi / 2,
+        angle3=2 * pi,
+        env=gmsh.model.occ,
+    ):
         self.center = center
         self.radius = radius
-        self._id = gmsh.model.occ.addSphere(
+        self._id = env.addSphere(
             *center, radius, angle1=angle1, angle2=angle2, angle3=angle3
         )
         self.dim_tag = (3, self._id)
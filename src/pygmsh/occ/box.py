@@ -13,15 +13,18 @@ class Box:
         List of the 3 extents of the box edges.
     char_length : float
         Characteristic length of the mesh elements of this polygon.
+    env : module
+        Gmsh kernel namespace the entity is created with, `gmsh.model.occ` by
+        default.
     """
 
     dim = 3
 
-    def __init__(self, x0, extents, char_length=None):
+    def __init__(self, x0, extents, char_length=None, env=gmsh.model.occ):
         assert len(x0) == 3
         assert len(extents) == 3
         self.x0 = x0
         self.extents = extents
-        self._id = gmsh.model.occ.addBox(*x0, *extents)
+        self._id = env.addBox(*x0, *extents)
         self.dim_tag = (3, self._id)
         self.dim_tags = [self.dim_tag]
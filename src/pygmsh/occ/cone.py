@@ -17,11 +17,16 @@ class Cone:
         Radius of the second circle.
     angle : float
         Angular opening of the the Cone.
+    env : module
+        Gmsh kernel namespace the entity is created with, `gmsh.model.occ` by
+        default.
     """
 
     dim = 3
 
-    def __init__(self, center, axis, radius0, radius1, angle=2 * pi):
+    def __init__(
+        self, center, axis, radius0, radius1, angle=2 * pi, env=gmsh.model.occ
+    ):
         assert len(center) == 3
         assert len(axis) == 3
 
@@ -30,7 +35,7 @@ class Cone:
         self.radius0 = radius0
         self.radius1 = radius1
 
-        self._id = gmsh.model.occ.addCone(*center, *axis, radius0, radius1, angle=angle)
+        self._id = env.addCone(*center, *axis, radius0, radius1, angle=angle)
         self.dim_tag = (3, self._id)
         self.dim_tags = [self.dim_tag]
 
@@ -17,11 +17,14 @@ class Cylinder:
         Radius value of the cylinder.
     angle : float
         Angular opening of the cylinder.
+    env : module
+        Gmsh kernel namespace the entity is created with, `gmsh.model.occ` by
+        default.
     """
 
     dim = 3
 
-    def __init__(self, x0, axis, radius, angle=2 * pi):
+    def __init__(self, x0, axis, radius, angle=2 * pi, env=gmsh.model.occ):
         assert len(x0) == 3
         assert len(axis) == 3
 
@@ -30,7 +33,7 @@ class Cylinder:
         self.radius = radius
         self.angle = angle
 
-        self._id = gmsh.model.occ.addCylinder(*x0, *axis, radius, angle=angle)
+        self._id = env.addCylinder(*x0, *axis, radius, angle=angle)
         self.dim_tag = (3, self._id)
         self.dim_tags = [self.dim_tag]
 
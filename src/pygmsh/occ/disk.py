@@ -15,6 +15,9 @@ class Disk:
         Radius value of the disk.
     radius1 : float
         Radius along Y, leading to an ellipse.
+    env : module
+        Gmsh kernel namespace the entity is created with, `gmsh.model.occ` by
+        default.
     """
 
     dim = 2
@@ -24,6 +27,7 @@ class Disk:
         x0: tuple[float, float] | tuple[float, float, float],
         radius0: float,
         radius1: float | None = None,
+        env=gmsh.model.occ,
     ):
         if len(x0) == 2:
             x0 = (x0[0], x0[1], 0.0)
@@ -39,7 +43,7 @@ class Disk:
         self.radius0 = radius0
         self.radius1 = radius1
 
-        self._id = gmsh.model.occ.addDisk(*x0, radius0, radius1)
+        self._id = env.addDisk(*x0, radius0, radius1)
         self.dim_tag = (self.dim, self._id)
         self.dim_tags = [self.dim_tag]
 
@@ -1,3 +1,5 @@
+from __future__ import annotations
+
 import math
 import warnings
 from itertools import groupby
@@ -5,6 +7,7 @@ from itertools import groupby
 import gmsh
 
 from .. import common
+from ..common.recipe import recorded
 from .ball import Ball
 from .box import Box
 from .cone import Cone
@@ -23,15 +26,22 @@ def _all_equal(iterable):
 
 
 class Geometry(common.CommonGeometry):
-    def __init__(self, init_argv=None):
-        super().__init__(gmsh.model.occ, init_argv=init_argv)
-
-    def __exit__(self, *_):
-        # TODO remove once gmsh 4.7.0 is out long enough (out November 5, 2020)
-        # <https://gitlab.onelab.info/gmsh/gmsh/-/issues/1001>
-        gmsh.option.setNumber("Mesh.CharacteristicLengthMin", 0.0)
-        gmsh.option.setNumber("Mesh.CharacteristicLengthMax", 1.0e22)
-        gmsh.finalize()
+    def __init__(
+        self,
+        init_argv=None,
+        merge_tolerance: float | None = None,
+        record: bool = False,
+        profile_api: bool = False,
+        dry_run: bool = False,
+    ):
+        super().__init__(
+            gmsh.model.occ,
+            init_argv=init_argv,
+            merge_tolerance=merge_tolerance,
+            record=record,
+            profile_api=profile_api,
+            dry_run=dry_run,
+        )
 
     @property
     def characteristic_length_min(self):
@@ -42,16 +52,20 @@ class Geometry(common.CommonGeometry):
         return gmsh.option.getNumber("Mesh.CharacteristicLengthMax")
 
     @characteristic_length_min.setter
+    @recorded
     def characteristic_length_min(self, val):
-        gmsh.option.setNumber("Mesh.CharacteristicLengthMin", val)
+        self._set_option("Mesh.CharacteristicLengthMin", val)
 
     @characteristic_length_max.setter
+    @recorded
     def characteristic_length_max(self, val):
-        gmsh.option.setNumber("Mesh.CharacteristicLengthMax", val)
+        self._set_option("Mesh.CharacteristicLengthMax", val)
 
+    @recorded
     def force_outward_normals(self, tag):
         self._OUTWARD_NORMALS.append(tag)
 
+    @recorded
     def revolve(self, *args, **kwargs):
         if len(args) >= 4:
             angle = args[3]
@@ -62,61 +76,71 @@ class Geometry(common.CommonGeometry):
         assert angle < 2 * math.pi
         return super()._revolve(*args, **kwargs)
 
+    @recorded
     def add_rectangle(self, *args, mesh_size=None, **kwargs):
-        entity = Rectangle(*args, **kwargs)
+        entity = self._register(Rectangle(*args, env=self.env, **kwargs))
         if mesh_size is not None:
             self._SIZE_QUEUE.append((entity, mesh_size))
         return entity
 
+    @recorded
     def add_disk(self, *args, mesh_size=None, **kwargs):
-        entity = Disk(*args, **kwargs)
+        entity = self._register(Disk(*args, env=self.env, **kwargs))
         if mesh_size is not None:
             self._SIZE_QUEUE.append((entity, mesh_size))
         return entity
 
+    @recorded
     def add_ball(self, *args, mesh_size=None, **kwargs):
-        obj = Ball(*args, **kwargs)
+        obj = self._register(Ball(*args, env=self.env, **kwargs))
         if mesh_size is not None:
             self._SIZE_QUEUE.append((obj, mesh_size))
         return obj
 
+    @recorded
     def add_box(self, *args, mesh_size=None, **kwargs):
-        box = Box(*args, **kwargs)
+        box = self._register(Box(*args, env=self.env, **kwargs))
         if mesh_size is not None:
             self._SIZE_QUEUE.append((box, mesh_size))
         return box
 
+    @recorded
     def add_cone(self, *args, mesh_size=None, **kwargs):
-        cone = Cone(*args, **kwargs)
+        cone = self._register(Cone(*args, env=self.env, **kwargs))
         if mesh_size is not None:
             self._SIZE_QUEUE.append((cone, mesh_size))
         return cone
 
+    @recorded
     def add_cylinder(self, *args, mesh_size=None, **kwargs):
-        cyl = Cylinder(*args, **kwargs)
+        cyl = self._register(Cylinder(*args, env=self.env, **kwargs))
         if mesh_size is not None:
             self._SIZE_QUEUE.append((cyl, mesh_size))
         return cyl
 
+    @recorded
     def add_ellipsoid(self, center, radii, mesh_size=None):
-        obj = Ball(center, 1.0)
+        obj = self._register(Ball(center, 1.0, env=self.env))
         self.dilate(obj, center, radii)
         if mesh_size is not None:
             self._SIZE_QUEUE.append((obj, mesh_size))
         return obj
 
+    @recorded
     def add_torus(self, *args, mesh_size=None, **kwargs):
-        obj = Torus(*args, **kwargs)
+        obj = self._register(Torus(*args, env=self.env, **kwargs))
         if mesh_size is not None:
             self._SIZE_QUEUE.append((obj, mesh_size))
         return obj
 
+    @recorded
     def add_wedge(self, *args, mesh_size=None, **kwargs):
-        obj = Wedge(*args, **kwargs)
+        obj = self._register(Wedge(*args, env=self.env, **kwargs))
         if mesh_size is not None:
             self._SIZE_QUEUE.append((obj, mesh_size))
         return obj
 
+    @recorded
     def boolean_intersection(
         self, entities, delete_first: bool = True, delete_other: bool = True
     ):
@@ -130,7 +154,7 @@ class Geometry(common.CommonGeometry):
         # form subsequent intersections
         # https://gitlab.onelab.info/gmsh/gmsh/-/issues/999
         for e in entities[1:]:
-            out, _ = gmsh.model.occ.intersect(
+            out, _ = self.env.intersect(
                 ent,
                 [ee.dim_tag for ee in e],
                 removeObject=delete_first,
@@ -144,23 +168,21 @@ class Geometry(common.CommonGeometry):
                 )
             ent = [out[0]]
 
-        # remove entities from SIZE_QUEUE if necessary
+        # remove entities from the registry and SIZE_QUEUE if necessary
         all_entities = []
         if delete_first:
             all_entities += entities[0]
         if delete_other:
             for e in entities[1:]:
                 all_entities += e
-        for s in self._SIZE_QUEUE:
-            if s[0] in all_entities:
-                warnings.warn(
-                    f"Specified mesh size for {s[0]} "
-                    "discarded in Boolean intersection operation."
-                )
-        self._SIZE_QUEUE = [s for s in self._SIZE_QUEUE if s[0] not in all_entities]
+        for e in self._unregister(all_entities):
+            warnings.warn(
+                f"Specified mesh size for {e} discarded in Boolean intersection operation."
+            )
 
-        return [Dummy(*ent[0])]
+        return [self._register(Dummy(*ent[0]))]
 
+    @recorded
     def boolean_union(
         self, entities, delete_first: bool = True, delete_other: bool = True
     ):
@@ -170,30 +192,28 @@ class Geometry(common.CommonGeometry):
         """
         entities = [e if isinstance(e, list) else [e] for e in entities]
 
-        dim_tags, _ = gmsh.model.occ.fuse(
+        dim_tags, _ = self.env.fuse(
             [e.dim_tag for e in entities[0]],
             [ee.dim_tag for e in entities[1:] for ee in e],
             removeObject=delete_first,
             removeTool=delete_other,
         )
 
-        # remove entities from SIZE_QUEUE if necessary
+        # remove entities from the registry and SIZE_QUEUE if necessary
         all_entities = []
         if delete_first:
             all_entities += entities[0]
         if delete_other:
             for ent in entities[1:]:
                 all_entities += ent
-        for s in self._SIZE_QUEUE:
-            if s[0] in all_entities:
-                warnings.warn(
-                    f"Specified mesh size for {s[0]} "
-                    "discarded in Boolean union operation."
-                )
-        self._SIZE_QUEUE = [s for s in self._SIZE_QUEUE if s[0] not in all_entities]
+        for e in self._unregister(all_entities):
+            warnings.warn(
+                f"Specified mesh size for {e} discarded in Boolean union operation."
+            )
 
-        return [Dummy(*dim_tag) for dim_tag in dim_tags]
+        return [self._register(Dummy(*dim_tag)) for dim_tag in dim_tags]
 
+    @recorded
     def boolean_difference(
         self, d0, d1, delete_first: bool = True, delete_other: bool = True
     ):
@@ -203,29 +223,27 @@ class Geometry(common.CommonGeometry):
         """
         d0 = d0 if isinstance(d0, list) else [d0]
         d1 = d1 if isinstance(d1, list) else [d1]
-        dim_tags, _ = gmsh.model.occ.cut(
+        dim_tags, _ = self.env.cut(
             [d.dim_tag for d in d0],
             [d.dim_tag for d in d1],
             removeObject=delete_first,
             removeTool=delete_other,
         )
 
-        # remove entities from SIZE_QUEUE if necessary
+        # remove entities from the registry and SIZE_QUEUE if necessary
         all_entities = []
         if delete_first:
             all_entities += d0
         if delete_other:
             all_entities += d1
-        for s in self._SIZE_QUEUE:
-            if s[0] in all_entities:
-                warnings.warn(
-                    f"Specified mesh size for {s[0]} "
-                    "discarded in Boolean difference operation."
-                )
-        self._SIZE_QUEUE = [s for s in self._SIZE_QUEUE if s[0] not in all_entities]
+        for e in self._unregister(all_entities):
+            warnings.warn(
+                f"Specified mesh size for {e} discarded in Boolean difference operation."
+            )
 
-        return [Dummy(*dim_tag) for dim_tag in dim_tags]
+        return [self._register(Dummy(*dim_tag)) for dim_tag in dim_tags]
 
+    @recorded
     def boolean_fragments(
         self, d0, d1, delete_first: bool = True, delete_other: bool = True
     ):
@@ -235,29 +253,27 @@ class Geometry(common.CommonGeometry):
         """
         d0 = d0 if isinstance(d0, list) else [d0]
         d1 = d1 if isinstance(d1, list) else [d1]
-        dim_tags, _ = gmsh.model.occ.fragment(
+        dim_tags, _ = self.env.fragment(
             [d.dim_tag for d in d0],
             [d.dim_tag for d in d1],
             removeObject=delete_first,
             removeTool=delete_other,
         )
 
-        # remove entities from SIZE_QUEUE if necessary
+        # remove entities from the registry and SIZE_QUEUE if necessary
         all_entities = []
         if delete_first:
             all_entities += d0
         if delete_other:
             all_entities += d1
-        for s in self._SIZE_QUEUE:
-            if s[0] in all_entities:
-                warnings.warn(
-                    f"Specified mesh size for {s[0]} "
-                    "discarded in Boolean fragments operation."
-                )
-        self._SIZE_QUEUE = [s for s in self._SIZE_QUEUE if s[0] not in all_entities]
+        for e in self._unregister(all_entities):
+            warnings.warn(
+                f"Specified mesh size for {e} discarded in Boolean fragments operation."
+            )
 
-        return [Dummy(*dim_tag) for dim_tag in dim_tags]
+        return [self._register(Dummy(*dim_tag)) for dim_tag in dim_tags]
 
+    @recorded
     def import_shapes(self, filename: str):
-        s = gmsh.model.occ.importShapes(filename)
-        return [Dummy(*i) for i in s]
+        s = self.env.importShapes(filename)
+        return [self._register(Dummy(*i)) for i in s]
@@ -15,6 +15,9 @@ class Rectangle:
         Rectangle height.
     corner_radius : float
         Defines a radius to round the rectangle corners.
+    env : module
+        Gmsh kernel namespace the entity is created with, `gmsh.model.occ` by
+        default.
     """
 
     dim = 2
@@ -25,6 +28,7 @@ class Rectangle:
         a: float,
         b: float,
         corner_radius: float | None = None,
+        env=gmsh.model.occ,
     ):
         assert len(x0) == 3
 
@@ -36,7 +40,7 @@ class Rectangle:
         if corner_radius is None:
             corner_radius = 0.0
 
-        self._id = gmsh.model.occ.addRectangle(*x0, a, b, roundedRadius=corner_radius)
+        self._id = env.addRectangle(*x0, a, b, roundedRadius=corner_radius)
         self.dim_tag = (self.dim, self._id)
         self.dim_tags = [self.dim_tag]
 
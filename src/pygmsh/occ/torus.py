@@ -15,11 +15,14 @@ class Torus:
         Outer radius.
     alpha : float
         Defines the angular opening.
+    env : module
+        Gmsh kernel namespace the entity is created with, `gmsh.model.occ` by
+        default.
     """
 
     dim = 3
 
-    def __init__(self, center, radius0, radius1, alpha=2 * pi):
+    def __init__(self, center, radius0, radius1, alpha=2 * pi, env=gmsh.model.occ):
         assert len(center) == 3
 
         self.center = center
@@ -27,7 +30,7 @@ class Torus:
         self.radius1 = radius1
         self.alpha = alpha
 
-        self._id = gmsh.model.occ.addTorus(*center, radius0, radius1, angle=alpha)
+        self._id = env.addTorus(*center, radius0, radius1, angle=alpha)
         self.dim_tag = (3, self._id)
         self.dim_tags = [self.dim_tag]
 
@@ -11,16 +11,19 @@ class Wedge:
         List of the 3 extends of the box edges.
     top_extend : float
         Defines the top X extent.
+    env : module
+        Gmsh kernel namespace the entity is created with, `gmsh.model.occ` by
+        default.
     """
 
     dim = 3
 
-    def __init__(self, x0, extents, top_extent=None):
+    def __init__(self, x0, extents, top_extent=None, env=gmsh.model.occ):
         self.x0 = x0
         self.extents = extents
         self.top_extent = top_extent
 
-        self._id = gmsh.model.occ.addWedge(*x0, *extents, ltx=top_extent)
+        self._id = env.addWedge(*x0, *extents, ltx=top_extent)
         self.dim_tags = [(3, self._id)]
 
     def __repr__(self):
@@ -0,0 +1,242 @@
+"""Timing of the phases of mesh generation and of the Gmsh API calls of geometry
+construction."""
+from __future__ import annotations
+
+import time
+from contextlib import ExitStack, contextmanager
+
+import gmsh
+
+# Gmsh's mesh statistics, by meshio cell type
+_COUNT_OPTIONS = {
+    "triangle": "Mesh.NbTriangles",
+    "quad": "Mesh.NbQuadrangles",
+    "tetra": "Mesh.NbTetrahedra",
+    "hexahedron": "Mesh.NbHexahedra",
+    "wedge": "Mesh.NbPrisms",
+    "pyramid": "Mesh.NbPyramids",
+}
+
+
+def _mesh_counts():
+    nodes = int(gmsh.option.getNumber("Mesh.NbNodes"))
+    elements = {
+        cell_type: int(gmsh.option.getNumber(key))
+        for cell_type, key in _COUNT_OPTIONS.items()
+    }
+    return nodes, {cell_type: n for cell_type, n in elements.items() if n > 0}
+
+
+class Phase:
+    """
+    One phase of the mesh generation.
+
+    Attributes
+    ----------
+    name : Name of the phase, e.g., "synchronize" or "generate_3d".
+    wall : Wall time in seconds.
+    cpu : CPU time of the process (all threads) in seconds.
+    nodes : Number of mesh nodes after the phase.
+    elements : Number of 2D and 3D elements after the phase, by meshio cell type.
+    """
+
+    def __init__(self, name, wall, cpu, nodes, elements):
+        self.name = name
+        self.wall = wall
+        self.cpu = cpu
+        self.nodes = nodes
+        self.elements = elements
+
+    def __repr__(self):
+        return f"<pygmsh Phase {self.name}, {self.wall:.3f} s>"
+
+    def as_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "wall": self.wall,
+            "cpu": self.cpu,
+            "nodes": self.nodes,
+            "elements": dict(self.elements),
+        }
+
+
+class Profile:
+    """
+    Per-phase timings of one `generate_mesh()` call, in order of execution. The node
+    and element counts are taken from Gmsh's mesh statistics, which are cheap to query.
+
+    Attributes
+    ----------
+    phases : list of :class:`Phase`.
+    """
+
+    def __init__(self):
+        self.phases = []
+
+    def __repr__(self):
+        return f"<pygmsh Profile, {len(self.phases)} phases, {self.wall:.3f} s>"
+
+    def __str__(self):
+        rows = [f"{'phase':<20} {'wall [s]':>10} {'cpu [s]':>10} {'nodes':>10}"]
+        for p in self.phases:
+            rows.append(f"{p.name:<20} {p.wall:10.4f} {p.cpu:10.4f} {p.nodes:10d}")
+        rows.append(f"{'total':<20} {self.wall:10.4f} {self.cpu:10.4f}")
+        return "\n".join(rows)
+
+    @property
+    def wall(self) -> float:
+        return sum(p.wall for p in self.phases)
+
+    @property
+    def cpu(self) -> float:
+        return sum(p.cpu for p in self.phases)
+
+    @contextmanager
+    def phase(self, name: str):
+        """Record the enclosed code as a phase."""
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall
+            cpu = time.process_time() - cpu
+            self.phases.append(Phase(name, wall, cpu, *_mesh_counts()))
+
+    def totals(self) -> dict:
+        """Wall and CPU times summed by phase name, e.g., for aggregating many runs."""
+        out = {}
+        for p in self.phases:
+            wall, cpu = out.get(p.name, (0.0, 0.0))
+            out[p.name] = (wall + p.wall, cpu + p.cpu)
+        return out
+
+    def as_dict(self) -> dict:
+        return {
+            "wall": self.wall,
+            "cpu": self.cpu,
+            "phases": [p.as_dict() for p in self.phases],
+        }
+
+
+@contextmanager
+def _no_phase(name: str):
+    yield
+
+
+def _combine_phases(*phases):
+    """Combine the phase context managers of several recorders into one."""
+    phases = [phase for phase in phases if phase is not None]
+    if len(phases) == 0:
+        return _no_phase
+    if len(phases) == 1:
+        return phases[0]
+
+    @contextmanager
+    def phase(name: str):
+        with ExitStack() as stack:
+            for p in phases:
+                stack.enter_context(p(name))
+            yield
+
+    return phase
+
+
+def _size(arg) -> int:
+    """Number of scalars in an argument, e.g., of a list of tags."""
+    if isinstance(arg, (list, tuple)):
+        return sum(_size(item) for item in arg)
+    if hasattr(arg, "size") and hasattr(arg, "shape"):
+        # NumPy arrays
+        return int(arg.size)
+    return 1
+
+
+class CallStats:
+    """
+    Statistics of the calls of one Gmsh API function.
+
+    Attributes
+    ----------
+    name : Function name, e.g., "fuse" or "mesh.setTransfiniteCurve".
+    calls : Number of calls.
+    time : Cumulative wall time in seconds.
+    arg_size : Cumulative number of scalars in the arguments, e.g., tags and
+        coordinates.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.time = 0.0
+        self.arg_size = 0
+
+    def __repr__(self):
+        return f"<pygmsh CallStats {self.name}, {self.calls} calls, {self.time:.3f} s>"
+
+    def as_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "calls": self.calls,
+            "time": self.time,
+            "arg_size": self.arg_size,
+        }
+
+
+class ApiProfiler:
+    """
+    Stand-in for a Gmsh API namespace, e.g., `gmsh.model.occ`, that forwards all calls
+    and records their number, wall time, and argument sizes per function.
+
+    Attributes
+    ----------
+    stats : :class:`CallStats` by function name.
+    """
+
+    def __init__(self, env, stats: dict | None = None, prefix: str = ""):
+        self._env = env
+        self._prefix = prefix
+        self.stats = {} if stats is None else stats
+
+    def __repr__(self):
+        return f"<pygmsh ApiProfiler of {self._env.__qualname__}>"
+
+    def __str__(self):
+        rows = [f"{'function':<30} {'calls':>8} {'time [s]':>10} {'arg size':>10}"]
+        for st in self.sorted():
+            rows.append(
+                f"{st.name:<30} {st.calls:8d} {st.time:10.4f} {st.arg_size:10d}"
+            )
+        return "\n".join(rows)
+
+    def __getattr__(self, name):
+        attr = getattr(self._env, name)
+        if isinstance(attr, type):
+            # sub-namespace, e.g., gmsh.model.geo.mesh
+            return ApiProfiler(attr, self.stats, f"{self._prefix}{name}.")
+        if not callable(attr):
+            return attr
+
+        key = self._prefix + name
+
+        def wrapper(*args, **kwargs):
+            t = time.perf_counter()
+            try:
+                return attr(*args, **kwargs)
+            finally:
+                t = time.perf_counter() - t
+                st = self.stats.get(key)
+                if st is None:
+                    st = self.stats[key] = CallStats(key)
+                st.calls += 1
+                st.time += t
+                st.arg_size += _size(args) + _size(list(kwargs.values()))
+
+        return wrapper
+
+    def sorted(self) -> list:
+        """The call statistics, most expensive first."""
+        return sorted(self.stats.values(), key=lambda st: -st.time)
+
+    def as_dict(self) -> dict:
+        return {st.name: st.as_dict() for st in self.sorted()}
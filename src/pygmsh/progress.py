@@ -0,0 +1,196 @@
+"""Progress events of mesh generation, from the phases of `generate_mesh()` and the
+messages of Gmsh.
+
+Gmsh's logger collects messages without timestamps, and its API must not be called while
+Gmsh meshes in another thread. Instead, Gmsh's terminal output is redirected to pipes
+during a phase and read by background threads, which timestamp the messages as they
+arrive; Gmsh flushes every message. The events are sent to the callback from the calling
+thread when the phase ends.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable
+
+from .helpers import _scoped_options
+from .profiling import _mesh_counts
+
+logger = logging.getLogger("pygmsh")
+
+_ENTITY_DIMS = {"curve": 1, "surface": 2, "volume": 3}
+# the 3D Delaunay mesher reports "Found volume 1" when it starts refining a volume
+_ENTITY_RE = re.compile(r"(?:Meshing|Found) (curve|surface|volume) (\d+)")
+# Gmsh's terminal output, e.g., "Info    : [ 10%] Meshing curve 2 (Line)"
+_MESSAGE_RE = re.compile(r"(Info|Warning|Error) *: (.*)")
+
+
+class Event:
+    """
+    Progress event of `generate_mesh()`.
+
+    Attributes
+    ----------
+    stage : Phase of the mesh generation, e.g., "synchronize" or "generate_2d", see
+        :class:`pygmsh.profiling.Profile`.
+    kind : "start" and "done" of a stage, "entity" when Gmsh started meshing an entity,
+        or "warning" and "error" for Gmsh's messages.
+    elapsed : Seconds since the start of `generate_mesh()`.
+    entity : (dim, tag) of the entity for "entity" events, `None` otherwise.
+    message : Gmsh's message for "entity", "warning", and "error" events.
+    nodes : Number of mesh nodes at the end of the stage, for "done" events.
+    elements : Number of 2D and 3D elements by type at the end of the stage, for "done"
+        events.
+    """
+
+    def __init__(
+        self,
+        stage,
+        kind,
+        elapsed,
+        entity=None,
+        message=None,
+        nodes=None,
+        elements=None,
+    ):
+        self.stage = stage
+        self.kind = kind
+        self.elapsed = elapsed
+        self.entity = entity
+        self.message = message
+        self.nodes = nodes
+        self.elements = elements
+
+    def __repr__(self):
+        return f"<pygmsh Event {self.stage} {self.kind}, {self.elapsed:.3f} s>"
+
+    def as_dict(self) -> dict:
+        return {
+            "stage": self.stage,
+            "kind": self.kind,
+            "elapsed": self.elapsed,
+            "entity": self.entity,
+            "message": self.message,
+            "nodes": self.nodes,
+            "elements": self.elements,
+        }
+
+
+def log_event(event: Event):
+    """Send an event to the "pygmsh" logger of Python's `logging`. The event is
+    attached to the log record as the attribute `pygmsh` (a dict).
+    """
+    extra = {"pygmsh": event.as_dict()}
+    if event.kind == "done":
+        logger.info(
+            "%s done after %.3f s: %d nodes",
+            event.stage,
+            event.elapsed,
+            event.nodes,
+            extra=extra,
+        )
+    elif event.kind == "warning":
+        logger.warning("%s: %s", event.stage, event.message, extra=extra)
+    elif event.kind == "error":
+        logger.error("%s: %s", event.stage, event.message, extra=extra)
+    elif event.kind == "entity":
+        logger.debug("%s: %s", event.stage, event.message, extra=extra)
+    else:
+        logger.debug("%s started after %.3f s", event.stage, event.elapsed, extra=extra)
+
+
+def _parse(stage, line, elapsed):
+    match = _MESSAGE_RE.match(line)
+    if match is None:
+        return None
+    level, text = match.groups()
+    if level == "Warning":
+        return Event(stage, "warning", elapsed, message=text)
+    if level == "Error":
+        return Event(stage, "error", elapsed, message=text)
+    match = _ENTITY_RE.search(text)
+    if match is not None:
+        entity = (_ENTITY_DIMS[match.group(1)], int(match.group(2)))
+        return Event(stage, "entity", elapsed, entity=entity, message=text)
+    return None
+
+
+class _Reader(threading.Thread):
+    """Redirect a file descriptor, e.g., 1 for stdout, to a pipe and collect the events
+    of Gmsh's messages written to it. All other output, and Gmsh's messages with `echo`,
+    is passed on to the original file descriptor.
+    """
+
+    def __init__(self, fd: int, stage: str, t0: float, echo: bool):
+        super().__init__(daemon=True)
+        self.fd = fd
+        self.stage = stage
+        self.t0 = t0
+        self.echo = echo
+        self.events = []
+        self.saved = os.dup(fd)
+        self.read_end, write_end = os.pipe()
+        os.dup2(write_end, fd)
+        os.close(write_end)
+
+    def run(self):
+        with os.fdopen(self.read_end, "rb") as f, os.fdopen(
+            self.saved, "wb", buffering=0, closefd=False
+        ) as out:
+            for line in f:
+                elapsed = time.perf_counter() - self.t0
+                text = line.decode(errors="replace")
+                event = _parse(self.stage, text, elapsed)
+                if event is not None:
+                    self.events.append(event)
+                if self.echo or _MESSAGE_RE.match(text) is None:
+                    out.write(line)
+
+    def restore(self):
+        """Undo the redirection, which ends the thread."""
+        os.dup2(self.saved, self.fd)
+        self.join()
+        os.close(self.saved)
+
+
+class Tracker:
+    """Send the events of the phases of a mesh generation to `callback`. Gmsh's
+    messages are only printed with `echo`.
+    """
+
+    def __init__(self, callback: Callable[[Event], None], echo: bool = False):
+        self.callback = callback
+        self.echo = echo
+        self.t0 = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name: str):
+        self.callback(Event(name, "start", time.perf_counter() - self.t0))
+        sys.stdout.flush()
+        sys.stderr.flush()
+        # Gmsh prints info messages to stdout, warnings and errors to stderr
+        readers = [_Reader(fd, name, self.t0, self.echo) for fd in [1, 2]]
+        for reader in readers:
+            reader.start()
+        try:
+            with _scoped_options({"General.Terminal": 1}):
+                yield
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            for reader in readers:
+                reader.restore()
+            events = sorted(
+                (e for reader in readers for e in reader.events),
+                key=lambda e: e.elapsed,
+            )
+            for event in events:
+                self.callback(event)
+            elapsed = time.perf_counter() - self.t0
+            nodes, elements = _mesh_counts()
+            self.callback(Event(name, "done", elapsed, nodes=nodes, elements=elements))
@@ -0,0 +1,369 @@
+"""Element quality measures of meshio meshes and of the mesh in the current Gmsh model.
+
+All measures are computed block by block in chunks of `chunk_size` cells, so the
+memory for temporary arrays stays bounded even for very large meshes. Supported are
+triangles, quads, tetrahedra, hexahedra, and wedges (prisms), including their
+higher-order variants, of which only the corner nodes are considered.
+
+Measures of non-simplicial elements are taken at the corners: the corner simplex of a
+vertex is formed by the vertex and its neighbors in the element. Measures that are 1 for
+ideal elements (`radius_ratio`, `scaled_jacobian`) are scaled such that the square, the
+cube, and the right prism with equilateral base get 1 as well.
+"""
+from __future__ import annotations
+
+import functools
+import re
+
+import gmsh
+import numpy as np
+
+# corner simplices as (vertex, neighbors...), positively oriented for positively
+# oriented elements
+_CORNERS = {
+    "triangle": [[0, 1, 2], [1, 2, 0], [2, 0, 1]],
+    "quad": [[0, 1, 3], [1, 2, 0], [2, 3, 1], [3, 0, 2]],
+    "tetra": [[0, 1, 2, 3], [1, 2, 0, 3], [2, 0, 1, 3], [3, 0, 2, 1]],
+    "hexahedron": [[i, (i + 1) % 4, (i + 3) % 4, i + 4] for i in range(4)]
+    + [[i + 4, (i + 3) % 4 + 4, (i + 1) % 4 + 4, i] for i in range(4)],
+    "wedge": [[i, (i + 1) % 3, (i + 2) % 3, i + 3] for i in range(3)]
+    + [[i + 3, (i + 2) % 3 + 3, (i + 1) % 3 + 3, i] for i in range(3)],
+}
+
+_EDGES = {
+    "triangle": [[0, 1], [1, 2], [2, 0]],
+    "quad": [[0, 1], [1, 2], [2, 3], [3, 0]],
+    "tetra": [[0, 1], [1, 2], [2, 0], [0, 3], [1, 3], [2, 3]],
+    "hexahedron": [[i, (i + 1) % 4] for i in range(4)]
+    + [[i + 4, (i + 1) % 4 + 4] for i in range(4)]
+    + [[i, i + 4] for i in range(4)],
+    "wedge": [[i, (i + 1) % 3] for i in range(3)]
+    + [[i + 3, (i + 1) % 3 + 3] for i in range(3)]
+    + [[i, i + 3] for i in range(3)],
+}
+
+# decomposition into positively oriented triangles or tetrahedra
+_SIMPLICES = {
+    "triangle": [[0, 1, 2]],
+    "quad": [[0, 1, 2], [0, 2, 3]],
+    "tetra": [[0, 1, 2, 3]],
+    "hexahedron": [
+        [0, 1, 2, 6],
+        [0, 2, 3, 6],
+        [0, 3, 7, 6],
+        [0, 7, 4, 6],
+        [0, 4, 5, 6],
+        [0, 5, 1, 6],
+    ],
+    "wedge": [[0, 1, 2, 3], [1, 2, 3, 4], [2, 3, 4, 5]],
+}
+
+_NUM_NODES = {"triangle": 3, "quad": 4, "tetra": 4, "hexahedron": 8, "wedge": 6}
+
+_SQRT3 = np.sqrt(3.0)
+_REFERENCE = {
+    "triangle": [[0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [0.5, _SQRT3 / 2, 0.0]],
+    "quad": [[0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [1.0, 1.0, 0.0], [0.0, 1.0, 0.0]],
+    "tetra": [
+        [0.0, 0.0, 0.0],
+        [1.0, 0.0, 0.0],
+        [0.5, _SQRT3 / 2, 0.0],
+        [0.5, _SQRT3 / 6, np.sqrt(2.0 / 3.0)],
+    ],
+    "hexahedron": [
+        [0.0, 0.0, 0.0],
+        [1.0, 0.0, 0.0],
+        [1.0, 1.0, 0.0],
+        [0.0, 1.0, 0.0],
+        [0.0, 0.0, 1.0],
+        [1.0, 0.0, 1.0],
+        [1.0, 1.0, 1.0],
+        [0.0, 1.0, 1.0],
+    ],
+    "wedge": [
+        [0.0, 0.0, 0.0],
+        [1.0, 0.0, 0.0],
+        [0.5, _SQRT3 / 2, 0.0],
+        [0.0, 0.0, 1.0],
+        [1.0, 0.0, 1.0],
+        [0.5, _SQRT3 / 2, 1.0],
+    ],
+}
+
+METRICS = [
+    "radius_ratio",
+    "min_dihedral_angle",
+    "max_dihedral_angle",
+    "aspect_ratio",
+    "scaled_jacobian",
+    "signed_volume",
+]
+
+
+def _base_type(cell_type: str) -> str | None:
+    """The linear type of a cell type, e.g., "tetra" for "tetra10", or `None` if the
+    type isn't supported.
+    """
+    base = re.sub(r"\d+$", "", cell_type)
+    return base if base in _NUM_NODES else None
+
+
+def _dim(cell_type):
+    return 2 if cell_type in ["triangle", "quad"] else 3
+
+
+def _normals(p, cell_type, planar):
+    """Unit normals of 2D elements `p`, the z-direction for planar meshes."""
+    if planar:
+        return np.broadcast_to([0.0, 0.0, 1.0], (len(p), 3))
+    n = sum(
+        np.cross(p[:, b] - p[:, a], p[:, c] - p[:, a])
+        for a, b, c in _CORNERS[cell_type]
+    )
+    return n / np.linalg.norm(n, axis=-1, keepdims=True)
+
+
+def _corner_edges(p, cell_type):
+    """Edge vectors of the corner simplices, shape (n, corners, dim, 3)."""
+    corners = np.array(_CORNERS[cell_type])
+    return p[:, corners[:, 1:]] - p[:, corners[:, :1]]
+
+
+def _triangle_radius_ratio(e1, e2, det):
+    a = np.linalg.norm(e1, axis=-1)
+    b = np.linalg.norm(e2, axis=-1)
+    c = np.linalg.norm(e2 - e1, axis=-1)
+    q = (b + c - a) * (c + a - b) * (a + b - c) / (a * b * c)
+    return np.copysign(q, det)
+
+
+def _tetra_radius_ratio(e1, e2, e3):
+    vol = np.einsum("...i,...i", e1, np.cross(e2, e3)) / 6
+    area = 0.5 * (
+        np.linalg.norm(np.cross(e1, e2), axis=-1)
+        + np.linalg.norm(np.cross(e1, e3), axis=-1)
+        + np.linalg.norm(np.cross(e2, e3), axis=-1)
+        + np.linalg.norm(np.cross(e2 - e1, e3 - e1), axis=-1)
+    )
+    # products of the lengths of opposite edges
+    aa = np.linalg.norm(e1, axis=-1) * np.linalg.norm(e3 - e2, axis=-1)
+    bb = np.linalg.norm(e2, axis=-1) * np.linalg.norm(e3 - e1, axis=-1)
+    cc = np.linalg.norm(e3, axis=-1) * np.linalg.norm(e2 - e1, axis=-1)
+    prod = (aa + bb + cc) * (aa + bb - cc) * (aa - bb + cc) * (-aa + bb + cc)
+    # 3 * inradius / circumradius
+    return 216 * vol * np.abs(vol) / (area * np.sqrt(np.abs(prod)))
+
+
+def _radius_ratio(p, cell_type, planar):
+    e = _corner_edges(p, cell_type)
+    if _dim(cell_type) == 2:
+        n = _normals(p, cell_type, planar)[:, None]
+        det = np.einsum("...i,...i", np.cross(e[..., 0, :], e[..., 1, :]), n)
+        q = _triangle_radius_ratio(e[..., 0, :], e[..., 1, :], det)
+    else:
+        q = _tetra_radius_ratio(e[..., 0, :], e[..., 1, :], e[..., 2, :])
+    return np.min(q, axis=1)
+
+
+def _scaled_jacobian(p, cell_type, planar):
+    e = _corner_edges(p, cell_type)
+    lengths = np.prod(np.linalg.norm(e, axis=-1), axis=-1)
+    if _dim(cell_type) == 2:
+        n = _normals(p, cell_type, planar)[:, None]
+        det = np.einsum("...i,...i", np.cross(e[..., 0, :], e[..., 1, :]), n)
+    else:
+        det = np.einsum("...i,...i", e[..., 0, :], np.cross(e[..., 1, :], e[..., 2, :]))
+    return np.min(det / lengths, axis=1)
+
+
+def _angles(p, cell_type, planar):
+    """Interior angles of 2D elements, dihedral angles of 3D elements, in degrees."""
+    e = _corner_edges(p, cell_type)
+    if _dim(cell_type) == 2:
+        n = _normals(p, cell_type, planar)[:, None]
+        det = np.einsum("...i,...i", np.cross(e[..., 0, :], e[..., 1, :]), n)
+        dot = np.einsum("...i,...i", e[..., 0, :], e[..., 1, :])
+        return np.degrees(np.mod(np.arctan2(det, dot), 2 * np.pi))
+
+    angles = []
+    for i, j, k in [(0, 1, 2), (1, 2, 0), (2, 0, 1)]:
+        # angle along edge i between the faces spanned by (i, j) and (i, k)
+        na = np.cross(e[..., i, :], e[..., j, :])
+        nb = np.cross(e[..., i, :], e[..., k, :])
+        cos = np.einsum("...i,...i", na, nb) / (
+            np.linalg.norm(na, axis=-1) * np.linalg.norm(nb, axis=-1)
+        )
+        angles.append(np.degrees(np.arccos(np.clip(cos, -1.0, 1.0))))
+    return np.concatenate(angles, axis=1)
+
+
+def _min_dihedral_angle(p, cell_type, planar):
+    return np.min(_angles(p, cell_type, planar), axis=1)
+
+
+def _max_dihedral_angle(p, cell_type, planar):
+    return np.max(_angles(p, cell_type, planar), axis=1)
+
+
+def _aspect_ratio(p, cell_type, planar):
+    edges = np.array(_EDGES[cell_type])
+    lengths = np.linalg.norm(p[:, edges[:, 1]] - p[:, edges[:, 0]], axis=-1)
+    return np.max(lengths, axis=1) / np.min(lengths, axis=1)
+
+
+def _signed_volume(p, cell_type, planar):
+    simplices = np.array(_SIMPLICES[cell_type])
+    e = p[:, simplices[:, 1:]] - p[:, simplices[:, :1]]
+    if _dim(cell_type) == 2:
+        n = _normals(p, cell_type, planar)[:, None]
+        det = np.einsum("...i,...i", np.cross(e[..., 0, :], e[..., 1, :]), n) / 2
+    else:
+        det = (
+            np.einsum("...i,...i", e[..., 0, :], np.cross(e[..., 1, :], e[..., 2, :]))
+            / 6
+        )
+    return np.sum(det, axis=1)
+
+
+_FUNCTIONS = {
+    "radius_ratio": _radius_ratio,
+    "min_dihedral_angle": _min_dihedral_angle,
+    "max_dihedral_angle": _max_dihedral_angle,
+    "aspect_ratio": _aspect_ratio,
+    "scaled_jacobian": _scaled_jacobian,
+    "signed_volume": _signed_volume,
+}
+
+# measures that are normalized to 1 for the reference elements
+_NORMALIZED = ["radius_ratio", "scaled_jacobian"]
+
+
+@functools.lru_cache(maxsize=None)
+def _reference_value(metric, cell_type):
+    p = np.array([_REFERENCE[cell_type]])
+    return _FUNCTIONS[metric](p, cell_type, True)[0]
+
+
+def compute_block(
+    points,
+    cells,
+    cell_type: str,
+    metric: str = "radius_ratio",
+    chunk_size: int = 2**16,
+) -> np.ndarray:
+    """Compute a quality measure for every cell of a block.
+
+    :param points: node coordinates, shape (n, 2) or (n, 3)
+    :param cells: node indices of the cells, shape (m, nodes per cell)
+    :param cell_type: meshio cell type, e.g., "tetra" or "hexahedron27"
+    :param metric: one of
+
+        - "radius_ratio": (dim * inradius / circumradius) of the worst corner
+          simplex, 1 for ideal elements, negative for inverted ones
+        - "min_dihedral_angle", "max_dihedral_angle": in degrees; for 2D elements the
+          interior angles
+        - "aspect_ratio": ratio of the longest to the shortest edge
+        - "scaled_jacobian": minimum over the corners of the Jacobian determinant
+          divided by the edge lengths, 1 for ideal elements, negative for inverted
+          ones
+        - "signed_volume": volume, area for 2D elements, negative for inverted ones.
+          2D elements are oriented by the z-axis if all points lie in the xy-plane,
+          otherwise by their own normal, so their area is positive except for
+          non-convex quads.
+
+    :param chunk_size: number of cells processed at once
+    """
+    base = _base_type(cell_type)
+    if base is None:
+        raise ValueError(f"Unsupported cell type {cell_type}.")
+    if metric not in _FUNCTIONS:
+        raise ValueError(f"Unknown metric {metric}. Choose from {METRICS}.")
+    fun = _FUNCTIONS[metric]
+
+    points = np.asarray(points, dtype=float)
+    if points.shape[1] == 2:
+        points = np.column_stack([points, np.zeros(len(points))])
+    planar = not np.any(points[:, 2])
+    cells = np.asarray(cells)[:, : _NUM_NODES[base]]
+
+    out = np.empty(len(cells))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for k in range(0, len(cells), chunk_size):
+            p = points[cells[k : k + chunk_size]]
+            out[k : k + chunk_size] = fun(p, base, planar)
+    if metric in _NORMALIZED:
+        out /= _reference_value(metric, base)
+    return out
+
+
+def compute(
+    mesh,
+    metric: str = "radius_ratio",
+    dim: int | None = None,
+    chunk_size: int = 2**16,
+) -> list:
+    """Compute a quality measure for the cells of a meshio mesh, see
+    :func:`compute_block`. Returns one array per cell block, `None` for blocks of other
+    dimensions or unsupported types (e.g., lines), so the result can be used as cell
+    data.
+
+    :param dim: dimension of the cells, default: the highest one in the mesh
+    """
+    types = [_base_type(block.type) for block in mesh.cells]
+    if dim is None:
+        dim = max((_dim(t) for t in types if t is not None), default=None)
+    return [
+        None
+        if t is None or _dim(t) != dim
+        else compute_block(mesh.points, block.data, block.type, metric, chunk_size)
+        for t, block in zip(types, mesh.cells)
+    ]
+
+
+def from_gmsh(quality_name: str = "gamma", dim: int | None = None) -> np.ndarray:
+    """Compute the quality of the elements in the current Gmsh model with
+    `gmsh.model.mesh.getElementQualities()`, without extracting the mesh.
+
+    :param quality_name: Gmsh quality measure, e.g., "gamma" (inscribed to
+        circumscribed radius ratio), "minSICN", or "minSJ"
+    :param dim: dimension of the elements, default: the highest one in the mesh
+    """
+    elements = {}
+    for elem_type in gmsh.model.mesh.getElementTypes():
+        elem_dim = gmsh.model.mesh.getElementProperties(elem_type)[1]
+        tags, _ = gmsh.model.mesh.getElementsByType(elem_type)
+        elements.setdefault(elem_dim, []).append(tags)
+    if dim is None:
+        dim = max(elements, default=None)
+    if dim not in elements:
+        return np.empty(0)
+    tags = np.concatenate(elements[dim])
+    return np.asarray(gmsh.model.mesh.getElementQualities(tags, quality_name))
+
+
+def summary(q, bins=40, range: tuple[float, float] | None = None) -> dict:
+    """Summary statistics and a histogram of quality values. Values outside of the
+    histogram, e.g., negative qualities of inverted elements with `range=(0, 1)`, are
+    counted in "below" and "above".
+
+    :param q: array of values, or list of arrays (with `None`s) as returned by
+        :func:`compute`
+    :param bins: number of histogram bins, or the bin edges
+    :param range: range of the histogram, `None` for the range of the values
+    """
+    if isinstance(q, list):
+        q = [item for item in q if item is not None]
+        q = np.concatenate(q) if len(q) > 0 else np.empty(0)
+    if len(q) == 0:
+        return {"count": 0}
+    hist, bin_edges = np.histogram(q, bins=bins, range=range)
+    return {
+        "count": len(q),
+        "min": float(np.min(q)),
+        "max": float(np.max(q)),
+        "mean": float(np.mean(q)),
+        "histogram": hist,
+        "bin_edges": bin_edges,
+        "below": int(np.count_nonzero(q < bin_edges[0])),
+        "above": int(np.count_nonzero(q > bin_edges[-1])),
+    }
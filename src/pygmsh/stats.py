@@ -0,0 +1,231 @@
+"""Counts and bounding boxes of the mesh in Gmsh, without extracting it."""
+from __future__ import annotations
+
+import gmsh
+import meshio
+
+from .helpers import _scoped_options
+from .profiling import _mesh_counts
+
+
+class MeshStats:
+    """
+    Statistics of the mesh of the current Gmsh model.
+
+    Attributes
+    ----------
+    nodes : Number of mesh nodes.
+    elements : Number of elements of all dimensions by meshio cell type. The 2D and 3D
+        totals are taken from Gmsh's mesh statistics, the vertex and line elements are
+        counted on the points and curves.
+    bounding_box : (xmin, ymin, zmin, xmax, ymax, zmax) of the model.
+    entities : {(dim, tag): {"bounding_box": ..., "nodes": ..., "elements": {cell type:
+        count}}} of all elementary entities, `None` if not collected. The nodes are the
+        ones inside of the entity, without its boundary.
+    physical_groups : {(dim, tag): {"label": ..., "entities": [...], "elements":
+        {cell type: count}}} of all physical groups, `None` if not collected.
+    """
+
+    def __init__(self, nodes, elements, bounding_box, entities, physical_groups):
+        self.nodes = nodes
+        self.elements = elements
+        self.bounding_box = bounding_box
+        self.entities = entities
+        self.physical_groups = physical_groups
+
+    def __repr__(self):
+        num_elements = sum(self.elements.values())
+        return f"<pygmsh MeshStats, {self.nodes} nodes, {num_elements} elements>"
+
+    def __str__(self):
+        rows = [f"nodes: {self.nodes}"]
+        for cell_type, n in self.elements.items():
+            rows.append(f"{cell_type}: {n}")
+        if self.entities is not None:
+            rows.append(f"{'entity':<20} {'nodes':>12} {'elements':>12}  types")
+            for (dim, tag), entity in self.entities.items():
+                rows.append(_row(f"{dim}, {tag}", entity["nodes"], entity["elements"]))
+        if self.physical_groups is not None and len(self.physical_groups) > 0:
+            rows.append(f"{'physical group':<20} {'':>12} {'elements':>12}  types")
+            for (dim, tag), group in self.physical_groups.items():
+                name = group["label"] or f"{dim}, {tag}"
+                rows.append(_row(name, "", group["elements"]))
+        return "\n".join(rows)
+
+    def as_dict(self) -> dict:
+        def items(d):
+            return None if d is None else [{"dim_tag": k, **v} for k, v in d.items()]
+
+        return {
+            "nodes": self.nodes,
+            "elements": dict(self.elements),
+            "bounding_box": self.bounding_box,
+            "entities": items(self.entities),
+            "physical_groups": items(self.physical_groups),
+        }
+
+
+def _row(name, nodes, elements):
+    types = ", ".join(f"{k}: {v}" for k, v in elements.items())
+    return f"{name:<20} {nodes:>12} {sum(elements.values()):>12}  {types}"
+
+
+def _count(elem_type, tag):
+    # Gmsh's API can't count elements. getBarycenters() returns three coordinates per
+    # element, but unlike getElementsByType() no tags and connectivity; with fast=True,
+    # they're sums, not even divided by the number of nodes.
+    return len(gmsh.model.mesh.getBarycenters(elem_type, tag, True, True)) // 3
+
+
+def _count_elements(dim, tag):
+    counts = {}
+    for elem_type in gmsh.model.mesh.getElementTypes(dim, tag):
+        cell_type = meshio.gmsh.gmsh_to_meshio_type[elem_type]
+        counts[cell_type] = counts.get(cell_type, 0) + _count(elem_type, tag)
+    return counts
+
+
+def _first_tags(groups, key, total):
+    # Binary search for the first tag of each of the sorted groups among the tags 1,
+    # ..., total, assuming that `key(tag)` doesn't decrease with the tag.
+    firsts = []
+    lo = 1
+    for group in groups:
+        hi = total + 1
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if key(mid) < group:
+                lo = mid + 1
+            else:
+                hi = mid
+        firsts.append(lo)
+    firsts.append(total + 1)
+    return firsts
+
+
+def _count_by_tag_ranges(groups, key, total):
+    """Number of tags in each of the sorted `groups`, or `None` if the tags aren't
+    numbered 1, ..., total in the order of the groups.
+    """
+    try:
+        # a tag beyond the total means that others are missing
+        key(total + 1)
+        return None
+    except Exception:
+        pass
+    try:
+        firsts = _first_tags(groups, key, total)
+        counts = [b - a for a, b in zip(firsts[:-1], firsts[1:])]
+        for group, first, n in zip(groups, firsts, counts):
+            if n > 0 and (key(first) != group or key(first + n - 1) != group):
+                return None
+    except Exception:
+        # a missing tag
+        return None
+    return counts
+
+
+def _count_per_entity(entities, num_nodes, num_elements):
+    """Nodes and elements by type of the entities from the ranges of their tags. After
+    generating the mesh, Gmsh numbers the nodes and elements contiguously by entity,
+    and the elements within an entity by type, so a few lookups of single nodes and
+    elements suffice. Returns `None` if the mesh is numbered differently, e.g., after
+    an incremental remesh.
+    """
+    index = {dim_tag: i for i, dim_tag in enumerate(entities)}
+    types = {
+        dim_tag: list(gmsh.model.mesh.getElementTypes(*dim_tag)) for dim_tag in entities
+    }
+
+    def node_key(tag):
+        return index[tuple(gmsh.model.mesh.getNode(tag)[2:])]
+
+    def element_key(tag):
+        elem_type, _, dim, entity = gmsh.model.mesh.getElement(tag)
+        return (index[(dim, entity)], types[(dim, entity)].index(elem_type))
+
+    groups = [(i, j) for i, e in enumerate(entities) for j in range(len(types[e]))]
+    # lookups of missing tags are expected, don't print Gmsh's errors
+    with _scoped_options({"General.Terminal": 0}):
+        nodes = _count_by_tag_ranges(range(len(entities)), node_key, num_nodes)
+        elements = _count_by_tag_ranges(groups, element_key, num_elements)
+    if nodes is None or elements is None:
+        return None
+
+    out = {e: (n, {}) for e, n in zip(entities, nodes)}
+    for (i, j), n in zip(groups, elements):
+        counts = out[entities[i]][1]
+        cell_type = meshio.gmsh.gmsh_to_meshio_type[types[entities[i]][j]]
+        counts[cell_type] = counts.get(cell_type, 0) + n
+    return out
+
+
+def _count_per_entity_slow(entities, low_dim):
+    out = {}
+    for dim, tag in entities:
+        node_tags, _, _ = gmsh.model.mesh.getNodes(
+            dim, tag, includeBoundary=False, returnParametricCoord=False
+        )
+        elements = low_dim[(dim, tag)] if dim < 2 else _count_elements(dim, tag)
+        out[(dim, tag)] = (len(node_tags), elements)
+    return out
+
+
+def mesh_stats(per_entity: bool = False) -> MeshStats:
+    """Counts and bounding boxes of the mesh of the current Gmsh model.
+
+    By default, only the totals and the bounding box of the model are collected: the
+    node and 2D and 3D element counts from Gmsh's statistics, and the vertex and line
+    elements by counting them on the points and curves. This takes milliseconds for
+    meshes of any size. With `per_entity=True`, the nodes and elements of every entity
+    and the elements of every physical group are counted, too.
+
+    :param per_entity: also count the nodes and elements of each entity and the
+        elements of each physical group. For a freshly generated mesh, the counts
+        follow from the ranges of the node and element tags, which costs a few lookups
+        per entity and element type, and Gmsh's index of all nodes and elements (a
+        pointer each) if it doesn't exist yet. If the mesh was changed after its
+        generation, e.g., by an incremental remesh, the node tags and coordinates and
+        a barycenter per element are read instead, one entity at a time, i.e., about
+        32 bytes per node and 24 bytes per element of the largest entity.
+    """
+    nodes, elements = _mesh_counts()
+    bounding_box = gmsh.model.getBoundingBox(-1, -1)
+
+    low_dim = {
+        e: _count_elements(*e) for d in [0, 1] for e in gmsh.model.getEntities(d)
+    }
+    for counts in low_dim.values():
+        for cell_type, n in counts.items():
+            elements[cell_type] = elements.get(cell_type, 0) + n
+
+    if not per_entity:
+        return MeshStats(nodes, elements, bounding_box, None, None)
+
+    all_entities = gmsh.model.getEntities()
+    counts = _count_per_entity(all_entities, nodes, sum(elements.values()))
+    if counts is None:
+        counts = _count_per_entity_slow(all_entities, low_dim)
+    entities = {}
+    for dim_tag in all_entities:
+        num_nodes, entity_elements = counts[dim_tag]
+        entities[dim_tag] = {
+            "bounding_box": gmsh.model.getBoundingBox(*dim_tag),
+            "nodes": num_nodes,
+            "elements": entity_elements,
+        }
+
+    physical_groups = {}
+    for dim, tag in gmsh.model.getPhysicalGroups():
+        members = list(gmsh.model.getEntitiesForPhysicalGroup(dim, tag))
+        counts = {}
+        for e in members:
+            for cell_type, n in entities[(dim, e)]["elements"].items():
+                counts[cell_type] = counts.get(cell_type, 0) + n
+        physical_groups[(dim, tag)] = {
+            "label": gmsh.model.getPhysicalName(dim, tag),
+            "entities": [int(e) for e in members],
+            "elements": counts,
+        }
+
+    return MeshStats(nodes, elements, bounding_box, entities, physical_groups)
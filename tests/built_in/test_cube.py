@@ -1,5 +1,6 @@
 """Creates a mesh on a cube.
 """
+import gmsh
 from helpers import compute_volume
 
 import pygmsh
@@ -15,5 +16,22 @@ def test():
     return mesh
 
 
+def test_threads():
+    with pygmsh.geo.Geometry() as geom:
+        geom.add_box(0, 1, 0, 1, 0, 1, 0.2)
+        num_threads = gmsh.option.getNumber("General.NumThreads")
+        algorithm_3d = gmsh.option.getNumber("Mesh.Algorithm3D")
+        mesh = geom.generate_mesh(
+            algorithm_3d=10, num_threads=2, max_num_threads=(1, 1, 2)
+        )
+        # the options are only set for the call
+        assert gmsh.option.getNumber("General.NumThreads") == num_threads
+        assert gmsh.option.getNumber("Mesh.Algorithm3D") == algorithm_3d
+        assert gmsh.option.getNumber("Mesh.MaxNumThreads3D") == 0
+
+    ref = 1.0
+    assert abs(compute_volume(mesh) - ref) < 1.0e-2 * ref
+
+
 if __name__ == "__main__":
     test().write("cube.vtu")
@@ -0,0 +1,51 @@
+import gmsh
+import numpy as np
+from helpers import compute_volume
+
+import pygmsh
+
+
+def _check_entities():
+    # every element only uses nodes of its own entity or the entity's boundary
+    for dim, tag in gmsh.model.getEntities(2):
+        nodes, _, _ = gmsh.model.mesh.getNodes(dim, tag, includeBoundary=True)
+        _, _, elem_nodes = gmsh.model.mesh.getElements(dim, tag)
+        for n in elem_nodes:
+            assert np.all(np.isin(n, nodes))
+
+
+def test_transfinite_curve():
+    with pygmsh.geo.Geometry() as geom:
+        r0 = geom.add_rectangle(0.0, 1.0, 0.0, 1.0, 0.0, mesh_size=0.2)
+        r1 = geom.add_rectangle(2.0, 3.0, 0.0, 1.0, 0.0, mesh_size=0.2)
+        geom.generate_mesh(dim=2, incremental=True)
+
+        geom.set_transfinite_curve(r0.curves[0], 20, "Progression", 1.0)
+        mesh = geom.generate_mesh(dim=2, incremental=True)
+        assert (2, r0.surface._id) in geom.remeshed_entities
+        assert (2, r1.surface._id) not in geom.remeshed_entities
+        _check_entities()
+
+    assert abs(compute_volume(mesh) - 2.0) < 1.0e-10
+    # no triangle spans the gap between the rectangles
+    x = mesh.points[mesh.get_cells_type("triangle"), 0]
+    assert np.all((x.max(axis=1) <= 1.0) | (x.min(axis=1) >= 2.0))
+
+
+def test_element_type():
+    with pygmsh.geo.Geometry() as geom:
+        r0 = geom.add_rectangle(0.0, 1.0, 0.0, 1.0, 0.0, mesh_size=0.2)
+        geom.add_rectangle(2.0, 3.0, 0.0, 1.0, 0.0, mesh_size=0.2)
+        geom.generate_mesh(dim=2, order=2, incremental=True)
+
+        # dropping the order must not leave second-order elements in kept entities
+        geom.set_transfinite_curve(r0.curves[0], 20, "Progression", 1.0)
+        mesh = geom.generate_mesh(dim=2, incremental=True)
+        assert geom.remeshed_entities == sorted(gmsh.model.getEntities())
+        assert "triangle6" not in mesh.cells_dict
+
+        gmsh.option.setNumber("Mesh.RecombineAll", 1)
+        mesh = geom.generate_mesh(dim=2, incremental=True)
+        assert geom.remeshed_entities == sorted(gmsh.model.getEntities())
+        assert "triangle" not in mesh.cells_dict
+        gmsh.option.setNumber("Mesh.RecombineAll", 0)
@@ -0,0 +1,34 @@
+import gmsh
+import numpy as np
+import pytest
+from helpers import compute_volume
+
+import pygmsh
+
+
+@pytest.mark.parametrize("merge_tolerance", [None, 1.0e-10])
+def test(merge_tolerance):
+    with pygmsh.geo.Geometry(merge_tolerance=merge_tolerance) as geom:
+        # 3x2 grid of adjacent unit squares
+        for i in range(3):
+            for j in range(2):
+                # slight perturbation of the corners
+                eps = 1.0e-12 * (i + j)
+                geom.add_rectangle(i + eps, i + 1, j, j + 1 + eps, 0.0, mesh_size=0.5)
+        mesh = geom.generate_mesh()
+        num_points = len(gmsh.model.getEntities(0))
+        num_curves = len(gmsh.model.getEntities(1))
+
+    ref = 6.0
+    assert abs(compute_volume(mesh) - ref) < 1.0e-2 * ref
+
+    _, counts = np.unique(mesh.points.round(8), axis=0, return_counts=True)
+    if merge_tolerance is None:
+        assert num_points == 24
+        assert num_curves == 24
+        assert np.any(counts > 1)
+    else:
+        # the mesh is conforming
+        assert num_points == 12
+        assert num_curves == 17
+        assert np.all(counts == 1)
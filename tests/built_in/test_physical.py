@@ -1,4 +1,6 @@
 import meshio
+import numpy as np
+import pytest
 
 import pygmsh
 
@@ -20,6 +22,64 @@ def test(lcar=0.5):
     return mesh
 
 
+def test_mixed_cell_types():
+    with pygmsh.geo.Geometry() as geom:
+        # recombining a triangle leaves a mix of triangles and quads
+        tri = geom.add_polygon([[0.0, 0.0], [1.0, 0.0], [0.3, 1.1]], 0.3)
+        geom.set_recombined_surfaces([tri.surface])
+        geom.add_physical(tri, label="tri")
+        geom.add_physical(tri.lines, label="boundary")
+        mesh = geom.generate_mesh(dim=2)
+
+    cell_types = [cells.type for cells in mesh.cells]
+    assert "triangle" in cell_types
+    assert "quad" in cell_types
+
+    # every cell of the surface is in the physical group, all block-local indices
+    # are valid
+    for name, cell_types in [("tri", ["triangle", "quad"]), ("boundary", ["line"])]:
+        for cells, idx in zip(mesh.cells, mesh.cell_sets[name]):
+            if cells.type in cell_types:
+                assert np.array_equal(np.sort(idx), np.arange(len(cells)))
+            else:
+                assert idx is None
+
+
+def test_selective_extraction():
+    with pygmsh.geo.Geometry() as geom:
+        poly = geom.add_polygon([[0.0, 0.0], [1.0, 0.0], [1.0, 1.0], [0.0, 1.0]], 0.5)
+        top, volume, _ = geom.extrude(poly, [0, 0, 2])
+        geom.add_physical(poly, label="bottom")
+        geom.add_physical(top, label="top")
+        geom.add_physical(volume, label="volume")
+
+        mesh = geom.generate_mesh()
+        mesh_3d = pygmsh.helpers.extract_to_meshio(cell_dims=[3])
+        mesh_top = pygmsh.helpers.extract_to_meshio(physical_labels=["top"])
+        mesh_none = pygmsh.helpers.extract_to_meshio(
+            cell_dims=[3], physical_labels=["top"]
+        )
+        with pytest.raises(ValueError):
+            pygmsh.helpers.extract_to_meshio(physical_labels=["nope"])
+
+    assert [c.type for c in mesh_3d.cells] == ["tetra"]
+    assert np.array_equal(mesh_3d.cells[0].data, mesh.cells_dict["tetra"])
+    assert np.array_equal(mesh_3d.points, mesh.points)
+    assert list(mesh_3d.cell_sets) == ["volume"]
+
+    # only the points of the top surface are kept
+    assert [c.type for c in mesh_top.cells] == ["triangle"]
+    assert np.allclose(mesh_top.points[:, 2], 2.0)
+    assert np.array_equal(
+        np.unique(mesh_top.cells[0].data), np.arange(len(mesh_top.points))
+    )
+    idx = mesh_top.cell_sets["top"][0]
+    assert np.array_equal(np.sort(idx), np.arange(len(mesh_top.cells[0])))
+
+    assert len(mesh_none.cells) == 0
+    assert len(mesh_none.points) == 0
+
+
 if __name__ == "__main__":
     test().write("physical.vtu")
     read_mesh = meshio.read("physical.vtu")
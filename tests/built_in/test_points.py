@@ -0,0 +1,32 @@
+import numpy as np
+from helpers import compute_volume
+
+import pygmsh
+
+
+def test():
+    n = 100
+    t = np.linspace(0.0, 2 * np.pi, n, endpoint=False)
+    x = np.column_stack([np.cos(t), np.sin(t)])
+    mesh_size = np.full(n, 0.1)
+    mesh_size[::2] = np.nan
+
+    with pygmsh.geo.Geometry() as geom:
+        points = geom.add_points(x, mesh_size=mesh_size)
+        assert len(points) == n
+        assert points.x.shape == (n, 3)
+        assert len(np.unique(points.tags)) == n
+
+        lines = [geom.add_line(points[k], points[(k + 1) % n]) for k in range(n)]
+        geom.add_plane_surface(geom.add_curve_loop(lines))
+        geom.translate(points, [1.0, 0.0, 0.0])
+        mesh = geom.generate_mesh()
+
+    ref = n / 2 * np.sin(2 * np.pi / n)
+    assert abs(compute_volume(mesh) - ref) < 1.0e-2 * ref
+    assert np.all(mesh.points[:, 0] >= 0.0)
+    return mesh
+
+
+if __name__ == "__main__":
+    test().write("points.vtu")
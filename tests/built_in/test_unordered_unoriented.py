@@ -1,6 +1,7 @@
 import random
 
 import numpy as np
+import pytest
 from helpers import compute_volume
 
 import pygmsh
@@ -37,5 +38,45 @@ def test():
     return mesh
 
 
+def test_multiple_loops():
+    with pygmsh.geo.Geometry() as geom:
+        outer = [geom.add_point(x) for x in [[0, 0], [2, 0], [2, 2], [0, 2]]]
+        hole = [geom.add_point(x) for x in [[0.5, 0.5], [1, 0.5], [1, 1], [0.5, 1]]]
+        lines = [geom.add_line(outer[k], outer[(k + 1) % 4]) for k in range(4)]
+        # reverse some of the hole lines
+        lines += [geom.add_line(hole[(k + 1) % 4], hole[k]) for k in range(2)]
+        lines += [geom.add_line(hole[k], hole[(k + 1) % 4]) for k in range(2, 4)]
+        # open chain
+        chain = [geom.add_point(x) for x in [[3, 0], [4, 0], [4, 1]]]
+        open_lines = [
+            geom.add_line(chain[1], chain[0]),
+            geom.add_line(chain[1], chain[2]),
+        ]
+
+        random.seed(1)
+        all_lines = lines + open_lines
+        random.shuffle(all_lines)
+
+        loops, open_chains = pygmsh.chain_lines(all_lines)
+        assert len(loops) == 2
+        assert len(open_chains) == 1
+        # outer boundary first
+        assert {abs(c._id) for c in loops[0]} == {c._id for c in lines[:4]}
+        assert {abs(c._id) for c in open_chains[0]} == {c._id for c in open_lines}
+        for chain in loops + open_chains:
+            for c0, c1 in zip(chain[:-1], chain[1:]):
+                assert c0.points[-1] == c1.points[0]
+
+        with pytest.raises(ValueError):
+            pygmsh.orient_lines(all_lines)
+
+        curve_loops = [geom.add_curve_loop(loop) for loop in loops]
+        geom.add_plane_surface(curve_loops[0], curve_loops[1:])
+        mesh = geom.generate_mesh(cell_dims=[2])
+
+    ref = 3.75
+    assert abs(compute_volume(mesh) - ref) < 1.0e-2 * ref
+
+
 if __name__ == "__main__":
     test().write("physical.vtu")
@@ -0,0 +1,64 @@
+import gmsh
+import numpy as np
+from helpers import compute_volume
+
+import pygmsh
+
+
+def _volume_mesh(tag):
+    nodes, coords, _ = gmsh.model.mesh.getNodes(3, tag, includeBoundary=True)
+    _, _, elems = gmsh.model.mesh.getElements(3, tag)
+    # connectivity by coordinates, independent of the node tags
+    x = dict(zip(nodes.tolist(), coords.reshape(-1, 3).tolist()))
+    return sorted(tuple(map(tuple, (x[n] for n in e))) for e in elems[0].reshape(-1, 4))
+
+
+def test_disjoint():
+    with pygmsh.occ.Geometry() as geom:
+        box0 = geom.add_box([0.0, 0.0, 0.0], [1.0, 1.0, 1.0], mesh_size=0.2)
+        box1 = geom.add_box([2.0, 0.0, 0.0], [1.0, 1.0, 1.0], mesh_size=0.2)
+        geom.generate_mesh(incremental=True)
+        assert (3, box0._id) in geom.remeshed_entities
+        ref = _volume_mesh(box0._id)
+        n1 = len(_volume_mesh(box1._id))
+
+        # nothing changed
+        geom.generate_mesh(incremental=True)
+        assert geom.remeshed_entities == []
+
+        geom.set_mesh_size(box1, 0.1)
+        mesh = geom.generate_mesh(incremental=True)
+        assert (3, box1._id) in geom.remeshed_entities
+        assert (3, box0._id) not in geom.remeshed_entities
+        assert _volume_mesh(box0._id) == ref
+        assert len(_volume_mesh(box1._id)) > n1
+
+    assert abs(compute_volume(mesh) - 2.0) < 1.0e-10
+
+
+def test_shared_face():
+    with pygmsh.occ.Geometry() as geom:
+        box0 = geom.add_box([0.0, 0.0, 0.0], [1.0, 1.0, 1.0])
+        box1 = geom.add_box([1.0, 0.0, 0.0], [1.0, 1.0, 1.0])
+        geom.boolean_fragments(box0, box1)
+        geom.synchronize()
+        gmsh.model.mesh.setSize(gmsh.model.getEntities(0), 0.2)
+        geom.generate_mesh(incremental=True)
+        ref = _volume_mesh(1)
+
+        # refine the far end of the second box
+        points = gmsh.model.getBoundary([(3, 2)], False, False, True)
+        far = [p for p in points if gmsh.model.getValue(*p, [])[0] > 1.5]
+        gmsh.model.mesh.setSize(far, 0.1)
+        mesh = geom.generate_mesh(incremental=True)
+        assert (3, 1) not in geom.remeshed_entities
+        assert (3, 2) in geom.remeshed_entities
+        assert _volume_mesh(1) == ref
+
+        # the mesh is conforming: every node is used, no duplicate nodes
+        nodes, _, _ = gmsh.model.mesh.getNodes()
+        assert len(np.unique(nodes)) == len(nodes)
+        used = np.unique(np.concatenate(gmsh.model.mesh.getElements()[2]))
+        assert len(used) == len(nodes)
+
+    assert abs(compute_volume(mesh) - 2.0) < 1.0e-10
@@ -13,5 +13,12 @@ def test():
     return mesh
 
 
+def test_standalone():
+    # the primitives use Gmsh's OpenCASCADE kernel by default
+    with pygmsh.occ.Geometry() as geom:
+        box = pygmsh.occ.box.Box([0.0, 0.0, 0.0], [1, 2, 3])
+        assert abs(geom.env.getMass(*box.dim_tag) - 6.0) < 1.0e-10
+
+
 if __name__ == "__main__":
     test().write("occ_box.vtu")
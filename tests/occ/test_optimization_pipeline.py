@@ -0,0 +1,33 @@
+import pygmsh
+
+
+def test():
+    pipeline = pygmsh.OptimizationPipeline(
+        ["", ("Netgen", 1)], min_quality=0.99, max_rounds=3
+    )
+    with pygmsh.occ.Geometry() as geom:
+        geom.add_ball([0.0, 0.0, 0.0], 1.0, mesh_size=0.2)
+        geom.generate_mesh(optimize=pipeline)
+
+    passes = pipeline.passes
+    assert passes[0]["method"] is None
+    assert 1 < len(passes) <= 7
+    assert passes[-1]["min"] >= passes[0]["min"]
+    for p in passes[1:]:
+        assert p["time"] >= 0.0
+        assert sum(p["histogram"]) == p["count"]
+
+
+def test_target():
+    # the initial mesh is good enough
+    pipeline = pygmsh.OptimizationPipeline(["Netgen"], min_quality=0.0)
+    with pygmsh.occ.Geometry() as geom:
+        geom.add_box([0.0, 0.0, 0.0], [1.0, 1.0, 1.0], mesh_size=0.3)
+        geom.generate_mesh(optimize=pipeline)
+    assert len(pipeline.passes) == 1
+
+    pipeline = pygmsh.OptimizationPipeline(["Netgen"] * 10, time_budget=0.0)
+    with pygmsh.occ.Geometry() as geom:
+        geom.add_box([0.0, 0.0, 0.0], [1.0, 1.0, 1.0], mesh_size=0.3)
+        geom.generate_mesh(optimize=pipeline)
+    assert len(pipeline.passes) == 1
@@ -0,0 +1,24 @@
+import numpy as np
+from helpers import compute_volume
+
+import pygmsh
+
+
+def test():
+    with pygmsh.occ.Geometry() as geom:
+        geom.add_ball([0.0, 0.0, 0.0], 1.0, mesh_size=0.3)
+        mesh = geom.generate_mesh(optimize=["Netgen", ("Laplace2D", 2)])
+    assert abs(compute_volume(mesh) - 4.0 / 3.0 * np.pi) < 0.2
+
+
+def test_high_order():
+    with pygmsh.occ.Geometry() as geom:
+        ball = geom.add_ball([0.0, 0.0, 0.0], 1.0, mesh_size=0.5)
+        geom.generate_mesh(order=2)
+        geom.optimize_mesh("HighOrder", entities=[ball])
+        mesh = geom.generate_mesh(order=2, optimize=[("HighOrder", 1)])
+    assert "tetra10" in mesh.cells_dict
+
+
+if __name__ == "__main__":
+    test()
@@ -0,0 +1,34 @@
+import meshio
+from helpers import compute_volume
+
+import pygmsh
+
+
+def build_rectangle(geom, width, mesh_size):
+    if width < 0.0:
+        raise ValueError("negative width")
+    geom.add_rectangle(0.0, width, 0.0, 1.0, 0.0, mesh_size)
+
+
+def test(tmp_path):
+    params = [
+        {"width": 1.0, "mesh_size": 0.1},
+        {"width": -1.0, "mesh_size": 0.1},
+        {"width": 2.0, "mesh_size": 0.2},
+    ]
+    results = pygmsh.batch.run(
+        build_rectangle, params, generate_mesh_kwargs={"dim": 2}, max_workers=2
+    )
+    assert [r.index for r in results] == [0, 1, 2]
+    assert [r.ok for r in results] == [True, False, True]
+    assert "negative width" in results[1].error
+    for r in results:
+        assert r.time >= 0.0
+    assert abs(compute_volume(results[0].mesh) - 1.0) < 1.0e-10
+    assert abs(compute_volume(results[2].mesh) - 2.0) < 1.0e-10
+
+    out = str(tmp_path / "mesh-{index}-{width}.msh")
+    results = pygmsh.batch.run(build_rectangle, params[2:], out=out, max_workers=1)
+    assert results[0].mesh is None
+    mesh = meshio.read(results[0].filename)
+    assert abs(compute_volume(mesh) - 2.0) < 1.0e-10
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+from helpers import compute_volume
+
+import pygmsh
+
+
+def _box(cache, mesh_size=0.2, physical=True, **kwargs):
+    with pygmsh.geo.Geometry() as geom:
+        box = geom.add_box(0, 1, 0, 1, 0, 1, mesh_size)
+        if physical:
+            geom.add_physical(box.volume, "body")
+        return geom.generate_mesh(cache=cache, **kwargs)
+
+
+def test(tmp_path):
+    cache = pygmsh.cache.MeshCache(tmp_path)
+    ref = _box(cache)
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["entries"] == 1
+
+    mesh = _box(cache)
+    assert cache.hits == 1
+    assert np.array_equal(mesh.points, ref.points)
+    assert [c.type for c in mesh.cells] == [c.type for c in ref.cells]
+    for c0, c1 in zip(mesh.cells, ref.cells):
+        assert np.array_equal(c0.data, c1.data)
+    assert mesh.cell_sets.keys() == ref.cell_sets.keys()
+    for s0, s1 in zip(mesh.cell_sets["body"], ref.cell_sets["body"]):
+        assert (s0 is None and s1 is None) or np.array_equal(s0, s1)
+    assert abs(compute_volume(mesh) - 1.0) < 1.0e-10
+
+    # any change in the model or the parameters is a miss
+    _box(cache, mesh_size=0.25)
+    _box(cache, physical=False)
+    _box(cache, order=2)
+    _box(cache, cell_dtype=np.int32)
+    with pygmsh.occ.Geometry() as geom:
+        geom.add_box([0.0, 0.0, 0.0], [1.0, 1.0, 1.0], mesh_size=0.2)
+        geom.generate_mesh(cache=cache)
+    assert cache.stats()["misses"] == 6
+    assert cache.stats()["entries"] == 6
+
+    # a path works, too
+    _box(tmp_path)
+    assert cache.stats()["entries"] == 6
+
+    cache.clear()
+    assert cache.stats()["entries"] == 0
+
+    with pytest.raises(ValueError):
+        _box(cache, extract=False)
+
+
+def test_eviction(tmp_path):
+    cache = pygmsh.cache.MeshCache(tmp_path, max_size=0)
+    _box(cache, mesh_size=0.2)
+    _box(cache, mesh_size=0.3)
+    assert cache.stats()["entries"] == 1
+    # the most recent one is kept
+    _box(cache, mesh_size=0.3)
+    assert cache.hits == 1
@@ -0,0 +1,35 @@
+import meshio
+
+import pygmsh
+from pygmsh._cli import optimize_cli
+
+
+def _write_meshes(tmp_path):
+    for k, size in enumerate([0.3, 0.4]):
+        with pygmsh.occ.Geometry() as geom:
+            geom.add_ball([0.0, 0.0, 0.0], 1.0, mesh_size=size)
+            geom.generate_mesh(out=str(tmp_path / f"ball{k}.msh"), extract=False)
+        meshio.read(tmp_path / f"ball{k}.msh").write(tmp_path / f"ball{k}.vtu")
+
+
+def test_single(tmp_path):
+    _write_meshes(tmp_path)
+    assert optimize_cli([str(tmp_path / "ball0.vtu"), str(tmp_path / "out.vtu")]) == 0
+    mesh = meshio.read(tmp_path / "out.vtu")
+    assert "tetra" in mesh.cells_dict
+
+
+def test_batch(tmp_path, capsys):
+    _write_meshes(tmp_path)
+    out = str(tmp_path / "optimized" / "{stem}{suffix}")
+    argv = [str(tmp_path / "*.msh"), str(tmp_path / "ball0.vtu"), "-o", out, "-j", "2"]
+    assert optimize_cli(argv) == 0
+    for name in ["ball0.msh", "ball1.msh", "ball0.vtu"]:
+        assert (tmp_path / "optimized" / name).exists()
+    lines = [line for line in capsys.readouterr().out.splitlines() if "->" in line]
+    assert len(lines) == 3
+    assert all("min quality" in line for line in lines)
+
+    # failures are reported, the other files are processed
+    argv = [str(tmp_path / "missing.msh"), str(tmp_path / "ball1.msh"), "-o", out]
+    assert optimize_cli(argv) == 1
@@ -0,0 +1,38 @@
+import pytest
+
+import pygmsh
+
+
+def test_neg():
+    with pygmsh.geo.Geometry() as geom:
+        p0 = geom.add_point([0.0, 0.0])
+        p1 = geom.add_point([1.0, 0.0])
+        line = geom.add_line(p0, p1)
+        neg = -line
+
+        assert neg._id == -line._id
+        assert neg.dim_tag == line.dim_tag
+        # the points are shared, not copied
+        assert neg.points[0] is p1
+        assert neg.points[1] is p0
+        assert (-neg)._id == line._id
+
+        # handles are slotted
+        with pytest.raises(AttributeError):
+            line.foo = 1
+
+
+def test_registry():
+    with pygmsh.occ.Geometry() as geom:
+        box = geom.add_box([0.0, 0.0, 0.0], [1.0, 1.0, 1.0], mesh_size=0.1)
+        ball = geom.add_ball([1.0, 1.0, 1.0], 0.5)
+        assert geom.get_entity(*box.dim_tag) is box
+        assert geom.get_entity(*ball.dim_tag) is ball
+
+        with pytest.warns(UserWarning):
+            (diff,) = geom.boolean_difference(box, ball)
+        assert len(geom._SIZE_QUEUE) == 0
+
+        assert geom.get_entity(*diff.dim_tag) is diff
+        with pytest.raises(KeyError):
+            geom.get_entity(*ball.dim_tag)
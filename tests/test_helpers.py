@@ -1,5 +1,8 @@
 """Tests module for helpers in tests."""
+import gmsh
+import meshio
 import numpy as np
+import pytest
 from helpers import compute_volume
 
 import pygmsh
@@ -19,5 +22,68 @@ def test_save_geo():
         geom.save_geometry("out.geo_unrolled")
 
 
+def test_write(tmp_path):
+    with pygmsh.geo.Geometry() as geom:
+        geom.add_circle([0, 0, 0], 1, 0.1)
+        mesh = geom.generate_mesh(out=tmp_path / "out.msh")
+        pygmsh.write(tmp_path / "out22.msh", msh_version=2.2, binary=True)
+        # the options are only set for the write call
+        assert gmsh.option.getNumber("Mesh.Binary") == 0
+
+    with pygmsh.geo.Geometry() as geom:
+        geom.add_circle([0, 0, 0], 1, 0.1)
+        geom.generate_mesh(
+            out=tmp_path / "direct22.msh",
+            write_options={"msh_version": 2.2, "binary": True},
+            extract=False,
+        )
+        assert gmsh.option.getNumber("Mesh.MshFileVersion") != 2.2
+    with open(tmp_path / "direct22.msh", "rb") as f:
+        assert f.read().startswith(b"$MeshFormat\n2.2 1")
+
+    for filename in ["out.msh", "out22.msh", "direct22.msh"]:
+        mesh2 = meshio.read(tmp_path / filename)
+        assert np.allclose(mesh2.points, mesh.points)
+        assert np.array_equal(mesh2.cells_dict["triangle"], mesh.cells_dict["triangle"])
+
+
+@pytest.mark.parametrize(
+    "node_tags",
+    [
+        # contiguous
+        [1, 2, 3, 4],
+        # nearly contiguous, shuffled
+        [5, 2, 7, 3],
+        # sparse
+        [1000, 10, 100000, 42],
+    ],
+)
+@pytest.mark.parametrize("dtypes", [(np.float64, np.int64), (np.float32, np.int32)])
+def test_extract_to_meshio(node_tags, dtypes):
+    point_dtype, cell_dtype = dtypes
+    points = np.array(
+        [[0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [1.0, 1.0, 0.0], [0.0, 1.0, 0.0]]
+    )
+    triangles = np.array([[0, 1, 2], [0, 2, 3]])
+
+    gmsh.initialize()
+    tag = gmsh.model.addDiscreteEntity(2)
+    node_tags = np.array(node_tags)
+    gmsh.model.mesh.addNodes(2, tag, node_tags, points.flat)
+    gmsh.model.mesh.addElementsByType(tag, 2, [], node_tags[triangles].flat)
+    mesh = pygmsh.helpers.extract_to_meshio(
+        point_dtype=point_dtype, cell_dtype=cell_dtype
+    )
+    gmsh.finalize()
+
+    assert mesh.points.dtype == point_dtype
+    assert mesh.cells[0].data.dtype == cell_dtype
+    # points are sorted by their gmsh tags
+    srt = np.argsort(node_tags)
+    assert np.array_equal(mesh.points, points[srt])
+    # the cells still refer to the same points
+    assert np.array_equal(mesh.points[mesh.cells[0].data], points[triangles])
+
+
 if __name__ == "__main__":
     test()
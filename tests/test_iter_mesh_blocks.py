@@ -0,0 +1,39 @@
+import meshio
+import numpy as np
+import pytest
+from helpers import compute_volume
+
+import pygmsh
+
+
+@pytest.mark.parametrize("by", ["entity", "type"])
+def test(by):
+    chunk_size = 50
+    with pygmsh.geo.Geometry() as geom:
+        geom.add_box(0, 1, 0, 1, 0, 1, 0.2)
+        assert geom.generate_mesh(extract=False) is None
+        ref = pygmsh.helpers.extract_to_meshio()
+
+        points = []
+        cells = {}
+        for kind, _, data in geom.iter_mesh_blocks(by=by, chunk_size=chunk_size):
+            assert len(data) <= chunk_size
+            if kind == "points":
+                # all points come first
+                assert len(cells) == 0
+                points.append(data)
+            else:
+                assert kind == "cells"
+                if data.type not in cells:
+                    cells[data.type] = []
+                cells[data.type].append(data.data)
+
+    mesh = meshio.Mesh(
+        np.concatenate(points),
+        [(key, np.concatenate(value)) for key, value in cells.items()],
+    )
+    assert len(mesh.points) == len(ref.points)
+    assert {key: len(value) for key, value in mesh.cells_dict.items()} == {
+        key: len(value) for key, value in ref.cells_dict.items()
+    }
+    assert abs(compute_volume(mesh) - 1.0) < 1.0e-10
@@ -0,0 +1,82 @@
+import tracemalloc
+
+import gmsh
+import pytest
+
+import pygmsh
+
+
+def _build(geom):
+    geom.add_box(0.0, 1.0, 0.0, 1.0, 0.0, 1.0, mesh_size=0.1)
+
+
+def test():
+    with pygmsh.geo.Geometry() as geom:
+        _build(geom)
+        mesh = geom.generate_mesh(memory=True)
+        memory = geom.memory
+
+    assert len(mesh.get_cells_type("tetra")) > 0
+    names = [p.name for p in memory.phases]
+    assert names.index("generate_2d") < names.index("generate_3d")
+    assert names[-1] == "extract"
+    for p in memory.phases:
+        assert p.rss is None or p.rss > 0
+        assert p.rss_peak is None or p.rss_peak >= p.rss
+    # extraction allocates the arrays of the meshio mesh
+    assert memory.phases[-1].python_peak > mesh.points.nbytes
+    assert memory.peak == max(p.rss_peak for p in memory.phases)
+    assert len(memory.as_dict()["phases"]) == len(names)
+    assert "generate_3d" in str(memory)
+
+
+def test_limit():
+    if pygmsh.memory.rss() is None:
+        pytest.skip("resident set size unknown")
+    with pygmsh.geo.Geometry() as geom:
+        _build(geom)
+        with pytest.raises(MemoryError):
+            geom.generate_mesh(memory_limit=1)
+        # aborted after the first phase
+        assert [p.name for p in geom.memory.phases] == ["synchronize"]
+        assert gmsh.option.getNumber("Mesh.NbNodes") == 0
+
+        # the mesh can still be generated without the limit
+        mesh = geom.generate_mesh()
+    assert len(mesh.get_cells_type("tetra")) > 0
+
+
+def test_limit_while_meshing(monkeypatch):
+    # the process "grows" as soon as Gmsh holds mesh nodes
+    def rss():
+        return 2**30 if gmsh.option.getNumber("Mesh.NbNodes") > 0 else 2**20
+
+    monkeypatch.setattr(pygmsh.memory, "rss", rss)
+    with pygmsh.geo.Geometry() as geom:
+        _build(geom)
+        with pytest.raises(MemoryError):
+            geom.generate_mesh(memory_limit=2**29)
+        assert geom.memory.phases[-1].name == "generate_1d"
+        assert geom.memory.phases[-1].rss_peak == 2**30
+        assert gmsh.option.getNumber("Mesh.NbNodes") == 0
+
+
+def test_tracing_elsewhere(monkeypatch):
+    # tracemalloc started by the user, and no reset_peak() as in Python < 3.9
+    monkeypatch.delattr(tracemalloc, "reset_peak")
+    tracemalloc.start()
+    try:
+        with pygmsh.geo.Geometry() as geom:
+            _build(geom)
+            geom.generate_mesh(memory=True)
+        assert all(p.python_peak is None for p in geom.memory.phases)
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+
+    # started by pygmsh: no reset needed
+    with pygmsh.geo.Geometry() as geom:
+        _build(geom)
+        mesh = geom.generate_mesh(memory=True)
+    assert geom.memory.phases[-1].python_peak > mesh.points.nbytes
+    assert not tracemalloc.is_tracing()
@@ -0,0 +1,75 @@
+import json
+
+import numpy as np
+import pytest
+
+import pygmsh
+
+
+def _mesh(cache=None):
+    with pygmsh.occ.Geometry() as geom:
+        geom.add_ball([0.0, 0.0, 0.0], 1.0, mesh_size=0.3)
+        return geom.generate_mesh(cache=cache)
+
+
+def test(tmp_path):
+    metrics = pygmsh.metrics.enable()
+    try:
+        mesh = _mesh(cache=tmp_path / "cache")
+        _mesh(cache=tmp_path / "cache")
+        pygmsh.optimize(mesh, method="Laplace2D")
+        with pytest.raises(ValueError):
+            with pygmsh.geo.Geometry() as geom:
+                geom.generate_mesh(cache=tmp_path / "cache", extract=False)
+    finally:
+        pygmsh.metrics.disable()
+
+    runs = metrics.runs
+    assert [r.kind for r in runs] == ["generate_mesh"] * 2 + [
+        "optimize",
+        "generate_mesh",
+    ]
+    assert [r.cache_hit for r in runs[:2]] == [False, True]
+    assert [r.failed for r in runs] == [False, False, False, True]
+    assert runs[0].nodes == len(mesh.points)
+    assert runs[0].elements["tetra"] == len(mesh.get_cells_type("tetra"))
+    assert "generate" in runs[0].phases
+    assert "optimize_Laplace2D" in runs[2].phases
+    assert 0.0 < runs[0].worst_quality < 1.0
+
+    metrics.write_jsonl(tmp_path / "runs.jsonl")
+    metrics.write_jsonl(tmp_path / "runs.jsonl")
+    with open(tmp_path / "runs.jsonl") as f:
+        lines = [json.loads(line) for line in f]
+    assert len(lines) == 4
+    assert lines[0]["phases"] == runs[0].phases
+
+    metrics.write_prometheus(tmp_path / "pygmsh.prom")
+    text = (tmp_path / "pygmsh.prom").read_text()
+    assert 'pygmsh_runs_total{kind="generate_mesh",status="ok"} 2' in text
+    assert 'pygmsh_runs_total{kind="generate_mesh",status="failed"} 1' in text
+    assert 'pygmsh_cache_hits_total{kind="generate_mesh"} 1' in text
+    assert 'pygmsh_phase_seconds_total{kind="generate_mesh",phase="generate"}' in text
+    assert "pygmsh_worst_quality" in text
+
+
+def test_unchanged(tmp_path):
+    # recording metrics doesn't change how the mesh is generated
+    ref = _mesh()
+    pygmsh.metrics.enable()
+    try:
+        with pygmsh.occ.Geometry() as geom:
+            geom.add_ball([0.0, 0.0, 0.0], 1.0, mesh_size=0.3)
+            mesh = geom.generate_mesh()
+            assert geom.profile is None
+            assert geom.cache_hit is None
+    finally:
+        pygmsh.metrics.disable()
+    assert np.array_equal(mesh.points, ref.points)
+
+    with pygmsh.occ.Geometry() as geom:
+        geom.add_ball([0.0, 0.0, 0.0], 1.0, mesh_size=0.3)
+        geom.generate_mesh(cache=tmp_path)
+        assert geom.cache_hit is False
+        geom.generate_mesh(cache=tmp_path)
+        assert geom.cache_hit is True
@@ -0,0 +1,68 @@
+import pygmsh
+
+
+def _build(geom):
+    box = geom.add_box(0.0, 1.0, 0.0, 1.0, 0.0, 1.0, mesh_size=0.2)
+    geom.add_physical(box.volume, "box")
+
+
+def test():
+    with pygmsh.geo.Geometry() as geom:
+        _build(geom)
+        ref = geom.generate_mesh()
+        assert geom.profile is None
+
+    with pygmsh.geo.Geometry() as geom:
+        _build(geom)
+        mesh = geom.generate_mesh(profile=True, order=2)
+        profile = geom.profile
+
+    names = [p.name for p in profile.phases]
+    for name in ["synchronize", "physical_groups", "generate_3d", "set_order"]:
+        assert name in names
+    assert names.index("generate_1d") < names.index("generate_2d")
+    assert names[-1] == "extract"
+
+    # meshing by dimension gives the same mesh
+    num_tetra = len(ref.get_cells_type("tetra"))
+    assert len(mesh.get_cells_type("tetra10")) == num_tetra
+    assert profile.phases[names.index("generate_3d")].elements["tetra"] == num_tetra
+    assert profile.phases[-1].nodes == len(mesh.points)
+
+    assert abs(profile.wall - sum(p.wall for p in profile.phases)) < 1.0e-12
+    d = profile.as_dict()
+    assert len(d["phases"]) == len(names)
+    assert set(profile.totals()) == set(names)
+    assert "generate_3d" in str(profile)
+
+
+def test_api_profiler():
+    with pygmsh.occ.Geometry(profile_api=True) as geom:
+        box = geom.add_box([0.0, 0.0, 0.0], [1.0, 1.0, 1.0])
+        ball = geom.add_ball([0.5, 0.5, 1.0], 0.25)
+        geom.boolean_union([box, ball])
+        geom.characteristic_length_max = 0.3
+        mesh = geom.generate_mesh()
+        stats = geom.api_profile.stats
+
+    assert len(mesh.points) > 0
+    assert stats["addBox"].calls == 1
+    assert stats["addSphere"].calls == 1
+    assert stats["fuse"].calls == 1
+    assert stats["addBox"].arg_size == 6
+    assert stats["synchronize"].calls >= 1
+    assert all(st.time >= 0.0 for st in stats.values())
+    assert set(geom.api_profile.as_dict()) == set(stats)
+    assert "fuse" in str(geom.api_profile)
+
+
+def test_dry_run():
+    with pygmsh.geo.Geometry(profile_api=True, dry_run=True) as geom:
+        _build(geom)
+        assert geom.generate_mesh(profile=True) is None
+        assert geom.profile.phases[-1].name == "physical_groups"
+        assert geom.profile.phases[-1].nodes == 0
+        stats = geom.api_profile.stats
+
+    assert stats["addPoint"].calls == 8
+    assert stats["synchronize"].calls == 1
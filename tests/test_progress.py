@@ -0,0 +1,100 @@
+import logging
+
+import gmsh
+import pytest
+
+import pygmsh
+
+
+def test():
+    events = []
+    with pygmsh.occ.Geometry() as geom:
+        geom.add_ball([0.0, 0.0, 0.0], 1.0, mesh_size=0.3)
+        mesh = geom.generate_mesh(progress=events.append)
+
+    stages = [e.stage for e in events if e.kind == "start"]
+    assert stages[0] == "synchronize"
+    assert stages[-4:] == ["generate_1d", "generate_2d", "generate_3d", "extract"]
+    assert (2, 1) in [e.entity for e in events if e.stage == "generate_2d"]
+
+    done = [e for e in events if e.kind == "done"]
+    assert [e.stage for e in done] == stages
+    assert done[-1].nodes == len(mesh.points)
+    assert done[-1].elements["tetra"] == len(mesh.get_cells_type("tetra"))
+    elapsed = [e.elapsed for e in events]
+    assert elapsed == sorted(elapsed)
+
+
+def test_logging(caplog):
+    with caplog.at_level(logging.INFO, logger="pygmsh"):
+        with pygmsh.geo.Geometry() as geom:
+            geom.add_rectangle(0.0, 1.0, 0.0, 1.0, 0.0, mesh_size=0.1)
+            geom.generate_mesh(dim=2, progress=True)
+
+    records = [r for r in caplog.records if r.name == "pygmsh"]
+    assert "generate_2d" in [r.pygmsh["stage"] for r in records]
+    assert all(r.pygmsh["kind"] == "done" for r in records)
+
+
+def test_timestamps():
+    events = []
+    with pygmsh.occ.Geometry() as geom:
+        geom.add_box([0.0, 0.0, 0.0], [1.0, 1.0, 1.0], mesh_size=0.02)
+        geom.generate_mesh(dim=2, extract=False, progress=events.append)
+
+    # the entities are timestamped while the phase runs, not at its end
+    stage = [e for e in events if e.stage == "generate_2d"]
+    entities = [e for e in stage if e.kind == "entity"]
+    assert len(entities) == 6
+    assert entities[0].elapsed < stage[-1].elapsed
+
+
+def test_user_logger():
+    with pygmsh.geo.Geometry() as geom:
+        gmsh.logger.start()
+        geom.add_rectangle(0.0, 1.0, 0.0, 1.0, 0.0, mesh_size=0.1)
+        events = []
+        geom.generate_mesh(dim=2, progress=events.append)
+        # the logger is still running and has all messages
+        log = gmsh.logger.get()
+        gmsh.logger.stop()
+
+    assert any("Meshing surface 1" in m for m in log)
+    assert (2, 1) in [e.entity for e in events]
+
+
+def test_3d(caplog, capfd):
+    with caplog.at_level(logging.DEBUG, logger="pygmsh"):
+        with pygmsh.occ.Geometry() as geom:
+            ball = geom.add_ball([0.0, 0.0, 0.0], 1.0, mesh_size=0.08)
+            mesh = geom.generate_mesh(progress=True)
+
+    events = [r.pygmsh for r in caplog.records if r.name == "pygmsh"]
+    volume = [
+        e for e in events if e["stage"] == "generate_3d" and e["kind"] == "entity"
+    ]
+    assert [e["entity"] for e in volume] == [(3, ball._id)]
+    done = [e for e in events if e["kind"] == "done"]
+    assert done[-1]["nodes"] == len(mesh.points)
+    # the surface is meshed long before the volume
+    surface = [
+        e for e in events if e["stage"] == "generate_2d" and e["kind"] == "entity"
+    ]
+    assert surface[0]["elapsed"] < volume[0]["elapsed"]
+
+    # Gmsh's messages aren't printed without verbose=True
+    out, err = capfd.readouterr()
+    assert "Meshing" not in out + err
+
+
+def test_callback_error():
+    def callback(event):
+        if event.kind == "entity":
+            raise RuntimeError("stop")
+
+    with pygmsh.geo.Geometry() as geom:
+        geom.add_rectangle(0.0, 1.0, 0.0, 1.0, 0.0, mesh_size=0.1)
+        with pytest.raises(RuntimeError):
+            geom.generate_mesh(dim=2, progress=callback)
+        # the output isn't redirected anymore
+        print("after")
@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+
+import pygmsh
+from pygmsh import quality
+
+
+def test_reference():
+    # a cube of 1x1x1 as 6 tetrahedra, 1 hexahedron, and 2 wedges
+    points = np.array(
+        [
+            [0.0, 0.0, 0.0],
+            [1.0, 0.0, 0.0],
+            [1.0, 1.0, 0.0],
+            [0.0, 1.0, 0.0],
+            [0.0, 0.0, 1.0],
+            [1.0, 0.0, 1.0],
+            [1.0, 1.0, 1.0],
+            [0.0, 1.0, 1.0],
+        ]
+    )
+    hexa = np.array([[0, 1, 2, 3, 4, 5, 6, 7]])
+    wedges = np.array([[0, 1, 2, 4, 5, 6], [0, 2, 3, 4, 6, 7]])
+    tetra = np.array(
+        [
+            [0, 1, 2, 6],
+            [0, 2, 3, 6],
+            [0, 3, 7, 6],
+            [0, 7, 4, 6],
+            [0, 4, 5, 6],
+            [0, 5, 1, 6],
+        ]
+    )
+
+    for cells, cell_type in [(hexa, "hexahedron"), (wedges, "wedge"), (tetra, "tetra")]:
+        vol = quality.compute_block(points, cells, cell_type, "signed_volume")
+        assert abs(np.sum(vol) - 1.0) < 1.0e-13
+        assert np.all(vol > 0.0)
+
+    q = quality.compute_block(points, hexa, "hexahedron", "scaled_jacobian")
+    assert np.allclose(q, 1.0)
+    q = quality.compute_block(points, hexa, "hexahedron", "radius_ratio")
+    assert np.allclose(q, 1.0)
+    angles = quality.compute_block(points, wedges, "wedge", "min_dihedral_angle")
+    assert np.allclose(angles, 45.0)
+    ratio = quality.compute_block(points, wedges, "wedge", "aspect_ratio")
+    assert np.allclose(ratio, np.sqrt(2.0))
+
+    # inverted
+    q = quality.compute_block(
+        points, tetra[:, [1, 0, 2, 3]], "tetra", "scaled_jacobian"
+    )
+    assert np.all(q < 0.0)
+
+    # planar quads in 2D, one of them non-convex
+    points = np.array([[0.0, 0.0], [1.0, 0.0], [1.0, 1.0], [0.0, 1.0], [0.7, 0.3]])
+    quads = np.array([[0, 1, 2, 3], [0, 1, 2, 4], [0, 3, 2, 1]])
+    vol = quality.compute_block(points, quads, "quad", "signed_volume")
+    assert np.allclose(vol, [1.0, 0.3, -1.0])
+    angles = quality.compute_block(points, quads, "quad", "max_dihedral_angle")
+    assert np.isclose(angles[0], 90.0)
+    assert angles[1] > 180.0
+
+
+def test_gmsh():
+    with pygmsh.occ.Geometry() as geom:
+        geom.add_ball([0.0, 0.0, 0.0], 1.0, mesh_size=0.2)
+        mesh = geom.generate_mesh()
+        ref = quality.from_gmsh("gamma")
+
+    q = quality.compute(mesh, "radius_ratio", chunk_size=1000)
+    assert sum(item is not None for item in q) == 1
+    assert np.allclose(
+        np.sort(np.concatenate([i for i in q if i is not None])), np.sort(ref)
+    )
+
+    stats = quality.summary(q)
+    assert stats["count"] == len(ref)
+    assert np.sum(stats["histogram"]) == len(ref)
+    assert 0.0 < stats["min"] <= stats["mean"] <= stats["max"] <= 1.0
+    assert stats["below"] == stats["above"] == 0
+
+
+def test_summary_out_of_range():
+    q = np.array([-0.5, 0.2, 0.4, 0.9])
+    stats = quality.summary(q, bins=4)
+    # the default range is the one of the values, nothing is dropped
+    assert stats["bin_edges"][0] == -0.5
+    assert np.sum(stats["histogram"]) == 4
+
+    stats = quality.summary(q, bins=4, range=(0.0, 1.0))
+    assert np.sum(stats["histogram"]) == 3
+    assert stats["below"] == 1
+    assert stats["above"] == 0
+    assert stats["min"] == -0.5
+
+
+def test_unsupported():
+    with pytest.raises(ValueError):
+        quality.compute_block(np.zeros((2, 3)), np.array([[0, 1]]), "line")
@@ -0,0 +1,132 @@
+import json
+import pickle
+
+import numpy as np
+import pytest
+
+import pygmsh
+
+
+def _num_cells(mesh):
+    return {c.type: len(c.data) for c in mesh.cells}
+
+
+def test_geo():
+    with pygmsh.geo.Geometry(record=True) as geom:
+        poly = geom.add_polygon(
+            [[0.0, 0.0], [1.0, 0.0], [1.0, 1.0], [0.0, 1.0]], mesh_size=0.2
+        )
+        points = geom.add_points(np.array([[2.0, 0.0], [2.0, 1.0]]), mesh_size=0.2)
+        lines = [
+            geom.add_line(poly.points[1], points[0]),
+            geom.add_line(points[0], points[1]),
+            geom.add_line(points[1], poly.points[2]),
+        ]
+        loop = geom.add_curve_loop(lines + [-poly.curves[1]])
+        surface = geom.add_plane_surface(loop)
+        geom.set_transfinite_surface(surface, "Left", [])
+        geom.extrude(poly, [0.0, 0.0, 1.0], num_layers=3)
+        geom.add_physical(surface, "right")
+        ref = geom.generate_mesh()
+        recipe = geom.recipe
+
+    # recipes only contain plain data
+    recipe = json.loads(json.dumps(recipe))
+    assert [op["op"] for op in recipe["ops"]] == [
+        "add_polygon",
+        "add_points",
+        "add_line",
+        "add_line",
+        "add_line",
+        "add_curve_loop",
+        "add_plane_surface",
+        "set_transfinite_surface",
+        "extrude",
+        "add_physical",
+    ]
+
+    with pygmsh.geo.Geometry() as geom:
+        geom.replay(recipe)
+        mesh = geom.generate_mesh()
+    assert np.allclose(mesh.points, ref.points)
+    assert _num_cells(mesh) == _num_cells(ref)
+    assert mesh.cell_sets.keys() == ref.cell_sets.keys()
+
+
+def test_occ():
+    with pygmsh.occ.Geometry(record=True) as geom:
+        geom.characteristic_length_max = 0.1
+        box = geom.add_box([0.0, 0.0, 0.0], [1.0, 1.0, 1.0])
+        ball = geom.add_ball([1.0, 1.0, 1.0], 0.5)
+        geom.boolean_difference(box, ball)
+        ref = geom.generate_mesh()
+        recipe = geom.recipe
+
+    recipe = pickle.loads(pickle.dumps(recipe))
+    with pygmsh.occ.Geometry() as geom:
+        geom.replay(recipe)
+        assert geom.characteristic_length_max == 0.1
+        mesh = geom.generate_mesh()
+    assert _num_cells(mesh) == _num_cells(ref)
+
+    with pygmsh.geo.Geometry() as geom:
+        with pytest.raises(ValueError):
+            geom.replay(recipe)
+        with pytest.raises(ValueError):
+            geom.recipe
+
+
+def test_boundary_layer():
+    with pygmsh.geo.Geometry(record=True) as geom:
+        poly = geom.add_polygon(
+            [[0.0, 0.0], [2.0, 0.0], [2.0, 2.0], [0.0, 2.0]], mesh_size=0.5
+        )
+        field = geom.add_boundary_layer(
+            edges_list=[poly.curves[0]],
+            lcmin=0.01,
+            lcmax=0.5,
+            distmin=0.0,
+            distmax=0.2,
+        )
+        geom.set_background_mesh([field], operator="Min")
+        geom.set_mesh_size(poly, 0.4)
+        ref = geom.generate_mesh()
+        recipe = geom.recipe
+
+    recipe = json.loads(json.dumps(recipe))
+    assert [op["op"] for op in recipe["ops"]] == [
+        "add_polygon",
+        "add_boundary_layer",
+        "set_background_mesh",
+        "set_mesh_size",
+    ]
+
+    with pygmsh.geo.Geometry() as geom:
+        geom.replay(recipe)
+        mesh = geom.generate_mesh()
+    assert np.allclose(mesh.points, ref.points)
+    assert _num_cells(mesh) == _num_cells(ref)
+
+
+def test_deep_reference():
+    with pygmsh.geo.Geometry(record=True) as geom:
+        box = geom.add_box(0.0, 1.0, 0.0, 1.0, 0.0, 1.0, mesh_size=0.5)
+        # created by add_box, six levels below its result
+        curve = box.surface_loop.surfaces[0].curve_loop.curves[0]
+        geom.set_transfinite_curve(curve, 7, "Progression", 1.0)
+        ref = geom.generate_mesh()
+        recipe = geom.recipe
+
+    assert recipe["ops"][1]["args"][0]["path"] == [
+        "surface_loop",
+        "surfaces",
+        0,
+        "curve_loop",
+        "curves",
+        0,
+    ]
+    with pygmsh.geo.Geometry() as geom:
+        geom.replay(recipe)
+        mesh = geom.generate_mesh()
+    assert np.allclose(mesh.points, ref.points)
+    assert _num_cells(mesh) == _num_cells(ref)
@@ -0,0 +1,28 @@
+import gmsh
+from helpers import compute_volume
+
+import pygmsh
+
+
+def test():
+    with pygmsh.session():
+        for k in range(3):
+            with pygmsh.occ.Geometry() as geom:
+                assert geom.characteristic_length_max == 1.0e22
+                geom.characteristic_length_max = 0.1
+                geom.add_box([0.0, 0.0, 0.0], [1.0, 1.0, k + 1.0])
+                mesh = geom.generate_mesh()
+            assert abs(compute_volume(mesh) - (k + 1.0)) < 1.0e-10
+
+            # Gmsh stays alive, the options are restored
+            assert gmsh.isInitialized()
+            assert gmsh.option.getNumber("Mesh.CharacteristicLengthMax") == 1.0e22
+
+        with pygmsh.geo.Geometry() as geom:
+            geom.set_mesh_size_callback(lambda *_: 0.2)
+            geom.add_rectangle(0.0, 1.0, 0.0, 1.0, 0.0)
+            mesh = geom.generate_mesh()
+        assert abs(compute_volume(mesh) - 1.0) < 1.0e-10
+        assert gmsh.option.getNumber("Mesh.CharacteristicLengthFromPoints") == 1
+
+    assert not gmsh.isInitialized()
@@ -0,0 +1,81 @@
+import gmsh
+
+import pygmsh
+
+
+def test():
+    with pygmsh.geo.Geometry() as geom:
+        box = geom.add_box(0.0, 1.0, 0.0, 2.0, 0.0, 3.0, mesh_size=0.3)
+        geom.add_physical(box.volume, "box")
+        geom.add_physical(box.surface_loop.surfaces[:2], "sides")
+        assert geom.generate_mesh(extract=False) is None
+        stats = geom.mesh_stats(per_entity=True)
+        cheap = geom.mesh_stats()
+        mesh = pygmsh.helpers.extract_to_meshio()
+
+    assert stats.nodes == len(mesh.points)
+    num_tetra = len(mesh.get_cells_type("tetra"))
+    assert stats.elements["tetra"] == num_tetra
+    for cell_type in ["vertex", "line", "triangle"]:
+        assert stats.elements[cell_type] == len(mesh.get_cells_type(cell_type))
+    assert abs(stats.bounding_box[4] - 2.0) < 1.0e-6
+
+    assert len(stats.entities) == 8 + 12 + 6 + 1
+    # the inner nodes of the entities are all nodes
+    assert sum(e["nodes"] for e in stats.entities.values()) == stats.nodes
+    volume = stats.entities[(3, 1)]
+    assert volume["elements"] == {"tetra": num_tetra}
+    assert abs(volume["bounding_box"][5] - 3.0) < 1.0e-6
+    num_lines = sum(e["elements"].get("line", 0) for e in stats.entities.values())
+    assert num_lines == len(mesh.get_cells_type("line"))
+
+    groups = {g["label"]: g for g in stats.physical_groups.values()}
+    assert groups["box"]["elements"] == {"tetra": num_tetra}
+    assert len(groups["sides"]["entities"]) == 2
+    assert groups["sides"]["elements"]["triangle"] == sum(
+        len(c) for c in mesh.cell_sets["sides"] if c is not None
+    )
+
+    assert cheap.entities is None and cheap.physical_groups is None
+    assert cheap.elements == stats.elements
+    assert "sides" in str(stats)
+    assert len(stats.as_dict()["entities"]) == len(stats.entities)
+
+
+def test_tag_ranges(monkeypatch):
+    with pygmsh.occ.Geometry() as geom:
+        geom.add_box([0.0, 0.0, 0.0], [1.0, 1.0, 1.0], mesh_size=0.2)
+        geom.add_ball([2.0, 0.0, 0.0], 0.5, mesh_size=0.2)
+        geom.generate_mesh(extract=False)
+        fast = geom.mesh_stats(per_entity=True)
+        assert pygmsh.stats._count_per_entity(
+            gmsh.model.getEntities(), fast.nodes, sum(fast.elements.values())
+        )
+        monkeypatch.setattr(pygmsh.stats, "_count_per_entity", lambda *args: None)
+        slow = geom.mesh_stats(per_entity=True)
+
+    assert fast.entities == slow.entities
+
+
+def test_remeshed():
+    with pygmsh.geo.Geometry() as geom:
+        r0 = geom.add_rectangle(0.0, 1.0, 0.0, 1.0, 0.0, mesh_size=0.2)
+        geom.add_rectangle(2.0, 3.0, 0.0, 1.0, 0.0, mesh_size=0.2)
+        geom.generate_mesh(dim=2, incremental=True)
+        geom.set_transfinite_curve(r0.curves[0], 20, "Progression", 1.0)
+        geom.generate_mesh(dim=2, incremental=True, extract=False)
+        stats = geom.mesh_stats(per_entity=True)
+        # the remeshed nodes and elements aren't numbered by entity
+        assert (
+            pygmsh.stats._count_per_entity(
+                gmsh.model.getEntities(), stats.nodes, sum(stats.elements.values())
+            )
+            is None
+        )
+        mesh = pygmsh.helpers.extract_to_meshio()
+
+    assert sum(e["nodes"] for e in stats.entities.values()) == len(mesh.points)
+    num_triangles = sum(
+        e["elements"].get("triangle", 0) for e in stats.entities.values()
+    )
+    assert num_triangles == len(mesh.get_cells_type("triangle"))